@@ -14,12 +14,13 @@ from flask_security import Security
 from common.dash_callbacks import register_common_callbacks
 from auth import DashFlaskSecurityAuth
 from dash_layout import init_tabs_for_navbar, layout
+from dashboards.Burndown import BurndownDashboardController
 from dashboards.Burnup import BurnupDashboardController
 from dashboards.LongTermHealth import LongTermHealthDashboardController
 from dashboards.TeamHealthCheck import TeamHealthCheckDashboardController
 from dashboards.Worktime import WorktimeDashboardController
 from dashboards.CumulativeFlow import CumulativeFlowDashboardController
-from database import db, migrate
+from database import REPLICA_BIND, db, migrate, use_replica
 from structure.auth import CustomAnonymousUser, user_datastore
 from views.admin import admin
 from views.user import user
@@ -41,6 +42,8 @@ class TmvConfig:
     SECURITY_PASSWORD_SALT: str
     SECURITY_REGISTERABLE: bool = False
 
+    SQLALCHEMY_REPLICA_DATABASE_URI: str = None
+
     CELERY_BROKER_URL: str = None
     CELERY_RESULT_BACKEND: str = None
 
@@ -54,6 +57,15 @@ class TmvConfig:
 
     JIRA_FIELD_SPRINT: str = None
     JIRA_FIELD_STORYPOINTS: str = None
+    JIRA_SEARCH_BATCH_SIZE: int = 50
+
+    SNAPSHOT_COMPACTION_DAYS: int = 1
+    SNAPSHOT_COMPACTION_WINDOW_DAYS: int = 7
+    SNAPSHOT_RETENTION_MONTHS: Optional[int] = None
+    SNAPSHOT_RETENTION_ARCHIVE: bool = True
+    SNAPSHOT_CUBE_FOLDER: str = None
+    SNAPSHOT_ARCHIVE_FOLDER: str = None
+    SNAPSHOT_ARCHIVE_AFTER_DAYS: int = 183
 
     OKTA_ORG_BASEURL: str = None
     OKTA_CLIENT_ID: str = None
@@ -105,6 +117,7 @@ def create_tmv_config_from_env() -> TmvConfig:
         DEV_MODE=os.getenv("TMV_DEV") == "1",
         SECRET_KEY=os.environ["FLASK_SECRET_KEY"],
         SQLALCHEMY_DATABASE_URI=SQLALCHEMY_DATABASE_URI,
+        SQLALCHEMY_REPLICA_DATABASE_URI=os.getenv("SQLALCHEMY_REPLICA_DATABASE_URI"),
         TEMP_UPLOADS_FOLDER=os.environ["TEMP_UPLOADS_FOLDER"],
         SECURITY_PASSWORD_SALT=os.environ["SECURITY_PASSWORD_SALT"],
         SECURITY_REGISTERABLE=os.getenv("SECURITY_REGISTERABLE") == "1",
@@ -121,6 +134,22 @@ def create_tmv_config_from_env() -> TmvConfig:
         JIRA_RSA_PEM=os.getenv("JIRA_RSA_PEM"),
         JIRA_FIELD_SPRINT=os.getenv("JIRA_FIELD_SPRINT", "Sprint"),
         JIRA_FIELD_STORYPOINTS=os.getenv("JIRA_FIELD_STORYPOINTS", "Story Points"),
+        JIRA_SEARCH_BATCH_SIZE=int(os.getenv("JIRA_SEARCH_BATCH_SIZE", "50")),
+        SNAPSHOT_COMPACTION_DAYS=int(os.getenv("SNAPSHOT_COMPACTION_DAYS", "1")),
+        SNAPSHOT_COMPACTION_WINDOW_DAYS=int(
+            os.getenv("SNAPSHOT_COMPACTION_WINDOW_DAYS", "7")
+        ),
+        SNAPSHOT_RETENTION_MONTHS=(
+            int(os.environ["SNAPSHOT_RETENTION_MONTHS"])
+            if os.getenv("SNAPSHOT_RETENTION_MONTHS")
+            else None
+        ),
+        SNAPSHOT_RETENTION_ARCHIVE=os.getenv("SNAPSHOT_RETENTION_ARCHIVE", "1") == "1",
+        SNAPSHOT_CUBE_FOLDER=os.getenv("SNAPSHOT_CUBE_FOLDER"),
+        SNAPSHOT_ARCHIVE_FOLDER=os.getenv("SNAPSHOT_ARCHIVE_FOLDER"),
+        SNAPSHOT_ARCHIVE_AFTER_DAYS=int(
+            os.getenv("SNAPSHOT_ARCHIVE_AFTER_DAYS", "183")
+        ),
         CELERY_BROKER_URL=CELERY_BROKER_URL,
         CELERY_RESULT_BACKEND=CELERY_RESULT_BACKEND,
     )
@@ -170,6 +199,11 @@ def create_app(
     app.config.from_mapping(
         SECRET_KEY=config.SECRET_KEY,
         SQLALCHEMY_DATABASE_URI=config.SQLALCHEMY_DATABASE_URI,
+        SQLALCHEMY_BINDS=(
+            {REPLICA_BIND: config.SQLALCHEMY_REPLICA_DATABASE_URI}
+            if config.SQLALCHEMY_REPLICA_DATABASE_URI
+            else None
+        ),
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
         TEMP_UPLOADS_FOLDER=str(BASE_DIR / config.TEMP_UPLOADS_FOLDER),
         SECURITY_PASSWORD_SALT=config.SECURITY_PASSWORD_SALT,
@@ -198,6 +232,22 @@ def create_app(
         JIRA_RSA_PEM=config.JIRA_RSA_PEM,
         JIRA_FIELD_SPRINT=config.JIRA_FIELD_SPRINT,
         JIRA_FIELD_STORYPOINTS=config.JIRA_FIELD_STORYPOINTS,
+        JIRA_SEARCH_BATCH_SIZE=config.JIRA_SEARCH_BATCH_SIZE,
+        SNAPSHOT_COMPACTION_DAYS=config.SNAPSHOT_COMPACTION_DAYS,
+        SNAPSHOT_COMPACTION_WINDOW_DAYS=config.SNAPSHOT_COMPACTION_WINDOW_DAYS,
+        SNAPSHOT_RETENTION_MONTHS=config.SNAPSHOT_RETENTION_MONTHS,
+        SNAPSHOT_RETENTION_ARCHIVE=config.SNAPSHOT_RETENTION_ARCHIVE,
+        SNAPSHOT_CUBE_FOLDER=(
+            str(BASE_DIR / config.SNAPSHOT_CUBE_FOLDER)
+            if config.SNAPSHOT_CUBE_FOLDER
+            else None
+        ),
+        SNAPSHOT_ARCHIVE_FOLDER=(
+            str(BASE_DIR / config.SNAPSHOT_ARCHIVE_FOLDER)
+            if config.SNAPSHOT_ARCHIVE_FOLDER
+            else None
+        ),
+        SNAPSHOT_ARCHIVE_AFTER_DAYS=config.SNAPSHOT_ARCHIVE_AFTER_DAYS,
         FLASK_ADMIN_SWATCH="simplex",
         CELERY_BROKER_URL=config.CELERY_BROKER_URL,
         CELERY_RESULT_BACKEND=config.CELERY_RESULT_BACKEND,
@@ -253,6 +303,12 @@ def create_app(
     )
     dash_app.title = "Team Metrics Visualizer"
 
+    @app.before_request
+    def route_dashboard_reads():
+        # dash callbacks (visuals & slicers) only read, so the replica will do
+        if flask.request.path.startswith(DASHBOARD_PREFIX + "_dash-"):
+            use_replica()
+
     DashFlaskSecurityAuth(dash_app)
 
     if config.DEV_MODE:
@@ -264,6 +320,7 @@ def create_app(
         TeamHealthCheckDashboardController(),
         LongTermHealthDashboardController(),
         BurnupDashboardController(),
+        BurndownDashboardController(),
         CumulativeFlowDashboardController(),
         WorktimeDashboardController(),
     ]
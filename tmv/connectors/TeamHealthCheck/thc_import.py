@@ -4,7 +4,11 @@ from connectors.shared import FileImporter, ImporterReasonForSkip
 from database import db
 import pandas as pd
 from structure.organization import Team
-from structure.measurements import THCQuestion, THCMeasurement
+from structure.measurements import (
+    THCQuestion,
+    THCMeasurement,
+    refresh_thc_sessions,
+)
 
 
 class THCImporter(FileImporter):
@@ -14,6 +18,8 @@ class THCImporter(FileImporter):
         # Stores questions by topic
         self._q_topics = None
         self._questions = dict()
+        # Sessions to refresh in the session catalogue on commit
+        self._session_names = set()
 
     def get_question(self, q_topic: str) -> Optional[THCQuestion]:
         """
@@ -75,6 +81,7 @@ class THCImporter(FileImporter):
 
         # Add to session
         db.session.add(m)
+        self._session_names.add(session_name)
 
     def process_row(self, index, row: pd.Series):
         """ Process one row in the dataset and add it to the database """
@@ -110,3 +117,9 @@ class THCImporter(FileImporter):
 
     def process_final(self):
         pass
+
+    def commit(self):
+        """ Commit the processed rows and update the session catalogue """
+        db.session.flush()
+        refresh_thc_sessions(self._session_names)
+        super().commit()
@@ -1,19 +1,77 @@
 import logging
 import re
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import date, datetime, time
 from typing import Dict, List, Optional, Tuple
 
 from dateutil import rrule
 from dateutil.parser import isoparse
 from dateutil.tz import tzutc
 from flask import current_app
+from jira.exceptions import JIRAError
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from common.exceptions import ImproperlyConfiguredError
 from connectors.jira import jira_core
 from database import db
-from structure.events import IssueSnapshot, Sprint
-from structure.project import JiraProject
+from structure.events import IssueSnapshot, Sprint, create_snapshot_partitions
+from structure.project import JiraProject, JiraSyncStrategy
+
+#: URL of the JIRA Agile REST API. The jira package defaults to the older
+#: GreenHopper API, which ignores filters and paging.
+AGILE_BASE_URL = "{server}/rest/agile/1.0/{path}"
+#: Number of values requested per page of Agile REST API listings
+AGILE_PAGE_SIZE = 50
+#: URL of the GreenHopper REST API, which provides the sprint reports
+GREENHOPPER_BASE_URL = "{server}/rest/greenhopper/1.0/{path}"
+#: Lists of issues in a sprint report
+SPRINT_REPORT_ISSUE_LISTS = (
+    "completedIssues",
+    "issuesNotCompletedInCurrentSprint",
+    "puntedIssues",
+    "issuesCompletedInAnotherSprint",
+)
+#: Maximum number of issues searched with their changelogs at once
+CHANGELOG_BATCH_SIZE = 100
+#: Maximum number of issue IDs per change probe, so the JQL of the GET
+#: search stays below the URL length limits of JIRA and its proxies
+PROBE_ISSUE_BATCH_SIZE = 200
+
+
+@dataclass
+class SprintBackfillPlan:
+    """
+    Describes the JIRA searches needed to backfill the issues of a sprint:
+    one search per date and status.
+    """
+
+    dates: List[datetime]
+    statuses: List[str]
+
+    @property
+    def estimated_calls(self) -> int:
+        """ Number of searches needed to execute the plan """
+        return len(self.dates) * len(self.statuses)
+
+
+@dataclass
+class ReconstructedIssue:
+    """
+    State of an issue at a past date, shaped like the issues returned by
+    `JIRA.search_issues` for parsing.
+    """
+
+    raw: dict
+
+
+def _to_naive_utc(dt_string: str) -> datetime:
+    """ Parses a JIRA timestamp into a naive UTC datetime like in the database """
+    return isoparse(dt_string).astimezone(tzutc()).replace(tzinfo=None)
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    """ Parses a number of a JIRA changelog, which are strings """
+    return float(value) if value not in (None, "") else None
 
 
 class JiraSync:
@@ -26,6 +84,8 @@ class JiraSync:
             d.name: d.statusCategory.name for d in self.jira.statuses()
         }
         self.statuses = self.status_mapping.keys()
+        # statuses used by the workflows of a project, by project key
+        self._project_statuses = dict()
         self.issue_fields_mapping = {f["name"]: f["id"] for f in self.jira.fields()}
 
         self.sprint_field = self._get_field_key(current_app.config["JIRA_FIELD_SPRINT"])
@@ -67,9 +127,107 @@ class JiraSync:
             self.storypoints_field,
         ]
         if extra:
-            fields.append(extra)
+            fields.extend(extra)
         return fields
 
+    def _get_project_statuses(self, project_key: str) -> List[str]:
+        """
+        Returns the statuses used by the workflows of a project. An issue
+        of the project can't have any other status, so there is no need to
+        search for the others. Falls back to all statuses of the JIRA instance
+        if the workflow statuses can't be retrieved.
+
+        :param project_key: Key of the JIRA project.
+        """
+        if project_key not in self._project_statuses:
+            try:
+                issue_types = self.jira._get_json(  # pylint: disable=protected-access
+                    f"project/{project_key}/statuses"
+                )
+                workflow_statuses = {
+                    status["name"]
+                    for issue_type in issue_types
+                    for status in issue_type["statuses"]
+                }
+            except Exception as e:
+                current_app.logger.warning(
+                    f"Unable to load workflow statuses of project {project_key}, "
+                    f"using all statuses instead: {e}"
+                )
+                workflow_statuses = set(self.statuses)
+
+            # keep the order of the JIRA instance's statuses
+            self._project_statuses[project_key] = [
+                status for status in self.statuses if status in workflow_statuses
+            ] or list(self.statuses)
+        return self._project_statuses[project_key]
+
+    def _get_sprint_statuses(self, sprint: Sprint) -> List[str]:
+        """
+        Returns the statuses issues of the sprint can have.
+
+        :param sprint: Sprint object to get the statuses for.
+        """
+        jira_project = sprint.activity.jira_project if sprint.activity else None
+        if jira_project is None:
+            return list(self.statuses)
+        return self._get_project_statuses(jira_project.project_key)
+
+    def plan_sprint_backfill(
+        self, sprint: Sprint, skip_weekends: bool = True
+    ) -> SprintBackfillPlan:
+        """
+        Plans the searches needed to get the issues of a sprint for every day.
+
+        :param sprint: Sprint object to plan the backfill for.
+        :param skip_weekends: If True (default), skips Saturdays and Sundays,
+            except for the first and last day of the sprint. The sprint charts
+            don't show weekends.
+        """
+        return SprintBackfillPlan(
+            dates=self._get_sprint_dates(sprint, skip_weekends),
+            statuses=self._get_sprint_statuses(sprint),
+        )
+
+    def _get_sprint_dates(
+        self, sprint: Sprint, skip_weekends: bool = True
+    ) -> List[datetime]:
+        """
+        Returns the end of every day of a sprint until now, or now for the
+        current day.
+
+        :param sprint: Sprint object to get the dates of.
+        :param skip_weekends: See `plan_sprint_backfill`.
+        """
+        # plan for all dates of the sprint until now
+        time_now = datetime.now(tzutc()).replace(tzinfo=None)
+        until_date = sprint.complete_date or sprint.end_date
+        if until_date > time_now:
+            until_date = time_now
+        # inclusive count
+        sprint_days_cnt = (until_date.date() - sprint.start_date.date()).days + 1
+        index = list(
+            rrule.rrule(
+                rrule.DAILY,
+                dtstart=sprint.start_date.date(),
+                count=sprint_days_cnt,
+                byhour=23,
+                byminute=59,
+                bysecond=59,
+            )
+        )
+        # this means sprint is current so last entry shouldn't be EOD
+        if until_date == time_now:
+            index = index[:-1] + [until_date]
+
+        if skip_weekends:
+            index = [
+                dt
+                for i, dt in enumerate(index)
+                if dt.weekday() < 5 or i in (0, len(index) - 1)
+            ]
+        return index
+
     def _get_issues_by_project(
         self, project_key: str, dt: Optional[datetime] = None,
     ):
@@ -86,7 +244,7 @@ class JiraSync:
             snapshot_dt = dt.strftime(
                 "%Y-%m-%d %H:%M"
             )  # Note: jql doesn't support timezones
-            for status in self.statuses:
+            for status in self._get_project_statuses(project_key):
                 jql = (
                     jql_base + f"""AND status WAS "{status}" """
                     f"""ON "{snapshot_dt}" """
@@ -110,6 +268,43 @@ class JiraSync:
             )
         return issues_list
 
+    def _get_issues_by_projects(self, project_keys: List[str]) -> Dict[str, list]:
+        """
+        Queries JIRA for the current issues of several projects with a single
+        search and returns them by project key.
+
+        :param project_keys: Keys of the projects to query.
+        """
+        keys = ", ".join(f'"{project_key}"' for project_key in project_keys)
+        issues = self.jira.search_issues(
+            f"project in ({keys})",
+            expand="versionedRepresentations",
+            fields=self._get_fields(["project"]),
+            maxResults=False,
+        )
+        # JQL matches project keys case-insensitively
+        issues_by_project = {project_key.upper(): [] for project_key in project_keys}
+        for issue in issues:
+            project_key = self._get_issue_project_key(issue.raw).upper()
+            if project_key in issues_by_project:
+                issues_by_project[project_key].append(issue)
+        return {
+            project_key: issues_by_project[project_key.upper()]
+            for project_key in project_keys
+        }
+
+    def _get_issue_project_key(self, issue_raw: dict) -> str:
+        """
+        Returns the key of the project an issue belongs to.
+
+        :param issue_raw: Raw dict representation of issue
+        """
+        project = issue_raw["versionedRepresentations"].get("project")
+        if project and project.get("1"):
+            return project["1"]["key"]
+        # issue keys are prefixed with the project key, e.g. ABC-123
+        return issue_raw["key"].rsplit("-", 1)[0]
+
     def _get_issues_by_sprint(self, sprint: Sprint, latest_only: bool = False) -> dict:
         """
         Queries JIRA and returns issues under sprint
@@ -133,33 +328,175 @@ class JiraSync:
             )
             return {time_now: issues}
 
-        # get data for all dates
-        until_date = sprint.complete_date or sprint.end_date
-        time_now = time_now.replace(tzinfo=None)
-        if until_date > time_now:
-            until_date = time_now
-        # inclusive count
-        sprint_days_cnt = (until_date.date() - sprint.start_date.date()).days + 1
-        index = list(
-            rrule.rrule(
-                rrule.DAILY,
-                dtstart=sprint.start_date.date(),
-                count=sprint_days_cnt,
-                byhour=23,
-                byminute=59,
-                bysecond=59,
-            )
+        if (
+            sprint.is_closed
+            and sprint.activity
+            and sprint.activity.jira_sync_strategy == JiraSyncStrategy.sprint_report
+        ):
+            try:
+                return self._get_issues_by_sprint_report(
+                    sprint, self._get_sprint_dates(sprint)
+                )
+            except (JIRAError, KeyError):
+                logging.warning(
+                    f"Unable to load the sprint report of sprint {sprint.sprint_id}, "
+                    "searching its issues day by day instead"
+                )
+
+        plan = self.plan_sprint_backfill(sprint)
+        current_app.logger.info(
+            f"Backfilling sprint {sprint.name} (sprint_id={sprint.sprint_id}): "
+            f"{len(plan.dates)} days x {len(plan.statuses)} statuses = "
+            f"{plan.estimated_calls} JIRA searches"
         )
-        # this means sprint is current so last entry shouldn't be EOD
-        if until_date == time_now:
-            index = index[:-1] + [until_date]
-        issues_per_day = {k: [] for k in index}
+        return self._get_issues_by_plan(sprint, plan)
+
+    def _get_issues_by_sprint_report(
+        self, sprint: Sprint, dates: List[datetime]
+    ) -> dict:
+        """
+        Reconstructs the issues of a closed sprint for every date from the
+        sprint report of its board and the changelogs of the issues in the
+        report. Needs two requests plus one search per `CHANGELOG_BATCH_SIZE`
+        issues instead of one search per date and status.
+
+        Unlike the day by day searches, it takes into account when issues
+        were added to or removed from the sprint and when their story points
+        changed.
+
+        :param sprint: Closed Sprint object to get the issues of.
+        :param dates: Dates to reconstruct the issues for.
+        """
+        # pylint: disable=protected-access
+        board_id = self.jira._get_json(
+            f"sprint/{sprint.jira_sprint_id}", base=AGILE_BASE_URL
+        )["originBoardId"]
+        report = self.jira._get_json(
+            "rapid/charts/sprintreport",
+            params={"rapidViewId": board_id, "sprintId": sprint.jira_sprint_id},
+            base=GREENHOPPER_BASE_URL,
+        )["contents"]
+        issue_ids = sorted(
+            {
+                int(issue["id"])
+                for issue_list in SPRINT_REPORT_ISSUE_LISTS
+                for issue in report.get(issue_list, [])
+            }
+        )
+        current_app.logger.info(
+            f"Backfilling sprint {sprint.name} (sprint_id={sprint.sprint_id}) "
+            f"from its sprint report: {len(issue_ids)} issues"
+        )
+
+        issues_per_day = {dt: [] for dt in dates}
+        for i in range(0, len(issue_ids), CHANGELOG_BATCH_SIZE):
+            batch = issue_ids[i : i + CHANGELOG_BATCH_SIZE]
+            issues = self.jira.search_issues(
+                f"id in ({', '.join(map(str, batch))})",
+                expand="changelog",
+                fields=["created", "status", self.sprint_field, self.storypoints_field],
+                maxResults=False,
+            )
+            for issue in issues:
+                for dt, issue_raw in self._replay_issue(issue.raw, sprint, dates):
+                    issues_per_day[dt].append(ReconstructedIssue(issue_raw))
+        return issues_per_day
+
+    def _replay_issue(
+        self, issue_raw: dict, sprint: Sprint, dates: List[datetime]
+    ) -> List[Tuple[datetime, dict]]:
+        """
+        Replays the changelog of an issue and returns its state on each of
+        the dates it was part of the sprint.
+
+        :param issue_raw: Raw dict representation of the issue, including
+            its changelog.
+        :param sprint: Sprint object the issue was part of.
+        :param dates: Naive UTC datetimes to get the state of the issue for.
+        """
+        changelog_fields = {
+            "status": "status",
+            self.storypoints_field: "story_points",
+            current_app.config["JIRA_FIELD_STORYPOINTS"]: "story_points",
+            self.sprint_field: "sprint",
+            current_app.config["JIRA_FIELD_SPRINT"]: "sprint",
+        }
+        sprint_id = str(sprint.jira_sprint_id)
+
+        changes = []
+        for history in issue_raw.get("changelog", {}).get("histories", []):
+            changed_at = _to_naive_utc(history["created"])
+            for item in history["items"]:
+                field = changelog_fields.get(item.get("fieldId")) or (
+                    changelog_fields.get(item["field"])
+                )
+                if field == "status":
+                    values = (item["fromString"], item["toString"])
+                elif field == "story_points":
+                    values = (
+                        _to_float(item["fromString"]),
+                        _to_float(item["toString"]),
+                    )
+                elif field == "sprint":
+                    # sprint ids, e.g. "12, 13"
+                    values = (
+                        sprint_id in re.split(r",\s*", item["from"] or ""),
+                        sprint_id in re.split(r",\s*", item["to"] or ""),
+                    )
+                else:
+                    continue
+                changes.append((changed_at, field, values))
+        changes.sort(key=lambda change: change[0])
+
+        # the present state, rolled back to before the first change of each field
+        story_points = issue_raw["fields"].get(self.storypoints_field)
+        state = {
+            "status": issue_raw["fields"]["status"]["name"],
+            "story_points": story_points,
+            # issues in the sprint report without changes were always in the sprint
+            "sprint": True,
+        }
+        for _, field, (value_before, _) in reversed(changes):
+            state[field] = value_before
+
+        created = _to_naive_utc(issue_raw["fields"]["created"])
+        states = []
+        change_idx = 0
+        for dt in sorted(dates):
+            while change_idx < len(changes) and changes[change_idx][0] <= dt:
+                _, field, (_, value_after) = changes[change_idx]
+                state[field] = value_after
+                change_idx += 1
+            if created <= dt and state["sprint"]:
+                states.append(
+                    (
+                        dt,
+                        {
+                            "id": issue_raw["id"],
+                            "status": state["status"],
+                            "versionedRepresentations": {
+                                self.storypoints_field: {"1": state["story_points"]}
+                            },
+                        },
+                    )
+                )
+        return states
+
+    def _get_issues_by_plan(self, sprint: Sprint, plan: SprintBackfillPlan) -> dict:
+        """
+        Queries JIRA and returns issues under sprint for each date of the plan.
+
+        :param sprint: Sprint object to query
+        :param plan: Dates and statuses to search for
+        """
+        jql_base = f"""sprint = {sprint.jira_sprint_id} """
+        issues_per_day = {k: [] for k in plan.dates}
 
-        for dt in index:
+        for dt in plan.dates:
             snapshot_dt = dt.strftime(
                 "%Y-%m-%d %H:%M"
             )  # Note: jql doesn't support timezones
-            for status in self.statuses:
+            for status in plan.statuses:
                 jql = (
                     jql_base + f"""AND status WAS "{status}" """
                     f"""ON "{snapshot_dt}" """
@@ -264,6 +601,10 @@ class JiraSync:
         sprint_gh, sprint_dict = sprint_tuple
         sprint = Sprint.query.filter_by(jira_sprint_id=sprint_dict["id"]).one_or_none()
 
+        # frozen sprints are immutable
+        if sprint and sprint.is_frozen:
+            return sprint if return_obj else None
+
         # create sprint if it doesn't exist. update if last_updated < dt
         if not sprint or not sprint.last_updated or sprint.tz_last_updated < dt:
             try:
@@ -365,18 +706,12 @@ class JiraSync:
         :param project: JiraProject object to tie the issues queried to.
             The jql needs the `project_key` field of `project`.
         """
-        activity_id = project.activity.activity_id
         issues = self._get_issues_by_project(project.project_key)
 
         # for date stamping
         dt = datetime.now(tzutc())
 
-        for issue in issues:
-            parsed_issue = self._parse_issue(issue.raw, dt=dt, activity_id=activity_id)
-            # skip if there's no sprint
-            if parsed_issue["sprint_id"]:
-                issue_obj = IssueSnapshot(snapshot_date=dt, **parsed_issue,)
-                db.session.add(issue_obj)
+        self._add_project_snapshots(project, issues, dt)
         try:
             db.session.commit()
         except:
@@ -385,18 +720,225 @@ class JiraSync:
             )
             db.session.rollback()
 
-    def sync_sprint_issues(self, sprint: Sprint, latest_only: bool = False):
+    def snapshot_projects(
+        self, projects: List[JiraProject], batch_size: Optional[int] = None
+    ):
+        """
+        Takes a current snapshot of all issues of several projects like
+        `snapshot_project`, but queries up to `batch_size` projects with
+        a single `project in (...)` search. The issues are split by project
+        again, so each activity still gets its own snapshots.
+
+        :param projects: JiraProject objects to snapshot.
+        :param batch_size: Maximum number of projects per search. Defaults to
+            the `JIRA_SEARCH_BATCH_SIZE` setting. With 1, every project
+            gets searched on its own.
+        """
+        if batch_size is None:
+            batch_size = current_app.config.get("JIRA_SEARCH_BATCH_SIZE", 50)
+        if batch_size <= 1:
+            for project in projects:
+                self.snapshot_project(project)
+            return
+
+        for i in range(0, len(projects), batch_size):
+            batch = projects[i : i + batch_size]
+            try:
+                issues_by_project = self._get_issues_by_projects(
+                    [project.project_key for project in batch]
+                )
+            except JIRAError:
+                # e.g. a project which doesn't exist anymore fails the whole
+                # search, so the projects of this batch get searched one by one
+                logging.warning(
+                    f"Batched search failed for projects "
+                    f"{', '.join(project.project_key for project in batch)}, "
+                    "taking their snapshots one by one"
+                )
+                for project in batch:
+                    try:
+                        self.snapshot_project(project)
+                    except JIRAError:
+                        logging.error(
+                            f"Unable to take snapshot of project {project.project_key}"
+                        )
+                continue
+
+            # for date stamping
+            dt = datetime.now(tzutc())
+
+            for project in batch:
+                self._add_project_snapshots(
+                    project, issues_by_project[project.project_key], dt
+                )
+            try:
+                db.session.commit()
+            except:
+                logging.error(
+                    f"Error encountered in syncing issues. "
+                    f"project_ids={[project.id for project in batch]}, dt={dt}"
+                )
+                db.session.rollback()
+
+    def _add_project_snapshots(self, project: JiraProject, issues: list, dt: datetime):
+        """
+        Adds the IssueSnapshot objects of the issues of a project to the
+        session without committing.
+
+        :param project: JiraProject object to tie the issues to.
+        :param issues: Issues of the project as returned by JIRA.
+        :param dt: Datetime to stamp the snapshots with.
+        """
+        activity_id = project.activity.activity_id
+        for issue in issues:
+            parsed_issue = self._parse_issue(issue.raw, dt=dt, activity_id=activity_id)
+            # skip if there's no sprint
+            if parsed_issue["sprint_id"]:
+                issue_obj = IssueSnapshot(snapshot_date=dt, **parsed_issue,)
+                db.session.add(issue_obj)
+
+    def _get_latest_snapshots(self, sprint: Sprint) -> List[IssueSnapshot]:
+        """
+        Returns the issue snapshots of the latest sync of a sprint.
+
+        :param sprint: Sprint object to get the snapshots of.
+        """
+        latest_date = (
+            db.session.query(db.func.max(IssueSnapshot.snapshot_date))
+            .filter(IssueSnapshot.sprint_id == sprint.sprint_id)
+            .scalar()
+        )
+        if latest_date is None:
+            return []
+        return IssueSnapshot.query.filter(
+            IssueSnapshot.sprint_id == sprint.sprint_id,
+            IssueSnapshot.snapshot_date == latest_date,
+        ).all()
+
+    def has_sprint_changed(
+        self, sprint: Sprint, latest_snapshots: List[IssueSnapshot]
+    ) -> bool:
+        """
+        Checks with a count-only search whether any issue of the sprint was
+        updated since the sprint was last synced. Issues of the latest
+        snapshots are included, so issues removed from the sprint count
+        as changes as well. Their IDs are searched in batches of
+        `PROBE_ISSUE_BATCH_SIZE` to keep the search URLs short.
+
+        :param sprint: Sprint object to check. Needs `last_updated`.
+        :param latest_snapshots: Snapshots of the latest sync of the sprint.
+        """
+        # absolute JQL dates are in the timezone of the JIRA user, relative aren't
+        minutes = (
+            int((datetime.now(tzutc()) - sprint.tz_last_updated).total_seconds() // 60)
+            + 1
+        )
+        issue_ids = sorted({snapshot.issue_id for snapshot in latest_snapshots})
+        # the first search includes the sprint, the others only issue IDs
+        jql_conditions = [f"sprint = {sprint.jira_sprint_id}"]
+        for i in range(0, len(issue_ids), PROBE_ISSUE_BATCH_SIZE):
+            jql_issues = ", ".join(map(str, issue_ids[i : i + PROBE_ISSUE_BATCH_SIZE]))
+            if i == 0:
+                jql_conditions[0] = f"({jql_conditions[0]} OR issue in ({jql_issues}))"
+            else:
+                jql_conditions.append(f"issue in ({jql_issues})")
+
+        for jql_condition in jql_conditions:
+            try:
+                # pylint: disable=protected-access
+                result = self.jira._get_json(
+                    "search",
+                    params={
+                        "jql": f'{jql_condition} AND updated >= "-{minutes}m"',
+                        "maxResults": 0,
+                        "fields": "id",
+                    },
+                )
+            except JIRAError:
+                # e.g. one of the issues got deleted
+                return True
+            if result["total"] > 0:
+                return True
+        return False
+
+    def _carry_forward_snapshots(
+        self, sprint: Sprint, latest_snapshots: List[IssueSnapshot]
+    ) -> int:
+        """
+        Copies the latest snapshots of an unchanged sprint to the days of the
+        sprint after them, as the issues still look the same.
+
+        :param sprint: Sprint object to add the snapshots to.
+        :param latest_snapshots: Snapshots of the latest sync of the sprint.
+        :return: Number of added snapshots.
+        """
+        if not latest_snapshots:
+            return 0
+        latest_day = latest_snapshots[0].snapshot_date.date()
+        dates = [dt for dt in self._get_sprint_dates(sprint) if dt.date() > latest_day]
+        if dates:
+            create_snapshot_partitions(since=dates[0])
+        added_cnt = 0
+        for dt in dates:
+            for snapshot in latest_snapshots:
+                db.session.add(
+                    IssueSnapshot(
+                        sprint_id=snapshot.sprint_id,
+                        issue_id=snapshot.issue_id,
+                        status=snapshot.status,
+                        status_category=snapshot.status_category,
+                        story_points=snapshot.story_points,
+                        snapshot_date=dt,
+                    )
+                )
+                added_cnt += 1
+        return added_cnt
+
+    def sync_sprint_issues(
+        self, sprint: Sprint, latest_only: bool = False, probe: bool = True
+    ):
         """
         Gets and syncs all issues in sprint
 
         :param sprint: Sprint object to limit date
         :param latest_only: If True, syncs only latest data from jira (today).
             By default (False), syncs all dates.
+        :param probe: If True (default) and the sprint was synced before,
+            first checks whether any of its issues changed since. If not,
+            the latest snapshots are carried forward instead of fetching all
+            issues again.
         """
+        if sprint.is_frozen:
+            current_app.logger.info(f"Not syncing frozen sprint {sprint.sprint_id}")
+            return
+
         time_now = datetime.now(tzutc())
+        if probe and sprint.last_updated:
+            latest_snapshots = self._get_latest_snapshots(sprint)
+            if latest_snapshots and not self.has_sprint_changed(
+                sprint, latest_snapshots
+            ):
+                added_cnt = self._carry_forward_snapshots(sprint, latest_snapshots)
+                current_app.logger.info(
+                    f"Sprint {sprint.sprint_id} unchanged since {sprint.last_updated}, "
+                    f"carried forward {added_cnt} snapshots"
+                )
+                sprint.last_updated = time_now
+                try:
+                    db.session.commit()
+                except:
+                    logging.error(
+                        f"Error encountered in syncing issues. sprint_id={sprint.sprint_id}"
+                    )
+                    db.session.rollback()
+                return
+
         issues_per_day = self._get_issues_by_sprint(
             sprint, time_now if latest_only else None
         )
+        if issues_per_day:
+            # the days of a backfill may be in months without a partition yet
+            create_snapshot_partitions(since=min(issues_per_day))
         for date_key, issues_list in issues_per_day.items():
             for issue in issues_list:
                 parsed_issue = self._parse_issue(issue.raw, sprint=sprint)
@@ -412,15 +954,166 @@ class JiraSync:
             )
             db.session.rollback()
 
+    def sync_sprint_days(self, sprint: Sprint, days: List[date]):
+        """
+        Gets and syncs the issues of a sprint for the given days only, e.g.
+        to fill the gaps found by `structure.events.find_snapshot_gaps`.
+        Unlike `sync_sprint_issues`, this does not touch `Sprint.last_updated`.
+
+        :param sprint: Sprint object the days belong to
+        :param days: Days to get the end-of-day state of the issues for
+        """
+        if sprint.is_frozen:
+            current_app.logger.info(f"Not syncing frozen sprint {sprint.sprint_id}")
+            return
+
+        time_now = datetime.now(tzutc()).replace(tzinfo=None)
+        plan = SprintBackfillPlan(
+            dates=[
+                min(datetime.combine(day, time(23, 59, 59)), time_now)
+                for day in sorted(days)
+            ],
+            statuses=self._get_sprint_statuses(sprint),
+        )
+        current_app.logger.info(
+            f"Filling {len(plan.dates)} missing days of sprint {sprint.name} "
+            f"(sprint_id={sprint.sprint_id}): {plan.estimated_calls} JIRA searches"
+        )
+        issues_per_day = self._get_issues_by_plan(sprint, plan)
+        if issues_per_day:
+            create_snapshot_partitions(since=min(issues_per_day))
+        for date_key, issues_list in issues_per_day.items():
+            for issue in issues_list:
+                parsed_issue = self._parse_issue(issue.raw, sprint=sprint)
+                issue_obj = IssueSnapshot(snapshot_date=date_key, **parsed_issue,)
+                db.session.add(issue_obj)
+
+        try:
+            db.session.commit()
+        except:
+            logging.error(
+                f"Error encountered in syncing issues. sprint_id={sprint.sprint_id}"
+            )
+            db.session.rollback()
+
+    def _get_agile_values(self, path: str, params: Optional[dict] = None) -> list:
+        """
+        Pages through a listing of the JIRA Agile REST API and returns
+        all of its values.
+
+        :param path: Path of the listing, e.g. `board/1/sprint`.
+        :param params: Query parameters of the listing.
+        """
+        values = []
+        while True:
+            # pylint: disable=protected-access
+            page = self.jira._get_json(
+                path,
+                params={
+                    **(params or {}),
+                    "startAt": len(values),
+                    "maxResults": AGILE_PAGE_SIZE,
+                },
+                base=AGILE_BASE_URL,
+            )
+            values.extend(page["values"])
+            if page.get("isLast", True) or not page["values"]:
+                return values
+
+    def _get_board_sprints(self, project_key: str) -> Optional[List[dict]]:
+        """
+        Pages through the sprint listings of all scrum boards of a project
+        and returns the raw sprints. Returns None if no scrum board is
+        linked to the project.
+
+        :param project_key: Key of the JIRA project.
+        """
+        try:
+            # kanban boards don't have sprints
+            boards = self._get_agile_values(
+                "board", {"projectKeyOrId": project_key, "type": "scrum"}
+            )
+        except JIRAError:
+            logging.warning(f"Unable to load the boards of project {project_key}")
+            return None
+        if not boards:
+            return None
+
+        sprints = dict()
+        for board in boards:
+            try:
+                board_sprints = self._get_agile_values(f"board/{board['id']}/sprint")
+            except JIRAError:
+                logging.warning(f"Unable to load the sprints of board {board['id']}")
+                continue
+            # a sprint can be shown on several boards
+            for sprint_dict in board_sprints:
+                sprints[sprint_dict["id"]] = sprint_dict
+        return list(sprints.values())
+
+    def _upsert_sprints(self, sprint_dicts: List[dict], activity_id: int) -> int:
+        """
+        Creates or updates sprints with a single statement. Frozen sprints
+        are left untouched and `last_updated` isn't set, as no issues are
+        synced.
+
+        :param sprint_dicts: Sprints as returned by the Agile API.
+        :param activity_id: activity id to tie the sprints to
+        :return: Number of sprints upserted.
+        """
+        params_list = []
+        for sprint_dict in sprint_dicts:
+            try:
+                sprint_state = Sprint.State(sprint_dict["state"].lower())
+            except ValueError as e:
+                current_app.logger.error(f"Encountered Sprint with invalid state: {e}")
+                continue
+            params_list.append(
+                {
+                    "activity_id": activity_id,
+                    "jira_sprint_id": sprint_dict["id"],
+                    "name": sprint_dict["name"],
+                    "state": sprint_state.value,
+                    "start_date": sprint_dict.get("startDate"),
+                    "end_date": sprint_dict.get("endDate"),
+                    "complete_date": sprint_dict.get("completeDate"),
+                }
+            )
+        if not params_list:
+            return 0
+
+        stmt = pg_insert(Sprint).values(params_list)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_sprints_jira_sprint_id",
+            set_={k: stmt.excluded[k] for k in params_list[0] if k != "jira_sprint_id"},
+            where=Sprint.frozen_at.is_(None),
+        )
+        db.session.execute(stmt)
+        db.session.commit()
+        return len(params_list)
+
     def sync_all_sprints(self, project: JiraProject):
         """
         Gets and syncs all the sprints but without the issues.
 
+        The sprints are discovered from the agile boards of the project.
+        Only if no board is linked to the project, all issues of the project
+        are scanned for their sprints instead.
+
         :param project: JiraProject object to query sprints
         """
         time_now = datetime.now(tzutc())
         activity_id = project.activity.activity_id
 
+        sprint_dicts = self._get_board_sprints(project.project_key)
+        if sprint_dicts is not None:
+            upserted_cnt = self._upsert_sprints(sprint_dicts, activity_id)
+            current_app.logger.info(
+                f"Synced {upserted_cnt} sprints of project {project.project_key} "
+                "from its boards"
+            )
+            return
+
         issues = self._get_issues_by_project(project.project_key)
 
         collated_sprints = dict()
@@ -8,7 +8,7 @@ from database import db
 from helpers.time import to_timedelta
 
 from structure.organization import Team  # pylint: disable=unused-import
-from structure.measurements import OTMeasurement
+from structure.measurements import OTMeasurement, refresh_overtime_statistics
 
 COL_WORKDAYS_FIX = "Fixed Working days"
 COL_WORKDAYS_ACTUAL = "Actual working days"
@@ -133,7 +133,8 @@ class OTImporter(FileImporter):
     def commit(self):
         """
         Deletes all data from the database for the periods which were in the
-        imported file. After that, adds the new data from the file.
+        imported file. After that, adds the new data from the file and
+        recomputes the monthly overtime statistics of these periods.
         """
 
         """ Step 1: Delete all periods which were to be overwritten
@@ -154,4 +155,8 @@ class OTImporter(FileImporter):
             base-class for this. """
         logging.info(f"Adding {len(self.items_to_add)} items to database.")
         db.session.add_all(self.items_to_add)
+
+        """ Step 3: Recompute the monthly statistics of the periods """
+        db.session.flush()
+        refresh_overtime_statistics(self.periods_affected)
         super().commit()
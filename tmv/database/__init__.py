@@ -1,7 +1,14 @@
+import io
+import time
 from contextlib import contextmanager
-from sqlalchemy import MetaData
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import MetaData, Table, event, orm, text
+from sqlalchemy.ext import baked
+from sqlalchemy.sql.selectable import SelectBase
 from flask_migrate import Migrate
-from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy import SignallingSession, SQLAlchemy
 
 
 convention = {
@@ -12,7 +19,193 @@ convention = {
     "pk": "pk_%(table_name)s",
 }
 
+#: Bind key of the optional read replica in `SQLALCHEMY_BINDS`
+REPLICA_BIND = "replica"
+
+#: NULL string of the CSV written by `read_frame`. Unlike the default empty
+#: string and pandas' default NA values, it doesn't collide with real strings.
+COPY_NULL_MARKER = "__tmv_null__"
+
+
+def _is_write(clause) -> bool:
+    # Only ORM and Core selects are reads. Raw SQL may write anywhere in the
+    # statement, e.g. `WITH ... INSERT`, so it is only a read if it is
+    # declared as a select with `text(...).columns()`.
+    if clause is None:
+        return False
+    return not isinstance(clause, SelectBase)
+
+
+class RoutingSession(SignallingSession):
+    """
+    Session sending its reads to the read replica while `use_replica()` is
+    in effect and a replica is configured. Flushes, writes, raw SQL not
+    declared as select and every query after the first write of the session
+    go to the primary, so callers always see their own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None):
+        if _is_write(clause):
+            self.info["has_written"] = True
+        if (
+            self.info.get("use_replica")
+            and not self.info.get("has_written")
+            and not self._flushing
+            and REPLICA_BIND in (self.app.config.get("SQLALCHEMY_BINDS") or {})
+        ):
+            return self.db.get_engine(self.app, bind=REPLICA_BIND)
+        return super().get_bind(mapper, clause)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_written(session, flush_context):
+    session.info["has_written"] = True
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
 
 metadata = MetaData(naming_convention=convention)
-db = SQLAlchemy(metadata=metadata)
+db = RoutingSQLAlchemy(metadata=metadata)
 migrate = Migrate()
+
+#: Cache of the hot queries of the visuals and slicers. Baked queries are
+#: built and compiled once per process instead of on every callback, only the
+#: parameters change. See `sqlalchemy.ext.baked`.
+bakery = baked.bakery()
+
+
+def use_replica():
+    """
+    Sends the reads of the current session to the read replica, if one is
+    configured, until the session is removed at the end of the request.
+    Only use this where slightly stale data is fine, e.g. for dashboards.
+    """
+    db.session.info["use_replica"] = True
+
+
+def use_primary():
+    """
+    Sends all further queries of the current session to the primary, e.g.
+    after waiting for a task which wrote data the caller needs to read.
+    """
+    db.session.info["use_replica"] = False
+
+
+@contextmanager
+def replica_reads():
+    """ Sends the reads within the block to the read replica, see `use_replica` """
+    previous = db.session.info.get("use_replica", False)
+    use_replica()
+    try:
+        yield
+    finally:
+        db.session.info["use_replica"] = previous
+
+
+def delete_in_batches(
+    table: Table,
+    where: str = "TRUE",
+    params: Optional[dict] = None,
+    batch_size: int = 10000,
+    pause: float = 0.0,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Deletes the rows of a table matching `where` in batches of `batch_size`
+    rows in primary key order. Commits after each batch, so no statement
+    holds its locks for long, and waits `pause` seconds between batches to
+    leave room for other queries. Each batch continues after the last key
+    of the previous one, so it only scans a range of the primary key index
+    instead of all rows left.
+
+    :param table: Table to delete from, e.g. `Model.__table__`.
+    :param where: SQL condition of the rows to delete.
+    :param params: Parameters of `where`.
+    :param batch_size: Maximum number of rows deleted per transaction.
+    :param pause: Seconds to wait between two batches.
+    :param progress: Called with the number of deleted rows after each batch.
+    :return: Number of deleted rows.
+    """
+    key_names = [column.name for column in table.primary_key.columns]
+    key = ", ".join(key_names)
+    last_key = ", ".join(f":last_{name}" for name in key_names)
+
+    def statement(after_last_key: bool):
+        condition = f"({where}) AND ({key}) > ({last_key})" if after_last_key else where
+        return text(
+            f"""
+            DELETE FROM {table.name}
+            WHERE ({key}) IN (
+                SELECT {key} FROM {table.name}
+                WHERE {condition}
+                ORDER BY {key}
+                LIMIT :batch_size
+            )
+            RETURNING {key};"""
+        )
+
+    params = dict(params or {}, batch_size=batch_size)
+    first_batch, next_batch = statement(False), statement(True)
+    deleted_cnt = 0
+    while True:
+        keys = db.session.execute(
+            next_batch if deleted_cnt else first_batch, params
+        ).fetchall()
+        db.session.commit()
+        deleted_cnt += len(keys)
+        if progress is not None:
+            progress(deleted_cnt)
+        if len(keys) < batch_size:
+            return deleted_cnt
+        params.update(
+            {
+                f"last_{name}": value
+                for name, value in zip(key_names, max(map(tuple, keys)))
+            }
+        )
+        if pause:
+            time.sleep(pause)
+
+
+def read_frame(
+    statement, dtype: Optional[Dict] = None, parse_dates: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Loads the result of a query into a DataFrame like `pd.read_sql`, but
+    PostgreSQL writes it as CSV into a buffer with `COPY ... TO STDOUT` and
+    pandas parses it in C, instead of fetching every row as Python objects
+    first. The whole result is held in memory twice while parsing, so use it
+    for results which fit. Uses the connection of the session, so it sees its
+    transaction and reads from the read replica like the session.
+
+    Columns not in `dtype` are inferred like by `pd.read_csv`, so give string
+    columns explicitly. NULLs are NaN, while strings like "" or "NA" are kept.
+    Intervals have to be selected as numbers, e.g. with
+    `db.func.extract("epoch", column)`.
+
+    :param statement: SQLAlchemy selectable, e.g. `query.statement`.
+    :param dtype: Types of columns by name.
+    :param parse_dates: Names of the columns to parse as datetimes.
+    :return: DataFrame with one column per selected column.
+    """
+    connection = db.session.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    buffer = io.StringIO()
+    with connection.connection.cursor() as cursor:
+        query = cursor.mogrify(str(compiled), compiled.params).decode()
+        cursor.copy_expert(
+            f"COPY ({query}) TO STDOUT "
+            f"WITH (FORMAT csv, HEADER, NULL '{COPY_NULL_MARKER}')",
+            buffer,
+        )
+    buffer.seek(0)
+    return pd.read_csv(
+        buffer,
+        dtype=dtype,
+        parse_dates=parse_dates or False,
+        keep_default_na=False,
+        na_values=[COPY_NULL_MARKER],
+    )
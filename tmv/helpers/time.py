@@ -1,5 +1,6 @@
 import logging
 from datetime import datetime, timedelta, time, date
+from typing import List
 import re
 
 
@@ -66,3 +67,19 @@ def td_remove_microseconds(td: timedelta) -> timedelta:
             f" timedelta object. The object was {td}."
         )
         return timedelta(0)
+
+
+def workdays(start: date, end: date) -> List[date]:
+    """
+    Returns all days from `start` to `end` (inclusive) which are not on a
+    weekend.
+
+    :param start: First day.
+    :param end: Last day.
+    :return: List of days from Monday to Friday.
+    """
+    return [
+        start + timedelta(days=i)
+        for i in range((end - start).days + 1)
+        if (start + timedelta(days=i)).weekday() < 5
+    ]
@@ -0,0 +1,55 @@
+"""Add indexes to issue snapshots
+
+Revision ID: 9c3e5d1a7b64
+Revises: e4a1c7f2b9d3
+Create Date: 2026-10-19 11:48:05.127093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9c3e5d1a7b64"
+down_revision = "e4a1c7f2b9d3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY doesn't lock the table for writes,
+    # but can't run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_issue_snapshots_sprint_id_snapshot_day",
+            "issue_snapshots",
+            [
+                "sprint_id",
+                sa.text("date(snapshot_date)"),
+                "issue_id",
+                sa.text("snapshot_date DESC"),
+            ],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_issue_snapshots_sprint_id_snapshot_date",
+            "issue_snapshots",
+            ["sprint_id", "snapshot_date"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_issue_snapshots_sprint_id_snapshot_date",
+            table_name="issue_snapshots",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_issue_snapshots_sprint_id_snapshot_day",
+            table_name="issue_snapshots",
+            postgresql_concurrently=True,
+        )
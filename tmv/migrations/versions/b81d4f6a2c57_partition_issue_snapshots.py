@@ -0,0 +1,207 @@
+"""Partition issue snapshots by month
+
+The snapshots are copied into the new partitioned table in committed
+batches while the old table stays in use. Only the copy of the snapshots
+written meanwhile and the swap of the tables lock issue_snapshots, reads
+are never blocked. Stop the Celery workers during the upgrade though: they
+update and delete snapshots, which isn't carried over once a batch was
+copied. The downgrade copies all snapshots in one transaction, so it
+needs a maintenance window on large databases.
+
+Revision ID: b81d4f6a2c57
+Revises: 7a3c9e2f5d18
+Create Date: 2026-10-19 16:12:05.774213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b81d4f6a2c57"
+down_revision = "7a3c9e2f5d18"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    "id, sprint_id, issue_id, snapshot_date, status, story_points, status_category"
+)
+
+#: Snapshots copied per transaction
+COPY_BATCH_SIZE = 50000
+
+
+def create_indexes(table_name="issue_snapshots", suffix=""):
+    op.create_index(
+        f"ix_issue_snapshots_sprint_id_snapshot_day{suffix}",
+        table_name,
+        [
+            "sprint_id",
+            sa.text("date(snapshot_date)"),
+            "issue_id",
+            sa.text("snapshot_date DESC"),
+        ],
+        unique=False,
+    )
+    op.create_index(
+        f"ix_issue_snapshots_sprint_id_snapshot_date{suffix}",
+        table_name,
+        ["sprint_id", "snapshot_date"],
+        unique=False,
+    )
+
+
+def drop_indexes():
+    op.drop_index(
+        "ix_issue_snapshots_sprint_id_snapshot_date", table_name="issue_snapshots"
+    )
+    op.drop_index(
+        "ix_issue_snapshots_sprint_id_snapshot_day", table_name="issue_snapshots"
+    )
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE TABLE issue_snapshots_partitioned (
+            id INTEGER NOT NULL,
+            sprint_id INTEGER,
+            issue_id INTEGER NOT NULL,
+            snapshot_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            status VARCHAR NOT NULL,
+            story_points NUMERIC(5, 2) NOT NULL,
+            status_category statuscategory,
+            CONSTRAINT pk_issue_snapshots PRIMARY KEY (id, snapshot_date),
+            CONSTRAINT fk_issue_snapshots_sprint_id_sprints FOREIGN KEY (sprint_id)
+                REFERENCES sprints (sprint_id)
+        ) PARTITION BY RANGE (snapshot_date)
+        """
+    )
+    # monthly partitions from the oldest snapshot until 3 months ahead, see
+    # structure.events.create_snapshot_partitions
+    op.execute(
+        "CREATE TABLE issue_snapshots_default "
+        "PARTITION OF issue_snapshots_partitioned DEFAULT"
+    )
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN SELECT generate_series(
+                date_trunc('month', COALESCE(
+                    (SELECT min(snapshot_date) FROM issue_snapshots),
+                    now()
+                )),
+                date_trunc('month', now()) + interval '3 months',
+                interval '1 month'
+            ) LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF issue_snapshots_partitioned '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'issue_snapshots_p' || to_char(month, 'YYYY_MM'),
+                    month,
+                    month + interval '1 month'
+                );
+            END LOOP;
+        END $$
+        """
+    )
+
+    # every statement commits on its own, so no lock is held for long
+    with op.get_context().autocommit_block():
+        copied_id = (
+            op.get_bind().execute("SELECT max(id) FROM issue_snapshots").scalar() or 0
+        )
+        for first_id in range(0, copied_id, COPY_BATCH_SIZE):
+            op.execute(
+                f"INSERT INTO issue_snapshots_partitioned ({COLUMNS}) "
+                f"SELECT {COLUMNS} FROM issue_snapshots "
+                f"WHERE id > {first_id} AND id <= {first_id + COPY_BATCH_SIZE}"
+            )
+        # the new table isn't used yet, so building its indexes blocks nobody
+        create_indexes("issue_snapshots_partitioned", suffix="_new")
+        op.create_index(
+            "ix_issue_snapshots_snapshot_date_new",
+            "issue_snapshots_partitioned",
+            ["snapshot_date"],
+            unique=False,
+            postgresql_using="brin",
+        )
+
+    # swap the tables, after copying the snapshots written meanwhile
+    op.execute("LOCK TABLE issue_snapshots IN EXCLUSIVE MODE")
+    op.execute(
+        f"INSERT INTO issue_snapshots_partitioned ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM issue_snapshots WHERE id > {copied_id}"
+    )
+    op.rename_table("issue_snapshots", "issue_snapshots_unpartitioned")
+    op.rename_table("issue_snapshots_partitioned", "issue_snapshots")
+    # keep the id sequence, the old table would drop it
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            seq text := pg_get_serial_sequence('issue_snapshots_unpartitioned', 'id');
+        BEGIN
+            EXECUTE format(
+                'ALTER TABLE issue_snapshots ALTER COLUMN id SET DEFAULT nextval(%L)',
+                seq
+            );
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY issue_snapshots.id', seq);
+        END $$
+        """
+    )
+    op.drop_table("issue_snapshots_unpartitioned")
+    for name in (
+        "ix_issue_snapshots_sprint_id_snapshot_day",
+        "ix_issue_snapshots_sprint_id_snapshot_date",
+        "ix_issue_snapshots_snapshot_date",
+    ):
+        op.execute(f"ALTER INDEX {name}_new RENAME TO {name}")
+
+    with op.get_context().autocommit_block():
+        op.execute("ANALYZE issue_snapshots")
+
+
+def downgrade():
+    op.drop_index("ix_issue_snapshots_snapshot_date", table_name="issue_snapshots")
+    drop_indexes()
+    op.rename_table("issue_snapshots", "issue_snapshots_partitioned")
+    op.execute(
+        """
+        CREATE TABLE issue_snapshots (
+            id INTEGER NOT NULL,
+            sprint_id INTEGER,
+            issue_id INTEGER NOT NULL,
+            snapshot_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            status VARCHAR NOT NULL,
+            story_points NUMERIC(5, 2) NOT NULL,
+            status_category statuscategory,
+            CONSTRAINT pk_issues PRIMARY KEY (id),
+            CONSTRAINT fk_issues_sprint_id_sprints FOREIGN KEY (sprint_id)
+                REFERENCES sprints (sprint_id)
+        )
+        """
+    )
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            seq text := pg_get_serial_sequence('issue_snapshots_partitioned', 'id');
+        BEGIN
+            EXECUTE format(
+                'ALTER TABLE issue_snapshots ALTER COLUMN id SET DEFAULT nextval(%L)',
+                seq
+            );
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY issue_snapshots.id', seq);
+        END $$
+        """
+    )
+    op.execute(
+        f"INSERT INTO issue_snapshots ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM issue_snapshots_partitioned"
+    )
+    op.drop_table("issue_snapshots_partitioned")
+    create_indexes()
@@ -1,7 +1,8 @@
 import logging
 from typing import List, Optional, Union
 from flask_security import current_user
-from database import db
+from sqlalchemy import bindparam
+from database import bakery, db
 
 from structure.organization import Team
 from structure.events import Sprint
@@ -18,6 +19,24 @@ ALL_ITEMS_OPTION_ID = -1
 
 IntOrList = Union[List[int], int]
 
+# Teams with the IDs `team_ids` as dropdown options
+_teams_query = bakery(
+    lambda session: session.query(Team.team_id.label("value"), Team.name.label("label"))
+)
+_teams_query += lambda q: q.filter(
+    Team.team_id.in_(bindparam("team_ids", expanding=True))
+).order_by(Team.name)
+
+# Sprints of the teams with the IDs `team_ids` as dropdown options
+_sprints_query = bakery(
+    lambda session: session.query(
+        Sprint.sprint_id.label("value"), Sprint.name.label("label")
+    ).join(Activity, Activity.activity_id == Sprint.activity_id)
+)
+_sprints_query += lambda q: q.filter(
+    Activity.team_id.in_(bindparam("team_ids", expanding=True))
+).order_by(Sprint.start_date.desc())
+
 
 def team_picker(
     selected_teams: Optional[IntOrList] = None,
@@ -38,9 +57,8 @@ def team_picker(
     # Controls for filtering by team
     # Query all teams from database
     teams = (
-        Team.query.with_entities(Team.team_id.label("value"), Team.name.label("label"))
-        .filter(Team.team_id.in_(current_user.listable_team_ids))
-        .order_by(Team.name)
+        _teams_query(db.session())
+        .params(team_ids=list(current_user.listable_team_ids))
         .all()
     )
 
@@ -93,9 +111,8 @@ def department_picker(
 
     # Query database for a list of all departments
     departments = (
-        Team.query.with_entities(Team.team_id.label("value"), Team.name.label("label"))
-        .filter(Team.team_id.in_(current_user.listable_department_ids))
-        .order_by(Team.name)
+        _teams_query(db.session())
+        .params(team_ids=list(current_user.listable_department_ids))
         .all()
     )
 
@@ -153,15 +170,9 @@ def sprint_picker(
 
     # Controls for filtering by sprint
     if filter_sprints is None:
-        activities_subq = (
-            Activity.query.filter(Activity.team_id.in_(current_user.readable_team_ids))
-            .with_entities(Activity.activity_id)
-            .subquery()
-        )
         sprints = (
-            Sprint.query.filter(Sprint.activity_id.in_(activities_subq))
-            .with_entities(Sprint.sprint_id.label("value"), Sprint.name.label("label"))
-            .order_by(Sprint.start_date.desc())
+            _sprints_query(db.session())
+            .params(team_ids=list(current_user.readable_team_ids))
             .all()
         )
     else:
@@ -275,24 +286,16 @@ def callback_update_teams_by_department(
             f" id={selected_department}"
         )
 
-        # If <All departments> was selected, remove the filter (expression
-        #   = True). If a specific department was selected, build a filter
-        #   expression.
+        # If <All departments> was selected, show all listable teams. If a
+        #   specific department was selected, only show its teams.
         if selected_department == ALL_ITEMS_OPTION_ID:
-            department_filter = Team.team_id.in_(current_user.listable_team_ids)
+            team_ids = current_user.listable_team_ids
         else:
-            department_filter = Team.team_id.in_(
-                current_user.get_listable_department_team_ids(selected_department)
+            team_ids = current_user.get_listable_department_team_ids(
+                selected_department
             )
 
-        teams = (
-            Team.query.with_entities(
-                Team.team_id.label("value"), Team.name.label("label")
-            )
-            .filter(department_filter)
-            .order_by(Team.name)
-            .all()
-        )
+        teams = _teams_query(db.session()).params(team_ids=list(team_ids)).all()
 
         team_picker_options = [team._asdict() for team in teams]
 
@@ -332,20 +335,10 @@ def callback_update_sprints_by_team(app, team_picker_id: str, sprint_picker_id:
         logging.debug(
             f"Burnup:update_sprint_picker fired with team" f" id={selected_team}"
         )
-        activities_subq = (
-            Activity.query.filter(
-                (Activity.team_id == selected_team)
-                & (Activity.team_id.in_(current_user.readable_team_ids))
-            )
-            .with_entities(Activity.activity_id)
-            .subquery()
-        )
-        sprints = (
-            Sprint.query.filter(Sprint.activity_id.in_(activities_subq))
-            .with_entities(Sprint.sprint_id.label("value"), Sprint.name.label("label"))
-            .order_by(Sprint.start_date.desc())
-            .all()
+        team_ids = (
+            [selected_team] if selected_team in current_user.readable_team_ids else []
         )
+        sprints = _sprints_query(db.session()).params(team_ids=team_ids).all()
         if not sprints:
             return [], None, "1"
 
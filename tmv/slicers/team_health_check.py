@@ -1,13 +1,11 @@
 from typing import Optional, Tuple, List, Any
-import pandas as pd
 import plotly.graph_objects as go
 from dash.dependencies import Input, Output
 from flask_security import current_user
 
-from database import db
-from sqlalchemy import func, desc
-from structure.organization import Team
-from structure.measurements import THCMeasurement
+from database import db, read_frame
+from sqlalchemy import desc
+from structure.measurements import THCSession
 
 from dash_bootstrap_components import ButtonGroup
 import tmv_dash_components as tdc
@@ -96,18 +94,18 @@ def thc_session_picker(
     controls = []
     selected_sessions = (selected_session1, selected_cmp_session)
 
-    # Query sessions from DB & add min-/max date for measurement
-    sessions = pd.read_sql(
+    # Query sessions of the readable teams from the session catalogue
+    sessions = read_frame(
         db.session.query(
-            THCMeasurement.session_name.label("session"),
-            func.min(THCMeasurement.measurement_date).label("min_date"),
-            func.max(THCMeasurement.measurement_date).label("max_date"),
+            THCSession.session_name.label("session"),
+            THCSession.min_date,
+            THCSession.max_date,
         )
-        .filter(Team.team_id.in_(current_user.readable_team_ids))
-        .group_by(THCMeasurement.session_name)
-        .order_by(desc("min_date"))  # Order sessions from newest to oldest
+        .filter(THCSession.team_ids.overlap(current_user.readable_team_ids))
+        .order_by(desc(THCSession.min_date))  # Order sessions from newest to oldest
         .statement,
-        db.session.bind,
+        dtype={"session": str},
+        parse_dates=["min_date", "max_date"],
     )
 
     # Add controls to list
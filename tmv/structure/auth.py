@@ -61,7 +61,8 @@ class CustomAnonymousUser(AnonymousUser):
 
     @property
     def readable_team_ids(self):
-        return self.readable_teams.with_entities(Team.team_id)
+        # a list like for users, so it can be bound to cached queries
+        return []
 
     @property
     def writable_teams(self):
@@ -152,8 +153,7 @@ class User(db.Model, UserMixin):
 
     def get_listable_department_team_ids(self, department_id):
         """All teams user can see in selected department"""
-        result = load_team_tree_permissions(self)
-        return get_department_team_ids_from_team_tree(result, self, department_id)
+        return load_department_team_ids(self, department_id)
 
     @property
     def writable_teams(self):
@@ -279,29 +279,40 @@ def load_team_tree_permissions(user: User) -> TeamTreeResult:
 
     if user.is_superadmin:
         result = db.session.execute(
-            text("""SELECT team_id, parent_id, NULL FROM teams;""")
+            text("""SELECT team_id, parent_id, NULL FROM teams;""").columns()
         )
     else:
-        # for each team we have defined access, load all parents and all children
-        # parents are needed for department picker (included even if no access to dep)
-        # children are needed if access is given on department level
+        # all teams in the trees of the teams the user has a role for: parents
+        # are needed for department picker (included even if no access to
+        # dep), children are needed if access is given on department level.
+        # The role of a team is the role of its nearest ancestor with one.
         result = db.session.execute(
             text(
                 """
-                WITH RECURSIVE team_tree AS (
-                    SELECT t.team_id, t.parent_id, ut.role
-                        FROM user_team AS ut, teams AS t
-                        WHERE t.team_id = ut.team_id AND ut.user_id = :user_id
-                    UNION
-                        SELECT x.team_id, x.parent_id, b.role
-                        FROM team_tree tt, teams x
-                        LEFT JOIN user_team AS b ON (
-                            b.team_id = x.team_id
-                            AND b.user_id = :user_id
-                        )
-                        WHERE x.team_id = tt.parent_id OR tt.team_id = x.parent_id
-                ) SELECT * FROM team_tree;"""
-            ),
+                SELECT t.team_id, t.parent_id, (
+                    SELECT b.role
+                    FROM team_closure AS a
+                    JOIN user_team AS b ON (
+                        b.team_id = a.ancestor_id
+                        AND b.user_id = :user_id
+                    )
+                    WHERE a.descendant_id = t.team_id
+                    ORDER BY a.depth
+                    LIMIT 1
+                )
+                FROM teams AS t
+                WHERE t.team_id IN (
+                    SELECT down.descendant_id
+                    FROM user_team AS ut
+                    JOIN team_closure AS up ON up.descendant_id = ut.team_id
+                    JOIN teams AS root ON (
+                        root.team_id = up.ancestor_id
+                        AND root.parent_id IS NULL
+                    )
+                    JOIN team_closure AS down ON down.ancestor_id = root.team_id
+                    WHERE ut.user_id = :user_id
+                );"""
+            ).columns(),
             {"user_id": user.id},
         )
 
@@ -315,11 +326,6 @@ def load_team_tree_permissions(user: User) -> TeamTreeResult:
             team_parents[team_id] = parent_id
             team_children[parent_id].add(team_id)
 
-    for team_id, role in team_roles.items():
-        if role is not None:
-            continue
-        team_roles[team_id] = find_role_from_parents(team_roles, team_parents, team_id)
-
     return TeamTreeResult(team_roles, team_parents, team_children)
 
 
@@ -368,3 +374,38 @@ def get_department_team_ids_from_team_tree(
             selected_department_team_ids.append(checking_team_id)
 
     return selected_department_team_ids
+
+
+def load_department_team_ids(user: User, department_id: int):
+    """
+    Returns the sub-teams without children of a department which the user
+    has access to, like `get_department_team_ids_from_team_tree`, with one
+    query on the `team_closure`.
+    """
+    result = db.session.execute(
+        text(
+            """
+            SELECT d.descendant_id
+            FROM team_closure AS d
+            WHERE d.ancestor_id = :department_id AND d.depth > 0
+                AND NOT EXISTS (
+                    SELECT 1 FROM teams AS c WHERE c.parent_id = d.descendant_id
+                )
+                AND (
+                    :is_superadmin
+                    OR EXISTS (
+                        SELECT 1
+                        FROM team_closure AS a
+                        JOIN user_team AS b ON b.team_id = a.ancestor_id
+                        WHERE a.descendant_id = d.descendant_id
+                            AND b.user_id = :user_id
+                    )
+                );"""
+        ).columns(),
+        {
+            "department_id": department_id,
+            "is_superadmin": user.is_superadmin,
+            "user_id": user.id,
+        },
+    )
+    return [team_id for team_id, in result]
@@ -1,13 +1,17 @@
-from datetime import datetime, timedelta
+import re
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 from enum import Enum
+from typing import Callable, Dict, List, Optional
 
 from dateutil.tz import tzutc
 from dateutil.utils import default_tzinfo
-from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy import select, or_
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
 
-from database import db
-from structure.project import StatusCategoryStatusMapping
+from database import db, delete_in_batches
+from helpers.time import workdays
+from structure.project import StatusCategory, StatusCategoryStatusMapping
 
 
 class Sprint(db.Model):
@@ -35,9 +39,19 @@ class Sprint(db.Model):
 
     sp_plan = db.Column(db.Integer)
 
+    # Set when the sprint was finalized: its snapshots are compacted, its
+    # charts are stored in SprintSeries and it won't be synced anymore.
+    frozen_at = db.Column(db.DateTime, nullable=True)
+    # Set when the daily snapshots of the frozen sprint were moved to the
+    # Parquet archive, see `structure.snapshot_archive`.
+    archived_at = db.Column(db.DateTime, nullable=True)
+
     # Set up relationship between Sprints belonging to teams
     activity = db.relationship("Activity", back_populates="sprints")
     issue_snapshots = db.relationship("IssueSnapshot", backref="sprint")
+    series = db.relationship(
+        "SprintSeries", uselist=False, backref="sprint", passive_deletes=True
+    )
 
     @property
     def tz_last_updated(self):
@@ -55,10 +69,28 @@ class Sprint(db.Model):
     def is_closed(self):
         return self.state == self.State.CLOSED.value
 
+    @property
+    def is_frozen(self):
+        return self.frozen_at is not None
+
+    @property
+    def is_archived(self):
+        return self.archived_at is not None
+
+    @property
+    def should_be_finalized(self):
+        # finalize closed sprints which were synced after they were completed
+        return (
+            self.is_closed
+            and not self.is_frozen
+            and self.last_updated is not None
+            and self.last_updated >= (self.complete_date or self.end_date)
+        )
+
     @property
     def should_be_updated(self):
-        # don't update if sprint is in the future
-        if self.is_future:
+        # don't update if sprint is in the future or frozen
+        if self.is_future or self.is_frozen:
             return False
 
         # update if sprint has never been updated
@@ -76,68 +108,1001 @@ class Sprint(db.Model):
             return self.last_updated < (self.complete_date or self.end_date)
 
 
+class SprintSeries(db.Model):
+    """
+    Final chart data of a frozen sprint. `series` holds one plotly figure
+    (data & layout) per sprint visual, e.g. `{"burnup": {...}}`.
+    """
+
+    __tablename__ = "sprint_series"
+
+    sprint_id = db.Column(
+        db.Integer,
+        db.ForeignKey("sprints.sprint_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    series = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<Sprint Series: sprint_id={self.sprint_id} "
+            f"visuals={list(self.series)} created_at={self.created_at}>"
+        )
+
+
 class IssueSnapshot(db.Model):
+    """
+    State of an issue at `snapshot_date`. The table is partitioned by month
+    of `snapshot_date`, see `create_snapshot_partitions`.
+    """
+
     __tablename__ = "issue_snapshots"
 
-    id = db.Column(db.Integer, primary_key=True, nullable=False)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True, nullable=False)
     sprint_id = db.Column(db.Integer, db.ForeignKey("sprints.sprint_id"), nullable=True)
 
     issue_id = db.Column(db.Integer, nullable=False)
-    snapshot_date = db.Column(db.DateTime, nullable=False)
+    # part of the primary key as the partition key has to be
+    snapshot_date = db.Column(db.DateTime, primary_key=True, nullable=False)
     status = db.Column(db.String, nullable=False)
     story_points = db.Column(
         db.Numeric(precision=5, scale=2), nullable=False, default=0
     )
+    # Status category of `status` based on StatusCategoryStatusMapping,
+    # set before the snapshot is written. See `resolve_status_categories`.
+    status_category = db.Column(db.Enum(StatusCategory), nullable=True)
 
-    @hybrid_property
-    def status_category(self):
-        """
-        Gets the status_category mapping based on StatusCategoryStatusMapping.
-        Selected mapping is based on the ff (in order):
-
-        1. If a matching mapping is set for Activity
-        2. If a matching mapping is set by default (activity_id = None)
-        3. If no match, return None
-        """
-        status_category_mapping = (
-            StatusCategoryStatusMapping.query.filter(
-                StatusCategoryStatusMapping.status == self.status,
-                or_(
-                    StatusCategoryStatusMapping.activity_id
-                    == self.sprint.activity.activity_id,
-                    StatusCategoryStatusMapping.activity_id.is_(None),
-                ),
-            )
-            .order_by(StatusCategoryStatusMapping.activity_id.asc())
-            .first()
-        )
-        if status_category_mapping:
-            return status_category_mapping.status_category
-        else:
-            return None
+    __table_args__ = (
+        # last snapshot per issue & day of a sprint, as used by the sprint visuals
+        db.Index(
+            "ix_issue_snapshots_sprint_id_snapshot_day",
+            sprint_id,
+            db.func.date(snapshot_date),
+            issue_id,
+            snapshot_date.desc(),
+        ),
+        # latest snapshots of a sprint
+        db.Index(
+            "ix_issue_snapshots_sprint_id_snapshot_date", sprint_id, snapshot_date
+        ),
+        # snapshots are appended in time order, so BRIN is enough for date ranges
+        db.Index(
+            "ix_issue_snapshots_snapshot_date", snapshot_date, postgresql_using="brin"
+        ),
+        {"postgresql_partition_by": "RANGE (snapshot_date)"},
+    )
 
-    @status_category.expression
-    def status_category(cls):  # pylint: disable=no-self-argument
+    def __repr__(self):
         return (
-            select([StatusCategoryStatusMapping.status_category])
-            .where(cls.status == StatusCategoryStatusMapping.status,)
-            .where(
-                or_(
-                    StatusCategoryStatusMapping.activity_id.in_(
-                        select([Sprint.activity_id])
-                        .where(cls.sprint_id == Sprint.sprint_id)
-                        .as_scalar()
-                    ),
-                    StatusCategoryStatusMapping.activity_id.is_(None),
+            f"<Issue Snapshot: issue_id={self.issue_id} snapshot_date={self.snapshot_date} "
+            f"status={self.status} story_points={self.story_points}>"
+        )
+
+
+def find_snapshot_gaps(
+    activity_id: Optional[int] = None, retention_months: Optional[int] = None
+) -> Dict[int, List[date]]:
+    """
+    Finds the workdays of synced sprints for which there are no issue snapshots.
+
+    This runs a single query: per sprint, the days with snapshots are framed
+    by the day before the sprint started and the day after it ended (or
+    today) and compared to the previous day with `LAG`. Every jump of more
+    than one day is a gap. Sprints which were never synced
+    (`last_updated` is NULL) are ignored, they have no data at all. So are
+    frozen sprints, they can't be synced anymore. Days before the snapshot
+    retention are no gaps, their partitions were removed on purpose.
+
+    :param activity_id: Only look at sprints of this activity if given.
+    :param retention_months: `SNAPSHOT_RETENTION_MONTHS`, if set.
+    :return: Missing workdays by sprint_id.
+    """
+    result = db.session.execute(
+        text(
+            """
+            WITH bounds AS (
+                SELECT * FROM (
+                    SELECT sprint_id,
+                        GREATEST(date(start_date), :retained_from) AS first_day,
+                        date(LEAST(COALESCE(complete_date, end_date, :now), :now))
+                            AS last_day
+                    FROM sprints
+                    WHERE state != 'future'
+                        AND start_date IS NOT NULL
+                        AND last_updated IS NOT NULL
+                        AND frozen_at IS NULL
+                        AND (:activity_id IS NULL OR activity_id = :activity_id)
+                ) AS b
+                WHERE first_day <= last_day
+            ), days AS (
+                    SELECT sprint_id, first_day - 1 AS day FROM bounds
+                UNION
+                    SELECT sprint_id, last_day + 1 AS day FROM bounds
+                UNION
+                    SELECT s.sprint_id, date(s.snapshot_date) AS day
+                    FROM issue_snapshots AS s
+                    JOIN bounds AS b ON b.sprint_id = s.sprint_id
+                    WHERE date(s.snapshot_date) BETWEEN b.first_day AND b.last_day
+            ), steps AS (
+                SELECT sprint_id, day,
+                    LAG(day) OVER (PARTITION BY sprint_id ORDER BY day) AS prev_day
+                FROM days
+            ) SELECT sprint_id, prev_day + 1 AS gap_start, day - 1 AS gap_end
+                FROM steps
+                WHERE day - prev_day > 1
+                ORDER BY sprint_id, gap_start;"""
+        ),
+        {
+            "now": datetime.now(tzutc()).replace(tzinfo=None),
+            "activity_id": activity_id,
+            "retained_from": (
+                snapshot_retention_start(retention_months)
+                if retention_months is not None
+                else None
+            ),
+        },
+    )
+
+    # weekends are not synced (see JiraSync.plan_sprint_backfill)
+    gaps = defaultdict(list)
+    for sprint_id, gap_start, gap_end in result:
+        gaps[sprint_id] += workdays(gap_start, gap_end)
+    return {sprint_id: days for sprint_id, days in gaps.items() if days}
+
+
+def compact_sprint_snapshots(sprint_id: int) -> int:
+    """
+    Deletes all but the last snapshot per issue and day of a sprint. The
+    sprint charts only use these, see `DailyIssueSnapshot`. Of snapshots
+    with the same `snapshot_date`, the one with the highest id is kept, like
+    by `compact_snapshot_day` and `upsert_daily_issue_snapshots`.
+
+    :param sprint_id: ID of the sprint to compact.
+    :return: Number of deleted snapshots.
+    """
+    result = db.session.execute(
+        text(
+            """
+            DELETE FROM issue_snapshots
+            WHERE sprint_id = :sprint_id AND id NOT IN (
+                SELECT DISTINCT ON (date(snapshot_date), issue_id) id
+                FROM issue_snapshots
+                WHERE sprint_id = :sprint_id
+                ORDER BY date(snapshot_date), issue_id, snapshot_date DESC, id DESC
+            );"""
+        ),
+        {"sprint_id": sprint_id},
+    )
+    return result.rowcount
+
+
+def freeze_sprint(sprint: Sprint, series: dict) -> int:
+    """
+    Finalizes a closed sprint:
+
+    1. Stores its charts in `SprintSeries`, so they load from a single record.
+    2. Compacts the issue snapshots to one per issue and day.
+    3. Marks the sprint as frozen, so it doesn't get synced anymore.
+
+    Commits.
+
+    :param sprint: Sprint to freeze. Should fulfill `sprint.should_be_finalized`.
+    :param series: Charts of the sprint, see
+                   `visuals.sprint_series.render_sprint_series`.
+    :return: Number of deleted snapshots.
+    """
+    time_now = datetime.now(tzutc())
+    db.session.merge(
+        SprintSeries(sprint_id=sprint.sprint_id, series=series, created_at=time_now)
+    )
+    deleted_cnt = compact_sprint_snapshots(sprint.sprint_id)
+    sprint.frozen_at = time_now
+    db.session.commit()
+    return deleted_cnt
+
+
+def compact_snapshot_day(day: date, batch_size: int = 10000) -> int:
+    """
+    Deletes all but the last snapshot per sprint, issue and day for a single
+    day, like `compact_sprint_snapshots` does for a whole sprint. Deletes at
+    most `batch_size` snapshots per transaction and commits after each batch.
+
+    :param day: Day to compact.
+    :param batch_size: Maximum number of snapshots deleted per transaction.
+    :return: Number of deleted snapshots.
+    """
+    params = {
+        "start": datetime.combine(day, datetime.min.time()),
+        "end": datetime.combine(day + timedelta(days=1), datetime.min.time()),
+        "batch_size": batch_size,
+    }
+    deleted_cnt = 0
+    while True:
+        # the date range on both levels lets PostgreSQL skip other partitions
+        result = db.session.execute(
+            text(
+                """
+                DELETE FROM issue_snapshots
+                WHERE snapshot_date >= :start AND snapshot_date < :end
+                    AND id IN (
+                        SELECT id FROM (
+                            SELECT id, row_number() OVER (
+                                PARTITION BY sprint_id, issue_id
+                                ORDER BY snapshot_date DESC, id DESC
+                            ) AS position
+                            FROM issue_snapshots
+                            WHERE snapshot_date >= :start AND snapshot_date < :end
+                        ) AS ranked
+                        WHERE position > 1
+                        LIMIT :batch_size
+                    );"""
+            ),
+            params,
+        )
+        db.session.commit()
+        deleted_cnt += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted_cnt
+
+
+#: Tables with rows per sprint, in the order they are deleted before the sprints
+SPRINT_DATA_TABLES = [
+    "issue_snapshots",
+    "daily_issue_snapshots",
+    "sprint_daily_rollups",
+    "m_burndown",
+    "sprint_series",
+]
+
+
+def delete_activity_sprints(
+    activity_id: int,
+    batch_size: int = 10000,
+    pause: float = 0.0,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, int]:
+    """
+    Deletes the sprints of an activity with their snapshots, rollups,
+    burndown measurements and series. Each table is deleted in batches, see
+    `database.delete_in_batches`. Commits after each batch.
+
+    :param activity_id: ID of the activity.
+    :param batch_size: Maximum number of rows deleted per transaction.
+    :param pause: Seconds to wait between two batches.
+    :param progress: Called with the table name and the number of its
+                     deleted rows after each batch.
+    :return: Number of deleted rows by table name, including "sprints".
+    """
+    sprint_ids = [
+        sprint_id
+        for sprint_id, in db.session.query(Sprint.sprint_id).filter(
+            Sprint.activity_id == activity_id
+        )
+    ]
+    deleted = dict()
+    for table_name, where, params in [
+        (name, "sprint_id = ANY(:sprint_ids)", {"sprint_ids": sprint_ids})
+        for name in SPRINT_DATA_TABLES
+    ] + [("sprints", "activity_id = :activity_id", {"activity_id": activity_id})]:
+        deleted[table_name] = delete_in_batches(
+            db.metadata.tables[table_name],
+            where,
+            params,
+            batch_size=batch_size,
+            pause=pause,
+            progress=(
+                (lambda cnt, name=table_name: progress(name, cnt))
+                if progress is not None
+                else None
+            ),
+        )
+    return deleted
+
+
+#: Name of the monthly partitions of issue_snapshots, by first day of the month
+SNAPSHOT_PARTITION_NAME = "issue_snapshots_p{month:%Y_%m}"
+SNAPSHOT_PARTITION_PATTERN = re.compile(r"issue_snapshots_p(\d{4})_(\d{2})")
+
+
+def get_snapshot_partitions() -> Dict[date, str]:
+    """
+    Returns the monthly partitions of issue_snapshots by their first day.
+    The default partition, holding snapshots outside of all months, is left out.
+    """
+    result = db.session.execute(
+        text(
+            """
+            SELECT c.relname
+            FROM pg_inherits AS i
+            JOIN pg_class AS c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'issue_snapshots'::regclass;"""
+        )
+    )
+    partitions = dict()
+    for (name,) in result:
+        match = SNAPSHOT_PARTITION_PATTERN.fullmatch(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+def _next_month(month: date) -> date:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def create_snapshot_partitions(
+    months_ahead: int = 3, since: Optional[date] = None
+) -> List[str]:
+    """
+    Creates the monthly partitions of issue_snapshots from the current month
+    (or the month of `since`) up to `months_ahead` months ahead, if they
+    don't exist yet. Also creates the partitions of the months which have
+    snapshots in the default partition `issue_snapshots_default`, e.g. as
+    the daily task missed a month. Snapshots outside of all partitions end
+    up there.
+
+    A new partition must not overlap rows of the default partition, so the
+    rows of its month are moved out of it first and back into the new
+    partition afterwards, in the same transaction. Commits after each
+    partition.
+
+    :param months_ahead: Number of months after the current one to create.
+    :param since: Create the partitions from the month of this day if given,
+                  e.g. before a sprint is backfilled.
+    :return: Names of the created partitions.
+    """
+    existing = get_snapshot_partitions()
+    this_month = datetime.now(tzutc()).date().replace(day=1)
+    last_month = this_month
+    for _ in range(months_ahead):
+        last_month = _next_month(last_month)
+    month = this_month
+    if since is not None:
+        month = min(date(since.year, since.month, 1), this_month)
+    months = set()
+    while month <= last_month:
+        months.add(month)
+        month = _next_month(month)
+    result = db.session.execute(
+        text(
+            """
+            SELECT DISTINCT date_trunc('month', snapshot_date)::date
+            FROM issue_snapshots_default;"""
+        ).columns()
+    )
+    months.update(month for month, in result)
+
+    created = []
+    for month in sorted(months - set(existing)):
+        name = SNAPSHOT_PARTITION_NAME.format(month=month)
+        next_month = _next_month(month)
+        db.session.execute(
+            text(
+                f"""
+                LOCK TABLE issue_snapshots_default IN EXCLUSIVE MODE;
+                CREATE TEMPORARY TABLE moved_issue_snapshots
+                    (LIKE issue_snapshots);
+                WITH moved AS (
+                    DELETE FROM issue_snapshots_default
+                    WHERE snapshot_date >= :start AND snapshot_date < :end
+                    RETURNING *
+                ) INSERT INTO moved_issue_snapshots SELECT * FROM moved;
+                CREATE TABLE {name} PARTITION OF issue_snapshots
+                FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}');
+                INSERT INTO issue_snapshots SELECT * FROM moved_issue_snapshots;
+                DROP TABLE moved_issue_snapshots;"""
+            ),
+            {"start": month, "end": next_month},
+        )
+        db.session.commit()
+        created.append(name)
+    return created
+
+
+def snapshot_retention_start(retention_months: int) -> date:
+    """
+    Returns the first day of the oldest month whose snapshot partition is
+    kept by `drop_expired_snapshot_partitions`.
+
+    :param retention_months: Number of full months to keep before the current one.
+    """
+    first_kept = datetime.now(tzutc()).date().replace(day=1)
+    for _ in range(retention_months):
+        first_kept = (first_kept - timedelta(days=1)).replace(day=1)
+    return first_kept
+
+
+def drop_expired_snapshot_partitions(
+    retention_months: int, archive: bool = True
+) -> List[str]:
+    """
+    Removes the monthly partitions of issue_snapshots which ended more than
+    `retention_months` months ago. This replaces row-level deletes of old
+    snapshots. The sprint visuals keep working, they read the
+    SprintDailyRollups.
+
+    :param retention_months: Number of full months to keep before the current one.
+    :param archive: If True, the partitions are detached and kept as
+        standalone tables named `archived_<partition>`, e.g. to be dumped and
+        dropped manually. If False, they are dropped.
+    :return: Names of the removed partitions.
+    """
+    first_kept = snapshot_retention_start(retention_months)
+    removed = []
+    for month, name in sorted(get_snapshot_partitions().items()):
+        if month >= first_kept:
+            continue
+        if archive:
+            db.session.execute(
+                text(
+                    f"""
+                    ALTER TABLE issue_snapshots DETACH PARTITION {name};
+                    ALTER TABLE {name}
+                        DROP CONSTRAINT IF EXISTS fk_issue_snapshots_sprint_id_sprints;
+                    ALTER TABLE {name} RENAME TO archived_{name};"""
                 )
             )
-            .order_by(StatusCategoryStatusMapping.activity_id.asc())
-            .limit(1)
-            .as_scalar()
+        else:
+            db.session.execute(text(f"DROP TABLE {name};"))
+        removed.append(name)
+    db.session.commit()
+    return removed
+
+
+def delete_expired_snapshots(retention_months: int, batch_size: int = 10000) -> int:
+    """
+    Deletes the issue snapshots before the retention which are outside of
+    the monthly partitions, i.e. in the default partition, in batches (see
+    `database.delete_in_batches`). Unlike the partitions, they aren't
+    archived. Run after `drop_expired_snapshot_partitions`, so the expired
+    partitions are gone and only the default partition is scanned.
+
+    :param retention_months: Number of full months to keep before the current one.
+    :param batch_size: Maximum number of snapshots deleted per transaction.
+    :return: Number of deleted snapshots.
+    """
+    return delete_in_batches(
+        IssueSnapshot.__table__,
+        "snapshot_date < :first_kept",
+        {"first_kept": snapshot_retention_start(retention_months)},
+        batch_size=batch_size,
+    )
+
+
+class DailyIssueSnapshot(db.Model):
+    """
+    Last IssueSnapshot per sprint, issue and day, i.e. the state of the
+    issue at the end of the day. Maintained whenever snapshots are written
+    (see `_process_new_snapshots`), so nothing has to pick it from the
+    hourly snapshots with `DISTINCT ON` anymore. The SprintDailyRollups are
+    aggregated from it.
+    """
+
+    __tablename__ = "daily_issue_snapshots"
+
+    sprint_id = db.Column(
+        db.Integer,
+        db.ForeignKey("sprints.sprint_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day = db.Column(db.Date, primary_key=True)
+    issue_id = db.Column(db.Integer, primary_key=True)
+    snapshot_date = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String, nullable=False)
+    status_category = db.Column(db.Enum(StatusCategory), nullable=True)
+    story_points = db.Column(
+        db.Numeric(precision=5, scale=2), nullable=False, default=0
+    )
+
+    def __repr__(self):
+        return (
+            f"<Daily Issue Snapshot: sprint_id={self.sprint_id} day={self.day} "
+            f"issue_id={self.issue_id} status={self.status} "
+            f"story_points={self.story_points}>"
         )
 
+
+class SprintDailyRollup(db.Model):
+    """
+    Story points and number of issues per sprint, day and status, summed
+    over the DailyIssueSnapshots. The sprint visuals read these instead of
+    the issue snapshots. Rows are upserted per sprint and day whenever
+    snapshots of that day are written.
+    """
+
+    __tablename__ = "sprint_daily_rollups"
+
+    sprint_id = db.Column(
+        db.Integer,
+        db.ForeignKey("sprints.sprint_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String, primary_key=True)
+    status_category = db.Column(db.Enum(StatusCategory), nullable=True)
+    story_points = db.Column(
+        db.Numeric(precision=8, scale=2), nullable=False, default=0
+    )
+    issue_count = db.Column(db.Integer, nullable=False, default=0)
+
     def __repr__(self):
         return (
-            f"<Issue Snapshot: issue_id={self.issue_id} snapshot_date={self.snapshot_date} "
-            f"status={self.status} story_points={self.story_points}>"
+            f"<Sprint Daily Rollup: sprint_id={self.sprint_id} day={self.day} "
+            f"status={self.status} story_points={self.story_points} "
+            f"issue_count={self.issue_count}>"
+        )
+
+
+def upsert_daily_issue_snapshots(
+    snapshot_ids: List[int], first_date: datetime, last_date: datetime, session=None,
+):
+    """
+    Updates the DailyIssueSnapshots with the given issue snapshots where
+    these are later than the stored ones, without committing.
+
+    :param snapshot_ids: IDs of the written issue snapshots.
+    :param first_date: Earliest `snapshot_date` of the snapshots.
+    :param last_date: Latest `snapshot_date` of the snapshots.
+    :param session: Session to use, defaults to `db.session`.
+    """
+    session = session or db.session
+    # the date range lets PostgreSQL skip the other partitions
+    session.execute(
+        text(
+            """
+            INSERT INTO daily_issue_snapshots (sprint_id, day, issue_id,
+                snapshot_date, status, status_category, story_points)
+            SELECT DISTINCT ON (sprint_id, date(snapshot_date), issue_id)
+                sprint_id, date(snapshot_date), issue_id,
+                snapshot_date, status, status_category, story_points
+            FROM issue_snapshots
+            WHERE id = ANY(:ids) AND sprint_id IS NOT NULL
+                AND snapshot_date BETWEEN :first_date AND :last_date
+            ORDER BY sprint_id, date(snapshot_date), issue_id,
+                snapshot_date DESC, id DESC
+            ON CONFLICT (sprint_id, day, issue_id) DO UPDATE SET
+                snapshot_date = excluded.snapshot_date,
+                status = excluded.status,
+                status_category = excluded.status_category,
+                story_points = excluded.story_points
+            WHERE daily_issue_snapshots.snapshot_date <= excluded.snapshot_date;"""
+        ),
+        {"ids": snapshot_ids, "first_date": first_date, "last_date": last_date},
+    )
+
+
+def refresh_daily_issue_snapshots(sprint_id: int) -> int:
+    """
+    Recalculates the DailyIssueSnapshots of a sprint from its issue
+    snapshots without committing. Days whose snapshots were dropped by the
+    retention policy (see `drop_expired_snapshot_partitions`) are kept.
+
+    :param sprint_id: ID of the sprint to recalculate.
+    :return: Number of written rows.
+    """
+    db.session.execute(
+        text(
+            """
+            DELETE FROM daily_issue_snapshots
+            WHERE sprint_id = :sprint_id AND day IN (
+                SELECT date(snapshot_date)
+                FROM issue_snapshots
+                WHERE sprint_id = :sprint_id
+            );"""
+        ),
+        {"sprint_id": sprint_id},
+    )
+    result = db.session.execute(
+        text(
+            """
+            INSERT INTO daily_issue_snapshots (sprint_id, day, issue_id,
+                snapshot_date, status, status_category, story_points)
+            SELECT DISTINCT ON (date(snapshot_date), issue_id)
+                sprint_id, date(snapshot_date), issue_id,
+                snapshot_date, status, status_category, story_points
+            FROM issue_snapshots
+            WHERE sprint_id = :sprint_id
+            ORDER BY date(snapshot_date), issue_id, snapshot_date DESC, id DESC;"""
+        ),
+        {"sprint_id": sprint_id},
+    )
+    return result.rowcount
+
+
+def refresh_sprint_rollups(
+    sprint_id: int, days: Optional[List[date]] = None, session=None
+) -> int:
+    """
+    Recalculates the SprintDailyRollup rows of a sprint from its
+    DailyIssueSnapshots without committing. The rows are upserted, so
+    concurrent refreshes of the same sprint and day, e.g. by the hourly
+    snapshots and a sync triggered from a dashboard, can't duplicate them.
+
+    :param sprint_id: ID of the sprint to recalculate.
+    :param days: Only recalculate these days if given, else all days.
+    :param session: Session to use, defaults to `db.session`.
+    :return: Number of written rollup rows.
+    """
+    session = session or db.session
+    params = {"sprint_id": sprint_id, "days": days or [], "all_days": days is None}
+    session.execute(
+        text(
+            """
+            DELETE FROM sprint_daily_rollups AS r
+            WHERE sprint_id = :sprint_id AND (:all_days OR day = ANY(:days))
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM daily_issue_snapshots AS d
+                    WHERE d.sprint_id = r.sprint_id AND d.day = r.day
+                        AND d.status = r.status
+                );"""
+        ),
+        params,
+    )
+    result = session.execute(
+        text(
+            """
+            INSERT INTO sprint_daily_rollups
+                (sprint_id, day, status, status_category, story_points, issue_count)
+            SELECT sprint_id, day, status, max(status_category),
+                sum(story_points), count(*)
+            FROM daily_issue_snapshots
+            WHERE sprint_id = :sprint_id AND (:all_days OR day = ANY(:days))
+            GROUP BY sprint_id, day, status
+            ON CONFLICT (sprint_id, day, status) DO UPDATE SET
+                status_category = excluded.status_category,
+                story_points = excluded.story_points,
+                issue_count = excluded.issue_count;"""
+        ),
+        params,
+    )
+    return result.rowcount
+
+
+def refresh_sprint_burndown(
+    sprint_id: int, from_day: Optional[date] = None, session=None
+) -> int:
+    """
+    Recalculates the BurndownMeasurements (`m_burndown`) of a sprint from
+    its DailyIssueSnapshots without committing. Each day is compared to the
+    previous day with snapshots:
+
+    - `sp_not_done`: story points of the issues not done at the end of the day
+    - `sp_added`: story points of the issues which entered the sprint
+    - `sp_swapped`: story points of the issues which left the sprint
+
+    :param sprint_id: ID of the sprint to recalculate.
+    :param from_day: Only recalculate this and the following days if given,
+                     else all days.
+    :param session: Session to use, defaults to `db.session`.
+    :return: Number of written measurements.
+    """
+    session = session or db.session
+    params = {"sprint_id": sprint_id, "from_day": from_day or date.min}
+    session.execute(
+        text(
+            """
+            DELETE FROM m_burndown
+            WHERE sprint_id = :sprint_id AND measurement_date >= :from_day
+                AND date(measurement_date) NOT IN (
+                    SELECT day
+                    FROM daily_issue_snapshots
+                    WHERE sprint_id = :sprint_id
+                );"""
+        ),
+        params,
+    )
+    result = session.execute(
+        text(
+            """
+            WITH days AS (
+                SELECT day, lag(day) OVER (ORDER BY day) AS prev_day
+                FROM (
+                    SELECT DISTINCT day
+                    FROM daily_issue_snapshots
+                    WHERE sprint_id = :sprint_id
+                ) AS d
+            ), changes AS (
+                SELECT days.day,
+                    sum(i.cur_story_points) FILTER (
+                        WHERE i.cur_issue_id IS NOT NULL
+                        AND i.status_category IS DISTINCT FROM 'done'
+                    ) AS sp_not_done,
+                    sum(i.cur_story_points) FILTER (
+                        WHERE i.prev_issue_id IS NULL AND days.prev_day IS NOT NULL
+                    ) AS sp_added,
+                    sum(i.prev_story_points) FILTER (
+                        WHERE i.cur_issue_id IS NULL
+                    ) AS sp_swapped
+                FROM days
+                CROSS JOIN LATERAL (
+                    SELECT cur.issue_id AS cur_issue_id,
+                        cur.story_points AS cur_story_points,
+                        cur.status_category,
+                        prev.issue_id AS prev_issue_id,
+                        prev.story_points AS prev_story_points
+                    FROM (
+                        SELECT * FROM daily_issue_snapshots
+                        WHERE sprint_id = :sprint_id AND day = days.day
+                    ) AS cur
+                    FULL JOIN (
+                        SELECT * FROM daily_issue_snapshots
+                        WHERE sprint_id = :sprint_id AND day = days.prev_day
+                    ) AS prev ON prev.issue_id = cur.issue_id
+                ) AS i
+                WHERE days.day >= :from_day
+                GROUP BY days.day
+            )
+            INSERT INTO m_burndown (measurement_id, measurement_date, activity_id,
+                sprint_id, sp_not_done, sp_added, sp_swapped)
+            SELECT md5(random()::text || clock_timestamp()::text)::uuid,
+                changes.day, sprints.activity_id, :sprint_id,
+                coalesce(changes.sp_not_done, 0),
+                coalesce(changes.sp_added, 0),
+                coalesce(changes.sp_swapped, 0)
+            FROM changes
+            JOIN sprints ON sprints.sprint_id = :sprint_id
+            ON CONFLICT (measurement_date, sprint_id) DO UPDATE SET
+                activity_id = excluded.activity_id,
+                sp_not_done = excluded.sp_not_done,
+                sp_added = excluded.sp_added,
+                sp_swapped = excluded.sp_swapped;"""
+        ),
+        params,
+    )
+    return result.rowcount
+
+
+def rebuild_sprint_rollups(sprint_ids: Optional[List[int]] = None) -> int:
+    """
+    Recalculates all DailyIssueSnapshots, SprintDailyRollup rows and
+    BurndownMeasurements, e.g. after snapshots were written bypassing the
+    ORM. Commits after every sprint.
+
+    :param sprint_ids: Only rebuild these sprints if given. Archived
+                       sprints are skipped.
+    :return: Number of written rollup rows.
+    """
+    # the snapshots of archived sprints are not in the database anymore
+    sprints_q = db.session.query(Sprint.sprint_id).filter(Sprint.archived_at == None)
+    if sprint_ids is not None:
+        sprints_q = sprints_q.filter(Sprint.sprint_id.in_(sprint_ids))
+    sprint_ids = [sprint_id for sprint_id, in sprints_q]
+    row_cnt = 0
+    for sprint_id in sprint_ids:
+        refresh_daily_issue_snapshots(sprint_id)
+        row_cnt += refresh_sprint_rollups(sprint_id)
+        refresh_sprint_burndown(sprint_id)
+        db.session.commit()
+    return row_cnt
+
+
+# Selected mapping is based on the ff (in order):
+# 1. If a matching mapping is set for the Activity of the snapshot's Sprint
+# 2. If a matching mapping is set by default (activity_id = None)
+# 3. If no match, NULL
+_SET_STATUS_CATEGORIES_SQL = """
+    UPDATE issue_snapshots AS s
+    SET status_category = c.status_category
+    FROM (
+        SELECT s2.id, (
+            SELECT m.status_category
+            FROM status_category_status_mappings AS m
+            WHERE m.status = s2.status
+              AND (m.activity_id IS NULL OR m.activity_id = sp.activity_id)
+            ORDER BY m.activity_id ASC
+            LIMIT 1
+        ) AS status_category
+        FROM issue_snapshots AS s2
+        LEFT JOIN sprints AS sp ON sp.sprint_id = s2.sprint_id
+        WHERE {condition}
+    ) AS c
+    WHERE s.id = c.id AND s.status_category IS DISTINCT FROM c.status_category
+    RETURNING s.id, s.status_category
+"""
+
+# Same for the tables derived from the snapshots, which always have a sprint
+_SET_DERIVED_STATUS_CATEGORIES_SQL = """
+    UPDATE {table} AS s
+    SET status_category = (
+        SELECT m.status_category
+        FROM status_category_status_mappings AS m
+        WHERE m.status = s.status
+          AND (m.activity_id IS NULL OR m.activity_id = sp.activity_id)
+        ORDER BY m.activity_id ASC
+        LIMIT 1
+    )
+    FROM sprints AS sp
+    WHERE sp.sprint_id = s.sprint_id AND {condition}
+"""
+
+
+def resolve_status_categories(snapshots: List[IssueSnapshot], session=None):
+    """
+    Sets the status category of new issue snapshots from the
+    StatusCategoryStatusMappings before they are inserted, so the rows
+    don't need to be updated afterwards. A mapping of the activity of the
+    sprint takes precedence over a global one.
+
+    :param snapshots: Snapshots without status category.
+    :param session: Session to use, defaults to `db.session`.
+    """
+    session = session or db.session
+    with session.no_autoflush:
+        sprint_ids = {
+            snapshot.sprint_id
+            for snapshot in snapshots
+            if snapshot.sprint_id is not None
+            and snapshot.__dict__.get("sprint") is None
+        }
+        activity_ids = dict(
+            session.query(Sprint.sprint_id, Sprint.activity_id).filter(
+                Sprint.sprint_id.in_(sprint_ids)
+            )
+            if sprint_ids
+            else []
+        )
+        mappings = {
+            (activity_id, status): status_category
+            for activity_id, status, status_category in session.query(
+                StatusCategoryStatusMapping.activity_id,
+                StatusCategoryStatusMapping.status,
+                StatusCategoryStatusMapping.status_category,
+            ).filter(
+                StatusCategoryStatusMapping.status.in_(
+                    sorted({snapshot.status for snapshot in snapshots})
+                )
+            )
+        }
+
+    # mappings written in the same flush apply as well
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, StatusCategoryStatusMapping):
+            mappings[(obj.activity_id, obj.status)] = obj.status_category
+
+    for snapshot in snapshots:
+        # the sprint may be new in this flush and not have an ID yet
+        sprint = snapshot.__dict__.get("sprint")
+        activity_id = (
+            sprint.activity_id if sprint else activity_ids.get(snapshot.sprint_id)
+        )
+        snapshot.status_category = mappings.get(
+            (activity_id, snapshot.status), mappings.get((None, snapshot.status))
         )
+
+
+def set_status_categories(
+    condition: str, params: dict, session=None
+) -> Dict[int, Optional[StatusCategory]]:
+    """
+    Sets the status category of the issue snapshots matching `condition`
+    from the StatusCategoryStatusMappings. New snapshots written via the
+    ORM get theirs from `resolve_status_categories`; writers bypassing the
+    ORM, e.g. bulk inserts, need to call this for the rows they wrote.
+
+    :param condition: SQL condition on the snapshots, aliased as `s2`.
+    :param params: Parameters of the condition.
+    :param session: Session to use, defaults to `db.session`.
+    :return: Changed status categories by snapshot id.
+    """
+    session = session or db.session
+    rows = session.execute(
+        text(_SET_STATUS_CATEGORIES_SQL.format(condition=condition)), params
+    )
+    return {
+        snapshot_id: StatusCategory[status_category] if status_category else None
+        for snapshot_id, status_category in rows
+    }
+
+
+def recompute_status_categories(
+    statuses: Optional[List[str]] = None, chunk_size: int = 10000
+) -> int:
+    """
+    Recomputes the status categories of all issue snapshots, e.g. after a
+    StatusCategoryStatusMapping changed. Commits after every chunk of
+    `chunk_size` snapshot ids to keep the locks short. The status categories
+    of the DailyIssueSnapshots and SprintDailyRollups and the
+    BurndownMeasurements are updated last.
+
+    :param statuses: Only recompute the snapshots with these statuses if given.
+    :param chunk_size: Range of snapshot ids updated per transaction.
+    :return: Number of snapshots whose status category changed.
+    """
+    min_id, max_id = db.session.query(
+        db.func.min(IssueSnapshot.id), db.func.max(IssueSnapshot.id)
+    ).one()
+
+    status_condition = "TRUE" if statuses is None else "s2.status = ANY(:statuses)"
+    condition = f"s2.id >= :start_id AND s2.id < :end_id AND {status_condition}"
+    derived_condition = "TRUE" if statuses is None else "s.status = ANY(:statuses)"
+    changed_cnt = 0
+    for start_id in range(min_id or 0, (max_id or -1) + 1, chunk_size):
+        changed_cnt += len(
+            set_status_categories(
+                condition,
+                {
+                    "start_id": start_id,
+                    "end_id": start_id + chunk_size,
+                    "statuses": list(statuses or []),
+                },
+            )
+        )
+        db.session.commit()
+
+    for table in (DailyIssueSnapshot.__tablename__, SprintDailyRollup.__tablename__):
+        db.session.execute(
+            text(
+                _SET_DERIVED_STATUS_CATEGORIES_SQL.format(
+                    table=table, condition=derived_condition
+                )
+            ),
+            {"statuses": list(statuses or [])},
+        )
+        db.session.commit()
+
+    # the story points not done depend on the status categories
+    sprint_ids = db.session.execute(
+        text(
+            f"""
+            SELECT DISTINCT sprint_id
+            FROM daily_issue_snapshots AS s
+            WHERE {derived_condition}"""
+        ),
+        {"statuses": list(statuses or [])},
+    ).fetchall()
+    for (sprint_id,) in sprint_ids:
+        refresh_sprint_burndown(sprint_id)
+        db.session.commit()
+    return changed_cnt
+
+
+@event.listens_for(Session, "before_flush")
+def _resolve_new_snapshot_status_categories(session, flush_context, instances):
+    """
+    Sets the status categories of the issue snapshots about to be inserted.
+    """
+    snapshots = [
+        obj
+        for obj in session.new
+        if isinstance(obj, IssueSnapshot) and obj.status_category is None
+    ]
+    if snapshots:
+        resolve_status_categories(snapshots, session=session)
+
+
+@event.listens_for(Session, "after_flush")
+def _process_new_snapshots(session, flush_context):
+    """
+    Updates the DailyIssueSnapshots, SprintDailyRollups and
+    BurndownMeasurements of the days of the issue snapshots just inserted.
+    """
+    snapshots = {obj.id: obj for obj in session.new if isinstance(obj, IssueSnapshot)}
+    if not snapshots:
+        return
+
+    # some writers use aware datetimes in UTC, the column is naive UTC
+    snapshot_dates = {
+        snapshot_id: (
+            snapshot.snapshot_date.astimezone(tzutc()).replace(tzinfo=None)
+            if snapshot.snapshot_date.tzinfo
+            else snapshot.snapshot_date
+        )
+        for snapshot_id, snapshot in snapshots.items()
+    }
+    upsert_daily_issue_snapshots(
+        list(snapshots),
+        min(snapshot_dates.values()),
+        max(snapshot_dates.values()),
+        session=session,
+    )
+
+    days_by_sprint = defaultdict(set)
+    for snapshot_id, snapshot in snapshots.items():
+        if snapshot.sprint_id is not None:
+            days_by_sprint[snapshot.sprint_id].add(snapshot_dates[snapshot_id].date())
+    for sprint_id, days in days_by_sprint.items():
+        refresh_sprint_rollups(sprint_id, sorted(days), session=session)
+        # the day after each changed day is compared with it
+        refresh_sprint_burndown(sprint_id, min(days), session=session)
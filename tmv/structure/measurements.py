@@ -2,8 +2,11 @@ from structure.events import Sprint  # pylint: disable=unused-import
 from structure.project import Activity  # pylint: disable=unused-import
 from functools import total_ordering
 
+from datetime import date
 from enum import Enum
-from sqlalchemy.dialects.postgresql import UUID
+from typing import Iterable, Optional
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from uuid import uuid4
 from database import db
 
@@ -69,6 +72,102 @@ class OTMeasurement(db.Model):
         )
 
 
+class OTMonthlyStatistics(db.Model):
+    """
+    Statistics of the overtime per workday of the members of a team in one
+    month, over the `OTMeasurement` rows of the team and all its sub-teams,
+    so departments roll up their teams. The overtime chart reads these
+    instead of the single measurements. Kept up to date by
+    `refresh_overtime_statistics`.
+    """
+
+    __tablename__ = "m_overtime_monthly"
+
+    # First day of the month
+    month = db.Column(db.Date, primary_key=True)
+    team_id = db.Column(
+        db.Integer,
+        db.ForeignKey("teams.team_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    team = db.relationship("Team")
+
+    # Number of measurements with workdays
+    member_count = db.Column(db.Integer, nullable=False)
+    # Overtime per workday: minimum, quartiles, maximum and mean
+    ot_per_day_min = db.Column(db.Interval, nullable=False)
+    ot_per_day_q1 = db.Column(db.Interval, nullable=False)
+    ot_per_day_median = db.Column(db.Interval, nullable=False)
+    ot_per_day_q3 = db.Column(db.Interval, nullable=False)
+    ot_per_day_max = db.Column(db.Interval, nullable=False)
+    ot_per_day_mean = db.Column(db.Interval, nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<OTMonthlyStatistics: month={self.month}"
+            f", team_id={self.team_id}"
+            f", member_count={self.member_count}"
+            f", ot_per_day_median={self.ot_per_day_median}>"
+        )
+
+
+def refresh_overtime_statistics(months: Optional[Iterable[date]] = None, session=None):
+    """
+    Recomputes the `OTMonthlyStatistics` rows of the months in `months` from
+    the measurements. Every team gets the statistics of the measurements of
+    its whole sub-tree. Measurements without workdays or overtime are left
+    out. Does not commit.
+
+    :param months: Months to refresh, by any date within the month. All
+                   months are refreshed if this is None.
+    :param session: The DB session to use (default: `db.session`).
+    """
+    session = session or db.session
+    params = {
+        "all_months": months is None,
+        "months": sorted({date(month.year, month.month, 1) for month in months or []}),
+    }
+
+    session.execute(
+        text(
+            "DELETE FROM m_overtime_monthly "
+            "WHERE (:all_months OR month = ANY(:months))"
+        ),
+        params,
+    )
+    session.execute(
+        text(
+            """
+            INSERT INTO m_overtime_monthly (
+                month, team_id, member_count, ot_per_day_min, ot_per_day_q1,
+                ot_per_day_median, ot_per_day_q3, ot_per_day_max, ot_per_day_mean
+            )
+            WITH ot_per_day AS (
+                SELECT date_trunc('month', o.measurement_date)::date AS month,
+                    s.ancestor_id AS team_id,
+                    o.overtime / o.workdays_actual AS ot_per_day
+                FROM m_overtime AS o
+                JOIN team_closure AS s ON s.descendant_id = o.team_id
+                WHERE o.workdays_actual > 0 AND o.overtime IS NOT NULL
+                    AND (
+                        :all_months
+                        OR date_trunc('month', o.measurement_date)::date
+                            = ANY(:months)
+                    )
+            )
+            SELECT month, team_id, count(*), min(ot_per_day),
+                percentile_cont(0.25) WITHIN GROUP (ORDER BY ot_per_day),
+                percentile_cont(0.5) WITHIN GROUP (ORDER BY ot_per_day),
+                percentile_cont(0.75) WITHIN GROUP (ORDER BY ot_per_day),
+                max(ot_per_day), avg(ot_per_day)
+            FROM ot_per_day
+            GROUP BY month, team_id
+            """
+        ),
+        params,
+    )
+
+
 # TEAM HEALTH CHECK
 ###
 # Result of Team Health Check
@@ -201,7 +300,11 @@ class THCMeasurement(db.Model):
     question = db.relationship("THCQuestion")
 
     # The triple (session, team, question) makes the measurement unique:
-    __table_args__ = (db.UniqueConstraint(session_name, team_id, question_id),)
+    __table_args__ = (
+        db.UniqueConstraint(session_name, team_id, question_id),
+        # keyset pagination of the admin list, see views.admin.KeysetModelView
+        db.Index("ix_m_thc_measurement_date_pk", measurement_date, pk),
+    )
 
     def __repr__(self):
         return (
@@ -219,9 +322,81 @@ class THCMeasurement(db.Model):
         )
 
 
+class THCSession(db.Model):
+    """
+    Catalogue of the Team Health Check sessions, with the first and last
+    measurement date and the teams of each session. The session pickers read
+    from this table instead of aggregating all of `THCMeasurement`.
+    It is kept up to date by `refresh_thc_sessions`.
+    """
+
+    __tablename__ = "thc_sessions"
+
+    session_name = db.Column(db.String, primary_key=True)
+    min_date = db.Column(db.DateTime, nullable=False)
+    max_date = db.Column(db.DateTime, nullable=False)
+    # IDs of the teams with measurements in this session
+    team_ids = db.Column(ARRAY(db.Integer), nullable=False, default=list)
+
+    __table_args__ = (
+        db.Index("ix_thc_sessions_min_date", min_date),
+        db.Index("ix_thc_sessions_team_ids", team_ids, postgresql_using="gin"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<THCSession: session_name={self.session_name}"
+            f", min_date={self.min_date}"
+            f", max_date={self.max_date}"
+            f", team_ids={self.team_ids}>"
+        )
+
+
+def refresh_thc_sessions(session_names: Optional[Iterable[str]] = None, session=None):
+    """
+    Recomputes the `THCSession` rows of the sessions in `session_names` from
+    the measurements. Sessions without measurements are removed from the
+    catalogue. Does not commit.
+
+    :param session_names: Names of the sessions to refresh. All sessions are
+                          refreshed if this is None.
+    :param session: The DB session to use (default: `db.session`).
+    """
+    session = session or db.session
+    params = {
+        "all_sessions": session_names is None,
+        "session_names": list(session_names or []),
+    }
+    condition = "(:all_sessions OR session_name = ANY(:session_names))"
+
+    session.execute(text(f"DELETE FROM thc_sessions WHERE {condition}"), params)
+    session.execute(
+        text(
+            f"""
+            INSERT INTO thc_sessions (session_name, min_date, max_date, team_ids)
+            SELECT session_name, min(measurement_date), max(measurement_date),
+                coalesce(
+                    array_agg(DISTINCT team_id) FILTER (WHERE team_id IS NOT NULL),
+                    '{{}}'
+                )
+            FROM m_thc
+            WHERE {condition}
+            GROUP BY session_name
+            """
+        ),
+        params,
+    )
+
+
 # BURNDOWN
 ###
 class BurndownMeasurement(db.Model):
+    """
+    Story points of a sprint at the end of one day, for the burndown chart.
+    Computed from the daily issue snapshots whenever snapshots are written,
+    see `structure.events.refresh_sprint_burndown`.
+    """
+
     __tablename__ = "m_burndown"
 
     pk = db.Column(db.Integer, primary_key=True)
@@ -230,11 +405,16 @@ class BurndownMeasurement(db.Model):
     )
     measurement_date = db.Column(db.DateTime, nullable=False)
     activity_id = db.Column(db.Integer, db.ForeignKey("activities.activity_id"))
-    sprint_id = db.Column(db.Integer, db.ForeignKey("sprints.sprint_id"))
+    sprint_id = db.Column(
+        db.Integer, db.ForeignKey("sprints.sprint_id", ondelete="CASCADE"), index=True,
+    )
 
-    sp_not_done = db.Column(db.Integer)
-    sp_added = db.Column(db.Integer, default=0)
-    sp_swapped = db.Column(db.Integer, default=0)
+    # Story points of the issues not done
+    sp_not_done = db.Column(db.Numeric(precision=8, scale=2))
+    # Story points of the issues added to the sprint since the previous day
+    sp_added = db.Column(db.Numeric(precision=8, scale=2), default=0)
+    # Story points of the issues removed from the sprint since the previous day
+    sp_swapped = db.Column(db.Numeric(precision=8, scale=2), default=0)
 
     # Relationship to sprint
     sprint = db.relationship("Sprint")
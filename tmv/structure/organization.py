@@ -1,3 +1,8 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
 from database import db
 
 
@@ -5,7 +10,7 @@ class Team(db.Model):
     __tablename__ = "teams"
 
     team_id = db.Column(db.Integer, primary_key=True)
-    parent_id = db.Column(db.Integer, db.ForeignKey("teams.team_id"))
+    parent_id = db.Column(db.Integer, db.ForeignKey("teams.team_id"), index=True)
     # Unique code / name for the team.
     code = db.Column(db.String, nullable=False, unique=True)
     # This name will be displayed in visuals, controls, etc.
@@ -26,3 +31,106 @@ class Team(db.Model):
 
     def __str__(self):
         return f"{self.name} ({self.code})"
+
+
+class TeamClosure(db.Model):
+    """
+    Transitive closure of the team hierarchy: one row for every team and
+    each of its ancestors, including the team itself with depth 0. Ancestors
+    and descendants of a team are one indexed lookup instead of a recursive
+    query. Maintained on every flush of `Team` changes, see
+    `refresh_team_closure`.
+    """
+
+    __tablename__ = "team_closure"
+
+    ancestor_id = db.Column(
+        db.Integer,
+        db.ForeignKey("teams.team_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    descendant_id = db.Column(
+        db.Integer,
+        db.ForeignKey("teams.team_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Number of levels between the ancestor and the descendant
+    depth = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_team_closure_descendant_id_depth", descendant_id, depth),
+    )
+
+
+def refresh_team_closure(team_ids: Optional[Iterable[int]] = None, session=None):
+    """
+    Recomputes the `TeamClosure` rows of the teams in `team_ids` and of all
+    their sub-teams from `Team.parent_id`. A cycle in the hierarchy stops the
+    ancestors of its teams at the cycle. Does not commit.
+
+    :param team_ids: IDs of the inserted or moved teams. All teams are
+                     refreshed if this is None.
+    :param session: The DB session to use (default: `db.session`).
+    """
+    session = session or db.session
+    params = {"all_teams": team_ids is None, "team_ids": list(team_ids or [])}
+    affected = """
+        WITH RECURSIVE affected AS (
+            SELECT team_id FROM teams
+            WHERE (:all_teams OR team_id = ANY(:team_ids))
+            UNION
+            SELECT t.team_id
+            FROM affected AS a
+            JOIN teams AS t ON t.parent_id = a.team_id
+        )"""
+
+    session.execute(
+        text(
+            f"""
+            DELETE FROM team_closure
+            WHERE descendant_id IN ({affected} SELECT team_id FROM affected)
+            """
+        ),
+        params,
+    )
+    session.execute(
+        text(
+            f"""
+            INSERT INTO team_closure (ancestor_id, descendant_id, depth)
+            {affected}, ancestors AS (
+                SELECT t.team_id AS descendant_id, t.team_id AS ancestor_id,
+                    t.parent_id, 0 AS depth, ARRAY[t.team_id] AS path
+                FROM affected AS a
+                JOIN teams AS t ON t.team_id = a.team_id
+                UNION ALL
+                SELECT an.descendant_id, t.team_id, t.parent_id, an.depth + 1,
+                    an.path || t.team_id
+                FROM ancestors AS an
+                JOIN teams AS t ON t.team_id = an.parent_id
+                WHERE NOT t.team_id = ANY(an.path)
+            )
+            SELECT ancestor_id, descendant_id, depth FROM ancestors
+            """
+        ),
+        params,
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _update_team_closure(session, flush_context):
+    """
+    Updates the `TeamClosure` of the teams just inserted or moved to another
+    parent. The rows of deleted teams are removed by the foreign keys.
+    """
+    team_ids = [obj.team_id for obj in session.new if isinstance(obj, Team)]
+    for obj in session.dirty:
+        if not isinstance(obj, Team):
+            continue
+        attrs = inspect(obj).attrs
+        if (
+            attrs.parent_id.history.has_changes()
+            or attrs.parent_team.history.has_changes()
+        ):
+            team_ids.append(obj.team_id)
+    if team_ids:
+        refresh_team_closure(team_ids, session=session)
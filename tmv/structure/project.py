@@ -8,6 +8,16 @@ class StatusCategory(enum.Enum):
     done = "Done"
 
 
+class JiraSyncStrategy(enum.Enum):
+    """
+    How the past issues of closed JIRA sprints get synced. See
+    `JiraSync._get_issues_by_sprint`.
+    """
+
+    search = "Search issues day by day"
+    sprint_report = "Sprint report & changelogs"
+
+
 class Activity(db.Model):
     __tablename__ = "activities"
 
@@ -16,6 +26,12 @@ class Activity(db.Model):
 
     activity_name = db.Column(db.String, unique=True)
     jira_project_id = db.Column(db.Integer, db.ForeignKey("jira_projects.id"))
+    jira_sync_strategy = db.Column(
+        db.Enum(JiraSyncStrategy),
+        nullable=False,
+        default=JiraSyncStrategy.search,
+        server_default=JiraSyncStrategy.search.name,
+    )
 
     sprints = db.relationship("Sprint", back_populates="activity")
     # Set up relationship between Sprints belonging to teams
@@ -0,0 +1,203 @@
+"""
+Cold archive of old sprints: the daily issue snapshots of frozen sprints are
+moved from PostgreSQL to one Parquet file per activity. Each sprint is one
+row group, sorted by day and issue, with dictionary-encoded statuses. The
+sprint visuals read archived sprints from these files instead of the
+`SprintDailyRollup` rows, see `visuals.snapshot_archive`.
+"""
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import List
+
+from dateutil.tz import tzutc
+from flask import current_app
+from sqlalchemy import text
+
+from database import db
+from structure.events import DailyIssueSnapshot, Sprint
+from structure.project import Activity
+
+ARCHIVE_FILE_NAME = "activity_{activity_id}.parquet"
+
+
+def archive_path(activity_id: int) -> str:
+    """
+    Returns the path of the Parquet archive of an activity.
+    """
+    return os.path.join(
+        current_app.config["SNAPSHOT_ARCHIVE_FOLDER"],
+        ARCHIVE_FILE_NAME.format(activity_id=activity_id),
+    )
+
+
+def _sprint_table(rows: list):
+    """
+    Builds the Arrow table of the daily snapshots of one sprint. The string
+    columns are dictionary-encoded by the Parquet writer.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    return pa.table(
+        {
+            "sprint_id": pa.array([row.sprint_id for row in rows], pa.int32()),
+            "day": pa.array([row.day for row in rows], pa.date32()),
+            "issue_id": pa.array([row.issue_id for row in rows], pa.int32()),
+            "snapshot_date": pa.array(
+                [row.snapshot_date for row in rows], pa.timestamp("us")
+            ),
+            "status": pa.array([row.status for row in rows], pa.string()),
+            "status_category": pa.array(
+                [
+                    row.status_category.name if row.status_category else None
+                    for row in rows
+                ],
+                pa.string(),
+            ),
+            "story_points": pa.array(
+                [row.story_points for row in rows], pa.decimal128(5, 2)
+            ),
+        }
+    )
+
+
+def archive_activity_sprints(activity_id: int, sprints: List[Sprint]) -> int:
+    """
+    Moves the snapshots of frozen sprints of an activity to its Parquet
+    archive. The archive is rewritten with the row groups of the already
+    archived sprints and one new row group per sprint, then the issue
+    snapshots, DailyIssueSnapshots and SprintDailyRollups of the sprints are
+    deleted and the sprints are marked as archived. Commits.
+
+    The activity row is locked until the commit, so concurrent runs for the
+    same activity wait for each other instead of rewriting the archive
+    without the row groups of the other run. Sprints archived by a run
+    which held the lock before are skipped.
+
+    :param activity_id: ID of the activity of the sprints.
+    :param sprints: Frozen sprints to archive.
+    :return: Number of archived daily snapshots.
+    """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    db.session.query(Activity.activity_id).filter(
+        Activity.activity_id == activity_id
+    ).with_for_update().one()
+    sprints = (
+        Sprint.query.filter(
+            Sprint.sprint_id.in_([sprint.sprint_id for sprint in sprints]),
+            Sprint.archived_at == None,
+        )
+        .populate_existing()
+        .all()
+    )
+    if not sprints:
+        db.session.commit()
+        return 0
+
+    path = archive_path(activity_id)
+    sprint_ids = {sprint.sprint_id for sprint in sprints}
+
+    # row groups of the archive by sprint, without the sprints to archive
+    # in case a previous run failed after writing the file
+    tables = dict()
+    if os.path.exists(path):
+        archive = pq.ParquetFile(path)
+        index = json.loads(pq.read_schema(path).metadata[b"sprints"])
+        for sprint_id, row_group in index.items():
+            if int(sprint_id) not in sprint_ids:
+                tables[int(sprint_id)] = archive.read_row_group(
+                    row_group, use_pandas_metadata=False
+                )
+
+    archived_cnt = 0
+    for sprint_id in sprint_ids:
+        rows = (
+            DailyIssueSnapshot.query.filter(DailyIssueSnapshot.sprint_id == sprint_id)
+            .order_by(DailyIssueSnapshot.day, DailyIssueSnapshot.issue_id)
+            .all()
+        )
+        if rows:
+            tables[sprint_id] = _sprint_table(rows)
+            archived_cnt += len(rows)
+
+    if tables:
+        schema = next(iter(tables.values())).schema
+        index = {
+            str(sprint_id): row_group
+            for row_group, sprint_id in enumerate(sorted(tables))
+        }
+        schema = schema.with_metadata({"sprints": json.dumps(index)})
+
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        os.close(fd)
+        try:
+            writer = pq.ParquetWriter(tmp_path, schema, use_dictionary=True)
+            try:
+                for sprint_id in sorted(tables):
+                    writer.write_table(
+                        pa.Table.from_batches(
+                            tables[sprint_id].to_batches(), schema=schema
+                        )
+                    )
+            finally:
+                writer.close()
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    params = {"sprint_ids": list(sprint_ids)}
+    for table in ("sprint_daily_rollups", "daily_issue_snapshots", "issue_snapshots"):
+        db.session.execute(
+            text(f"DELETE FROM {table} WHERE sprint_id = ANY(:sprint_ids)"), params
+        )
+    time_now = datetime.now(tzutc())
+    for sprint in sprints:
+        sprint.archived_at = time_now
+    db.session.commit()
+    return archived_cnt
+
+
+def archive_old_sprints(older_than: datetime) -> int:
+    """
+    Archives all frozen sprints which were completed before `older_than`.
+    Commits per activity.
+
+    :param older_than: Only archive sprints completed before this date.
+    :return: Number of archived sprints.
+    """
+    sprints = (
+        Sprint.query.filter(
+            Sprint.frozen_at != None,
+            Sprint.archived_at == None,
+            db.func.coalesce(Sprint.complete_date, Sprint.end_date) < older_than,
+        )
+        .order_by(Sprint.activity_id, Sprint.sprint_id)
+        .all()
+    )
+    sprints_by_activity = dict()
+    for sprint in sprints:
+        sprints_by_activity.setdefault(sprint.activity_id, []).append(sprint)
+    for activity_id, activity_sprints in sprints_by_activity.items():
+        archive_activity_sprints(activity_id, activity_sprints)
+    return len(sprints)
+
+
+def delete_archive(activity_id: int) -> bool:
+    """
+    Removes the archive of an activity, e.g. after its sprints were deleted.
+
+    :return: True if there was an archive.
+    """
+    if not current_app.config.get("SNAPSHOT_ARCHIVE_FOLDER"):
+        return False
+    try:
+        os.remove(archive_path(activity_id))
+    except FileNotFoundError:
+        return False
+    return True
@@ -8,14 +8,30 @@ def make_celery(app):
         # backend=app.config["CELERY_RESULT_BACKEND"],
         backend="db+" + app.config["SQLALCHEMY_DATABASE_URI"],
         broker=app.config["CELERY_BROKER_URL"],
-        include=["tasks.jira",],
+        include=["tasks.jira", "tasks.sprints", "tasks.deletes",],
     )
 
     celery.conf.beat_schedule = {
         "sync-projects-every-1-hour": {
             "task": "tasks.jira.sync_assigned_projects",
             "schedule": crontab(minute="0", hour="*"),
-        }
+        },
+        "freeze-closed-sprints-every-day": {
+            "task": "tasks.sprints.freeze_closed_sprints",
+            "schedule": crontab(minute="30", hour="2"),
+        },
+        "compact-snapshots-every-day": {
+            "task": "tasks.sprints.compact_snapshots",
+            "schedule": crontab(minute="30", hour="3"),
+        },
+        "maintain-snapshot-partitions-every-day": {
+            "task": "tasks.sprints.maintain_snapshot_partitions",
+            "schedule": crontab(minute="0", hour="3"),
+        },
+        "archive-sprints-every-day": {
+            "task": "tasks.sprints.archive_sprints",
+            "schedule": crontab(minute="0", hour="4"),
+        },
     }
 
     class ContextTask(celery.Task):
@@ -0,0 +1,42 @@
+from runcelery import celery as celery_app
+from structure import events
+from structure.snapshot_archive import delete_archive
+from visuals.snapshot_cube import write_snapshot_cubes
+
+
+@celery_app.task(bind=True)
+def delete_activity_sprints(self, activity_id, batch_size=10000, pause=0.1):
+    """
+    Deletes the sprints of an activity with all their data in batches and
+    reports the progress like the sync tasks. See
+    `structure.events.delete_activity_sprints`.
+
+    :param activity_id: ID of the activity.
+    :param batch_size: Maximum number of rows deleted per transaction.
+    :param pause: Seconds to wait between two batches.
+    """
+    steps = events.SPRINT_DATA_TABLES + ["sprints"]
+
+    def report_progress(table_name, deleted_cnt):
+        self.update_state(
+            state="PROGRESS",
+            meta={
+                "current": steps.index(table_name),
+                "total": len(steps),
+                "status": f"Deleted {deleted_cnt} rows of {table_name}",
+            },
+        )
+
+    deleted = events.delete_activity_sprints(
+        activity_id, batch_size=batch_size, pause=pause, progress=report_progress
+    )
+    write_snapshot_cubes([activity_id])
+    delete_archive(activity_id)
+    return {
+        "current": len(steps),
+        "total": len(steps),
+        "status": (
+            f"Deleted {deleted['sprints']} sprints with "
+            f"{deleted['issue_snapshots']} issue snapshots."
+        ),
+    }
@@ -7,16 +7,17 @@ from dateutil.tz import tzutc
 from connectors.jira.jira_sync import JiraSync
 from database import db  # pylint: disable=unused-import
 from runcelery import celery as celery_app
-from structure.events import Sprint
+from structure.events import Sprint, find_snapshot_gaps
 from structure.project import JiraProject, Activity
+from visuals.snapshot_cube import write_snapshot_cubes
 
 
 @celery_app.task()
 def sync_assigned_projects():
     jira_projects = JiraProject.query.filter(JiraProject.activity != None).all()
     jira_sync = JiraSync()
-    for project in jira_projects:
-        jira_sync.snapshot_project(project)
+    jira_sync.snapshot_projects(jira_projects)
+    write_snapshot_cubes(project.activity.activity_id for project in jira_projects)
     # TODO: other types of projects
     return True
 
@@ -29,6 +30,7 @@ def sync_sprint_issues(sprint_id, latest_only):
     if jira_sprint:
         jira_sync = JiraSync()
         jira_sync.sync_sprint_issues(jira_sprint, latest_only)
+        write_snapshot_cubes([jira_sprint.activity_id])
     # TODO: other types of sprints
     return True
 
@@ -45,14 +47,23 @@ def sync_activity_past_data(self, activity_id, days=90):
     ).all()
     if jira_sprints:
         jira_sync = JiraSync()
+        estimated_calls = sum(
+            jira_sync.plan_sprint_backfill(sprint).estimated_calls
+            for sprint in jira_sprints
+        )
+        current_app.logger.info(
+            f"Syncing {len(jira_sprints)} sprints of activity {activity_id}: "
+            f"about {estimated_calls} JIRA searches"
+        )
         for idx, sprint in enumerate(jira_sprints):
             message = f"Syncing sprint {sprint.name}"
             current_app.logger.info(message)
-            jira_sync.sync_sprint_issues(sprint, False)
+            jira_sync.sync_sprint_issues(sprint, False, probe=False)
             self.update_state(
                 state="PROGRESS",
                 meta={"current": idx, "total": len(jira_sprints), "status": message},
             )
+        write_snapshot_cubes([activity_id])
         return {
             "current": len(jira_sprints),
             "total": len(jira_sprints),
@@ -63,6 +74,41 @@ def sync_activity_past_data(self, activity_id, days=90):
         return {"current": 1, "total": 1, "status": "No sprints found"}
 
 
+@celery_app.task(bind=True)
+def backfill_snapshot_gaps(self, activity_id=None):
+    """
+    Fetches only the days missing from the snapshots of synced sprints.
+
+    :param activity_id: Only fill gaps of sprints of this activity if given.
+    """
+    from flask import current_app  # pylint: disable=import-outside-toplevel
+
+    gaps = find_snapshot_gaps(
+        activity_id, current_app.config.get("SNAPSHOT_RETENTION_MONTHS")
+    )
+    jira_sprints = Sprint.query.filter(
+        Sprint.sprint_id.in_(gaps.keys()), Sprint.jira_sprint_id != None
+    ).all()
+    if jira_sprints:
+        jira_sync = JiraSync()
+        for idx, sprint in enumerate(jira_sprints):
+            message = f"Filling {len(gaps[sprint.sprint_id])} days of {sprint.name}"
+            current_app.logger.info(message)
+            jira_sync.sync_sprint_days(sprint, gaps[sprint.sprint_id])
+            self.update_state(
+                state="PROGRESS",
+                meta={"current": idx, "total": len(jira_sprints), "status": message},
+            )
+        write_snapshot_cubes(sprint.activity_id for sprint in jira_sprints)
+        return {
+            "current": len(jira_sprints),
+            "total": len(jira_sprints),
+            "status": "Complete",
+        }
+    else:
+        return {"current": 1, "total": 1, "status": "No gaps found"}
+
+
 @celery_app.task()
 def sync_all_sprints_without_issues(activity_id):
     from flask import current_app  # pylint: disable=import-outside-toplevel
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+
+from dateutil.tz import tzutc
+from flask import current_app
+
+from runcelery import celery as celery_app
+from structure import events
+from structure.events import Sprint
+from structure.snapshot_archive import archive_old_sprints
+from visuals.snapshot_cube import write_snapshot_cubes
+from visuals.sprint_series import render_sprint_series
+
+
+@celery_app.task()
+def freeze_closed_sprints():
+    """
+    Freezes all closed sprints which were synced after their completion.
+    See `structure.events.freeze_sprint`.
+    """
+    sprints = Sprint.query.filter(
+        Sprint.state == Sprint.State.CLOSED.value, Sprint.frozen_at == None
+    ).all()
+    deleted_cnt = 0
+    frozen_cnt = 0
+    for sprint in sprints:
+        if sprint.should_be_finalized:
+            sprint_deleted_cnt = events.freeze_sprint(
+                sprint, render_sprint_series(sprint)
+            )
+            current_app.logger.info(
+                f"Froze sprint {sprint.name} (sprint_id={sprint.sprint_id}), "
+                f"deleted {sprint_deleted_cnt} snapshots"
+            )
+            deleted_cnt += sprint_deleted_cnt
+            frozen_cnt += 1
+    return {"frozen": frozen_cnt, "deleted_snapshots": deleted_cnt}
+
+
+@celery_app.task()
+def recompute_status_categories(statuses=None):
+    """
+    Recomputes the status categories stored on the issue snapshots after a
+    StatusCategoryStatusMapping changed.
+
+    :param statuses: Only recompute the snapshots with these statuses if given.
+    """
+    updated_cnt = events.recompute_status_categories(statuses)
+    # the cubes are only checked against Sprint.last_updated
+    write_snapshot_cubes()
+    return {"updated": updated_cnt}
+
+
+@celery_app.task()
+def maintain_snapshot_partitions():
+    """
+    Creates the monthly partitions of the issue snapshots ahead of time and
+    removes the expired ones if `SNAPSHOT_RETENTION_MONTHS` is set, including
+    the expired snapshots of the default partition.
+    """
+    created = events.create_snapshot_partitions()
+    removed = []
+    deleted_cnt = 0
+    retention_months = current_app.config.get("SNAPSHOT_RETENTION_MONTHS")
+    if retention_months is not None:
+        removed = events.drop_expired_snapshot_partitions(
+            retention_months,
+            archive=current_app.config.get("SNAPSHOT_RETENTION_ARCHIVE", True),
+        )
+        deleted_cnt = events.delete_expired_snapshots(retention_months)
+    current_app.logger.info(
+        f"Created snapshot partitions {created}, removed expired ones {removed}, "
+        f"deleted {deleted_cnt} expired snapshots of the default partition"
+    )
+    return {"created": created, "removed": removed, "deleted_snapshots": deleted_cnt}
+
+
+@celery_app.task(bind=True)
+def compact_snapshots(self, batch_size=10000, window_days=None):
+    """
+    Deletes all but the last snapshot per sprint, issue and day for the
+    `SNAPSHOT_COMPACTION_WINDOW_DAYS` days before the horizon of
+    `SNAPSHOT_COMPACTION_DAYS`. The charts only use the last snapshot per
+    day, so they don't change. See `structure.events.compact_snapshot_day`.
+
+    Older days were compacted by the previous runs, so they aren't scanned
+    again every night. Run the task once with a larger `window_days` to
+    compact the history, e.g. after it was paused for longer than the window.
+
+    :param batch_size: Maximum number of snapshots deleted per transaction.
+    :param window_days: Number of days before the horizon to compact
+                        (default: `SNAPSHOT_COMPACTION_WINDOW_DAYS`).
+    """
+    horizon = datetime.now(tzutc()).date() - timedelta(
+        days=current_app.config.get("SNAPSHOT_COMPACTION_DAYS", 1)
+    )
+    if window_days is None:
+        window_days = current_app.config.get("SNAPSHOT_COMPACTION_WINDOW_DAYS", 7)
+    days = [horizon - timedelta(days=i) for i in range(window_days, 0, -1)]
+
+    deleted_cnt = 0
+    for i, day in enumerate(days):
+        self.update_state(
+            state="PROGRESS",
+            meta={
+                "current": i,
+                "total": len(days),
+                "status": f"Compacting snapshots of {day.isoformat()}",
+            },
+        )
+        deleted_cnt += events.compact_snapshot_day(day, batch_size)
+
+    current_app.logger.info(
+        f"Compacted snapshots of {len(days)} days before {horizon.isoformat()}, "
+        f"deleted {deleted_cnt} snapshots"
+    )
+    return {"days": len(days), "deleted_snapshots": deleted_cnt}
+
+
+@celery_app.task()
+def archive_sprints():
+    """
+    Moves the snapshots of frozen sprints completed more than
+    `SNAPSHOT_ARCHIVE_AFTER_DAYS` ago to the Parquet archive in
+    `SNAPSHOT_ARCHIVE_FOLDER`. See `structure.snapshot_archive`.
+    """
+    if not current_app.config.get("SNAPSHOT_ARCHIVE_FOLDER"):
+        return {"archived": 0}
+    older_than = datetime.now(tzutc()).replace(tzinfo=None) - timedelta(
+        days=current_app.config.get("SNAPSHOT_ARCHIVE_AFTER_DAYS", 183)
+    )
+    archived_cnt = archive_old_sprints(older_than)
+    current_app.logger.info(
+        f"Archived {archived_cnt} sprints completed before {older_than.isoformat()}"
+    )
+    return {"archived": archived_cnt}
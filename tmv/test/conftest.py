@@ -7,13 +7,27 @@ from sqlalchemy import create_engine
 from sqlalchemy.exc import ProgrammingError
 from flask_sqlalchemy import SQLAlchemy
 import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
 from app import create_app, TmvConfig, create_tmv_config_from_env
 from structure.organization import Team
+from structure.events import Sprint
+from structure.project import Activity, StatusCategory, StatusCategoryStatusMapping
 import os
 from urllib.parse import urlparse
 from psycopg2.extensions import AsIs
 
 
+def pytest_collection_modifyitems(config, items):
+    """Skip the tests marked as benchmark unless RUN_BENCHMARKS is set"""
+    if os.getenv("RUN_BENCHMARKS"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="set RUN_BENCHMARKS=1 to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
 def recreate_postgres_db(db_uri, db_name):
     engine = create_engine(db_uri)
     with engine.connect() as conn:
@@ -115,3 +129,53 @@ def team(db_session):
     flask_app_db.session.add(team)
     flask_app_db.session.commit()
     return team
+
+
+@pytest.fixture(scope="function")
+def make_sprint(team):
+    """
+    Factory of sprints of the `team`. The activity of a sprint is created
+    on its first use and the status mappings are added once per status.
+    Closed sprints are completed at their end date.
+    """
+    activities: Dict[str, Activity] = {}
+    mapped_statuses = set()
+
+    def make_sprint(
+        start_date: datetime,
+        days: int = 13,
+        state: Sprint.State = Sprint.State.CLOSED,
+        last_updated: Optional[datetime] = None,
+        status_mappings: Optional[Dict[str, StatusCategory]] = None,
+        activity_name: str = "ABC",
+    ) -> Sprint:
+        if activity_name not in activities:
+            activity = Activity(team_id=team.team_id, activity_name=activity_name)
+            flask_app_db.session.add(activity)
+            flask_app_db.session.commit()
+            activities[activity_name] = activity
+        activity = activities[activity_name]
+
+        end_date = start_date + timedelta(days=days)
+        sprint = Sprint(
+            activity_id=activity.activity_id,
+            last_updated=last_updated,
+            name=f"{activity_name} {len(activity.sprints) + 1}",
+            state=state.value,
+            start_date=start_date,
+            end_date=end_date,
+            complete_date=end_date if state == Sprint.State.CLOSED else None,
+        )
+        flask_app_db.session.add(sprint)
+        for status, status_category in (status_mappings or {}).items():
+            if status not in mapped_statuses:
+                mapped_statuses.add(status)
+                flask_app_db.session.add(
+                    StatusCategoryStatusMapping(
+                        status=status, status_category=status_category
+                    )
+                )
+        flask_app_db.session.commit()
+        return sprint
+
+    return make_sprint
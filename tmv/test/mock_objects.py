@@ -1,3 +1,7 @@
+import re
+from datetime import datetime
+from types import SimpleNamespace
+
 from structure.organization import Team
 
 
@@ -27,3 +31,158 @@ class UserMock:
                 Team.team_id
             )
         ]
+
+
+class FakeJira:
+    """
+    In-memory JIRA server holding the issues of a single sprint. It answers
+    the searches and REST calls of `JiraSync` from the histories of the
+    issues, so that the results of the sync strategies can be compared.
+
+    Issues are dicts with the keys `id`, `created`, the initial `status`,
+    `story_points` and `in_sprint`, and `changes`: a list of
+    `(datetime, field, new value)` for any of these three fields.
+    """
+
+    SPRINT_FIELD = "customfield_10020"
+    STORYPOINTS_FIELD = "customfield_10024"
+    STATUSES = {"To Do": "To Do", "In Progress": "In Progress", "Done": "Done"}
+
+    def __init__(self, jira_sprint_id: int, board_id: int, issues: list):
+        self.jira_sprint_id = jira_sprint_id
+        self.board_id = board_id
+        self.issues = issues
+        self.search_cnt = 0
+
+    def fields(self):
+        return [
+            {"id": self.SPRINT_FIELD, "name": "Sprint"},
+            {"id": self.STORYPOINTS_FIELD, "name": "Story Points"},
+        ]
+
+    def statuses(self):
+        return [
+            SimpleNamespace(name=name, statusCategory=SimpleNamespace(name=category))
+            for name, category in self.STATUSES.items()
+        ]
+
+    def _state(self, issue: dict, at: datetime) -> dict:
+        state = {
+            field: issue[field] for field in ("status", "story_points", "in_sprint")
+        }
+        for changed_at, field, value in sorted(issue["changes"], key=lambda c: c[0]):
+            if changed_at <= at:
+                state[field] = value
+        return state
+
+    def _raw(self, issue: dict) -> dict:
+        current = self._state(issue, datetime.max)
+        histories = []
+        state = {
+            field: issue[field] for field in ("status", "story_points", "in_sprint")
+        }
+        for changed_at, field, value in sorted(issue["changes"], key=lambda c: c[0]):
+            if field == "status":
+                item = {
+                    "field": "status",
+                    "fieldId": "status",
+                    "fromString": state[field],
+                    "toString": value,
+                }
+            elif field == "story_points":
+                item = {
+                    "field": "Story Points",
+                    "fieldId": self.STORYPOINTS_FIELD,
+                    "fromString": None if state[field] is None else str(state[field]),
+                    "toString": None if value is None else str(value),
+                }
+            else:
+                item = {
+                    "field": "Sprint",
+                    "fieldId": self.SPRINT_FIELD,
+                    "from": str(self.jira_sprint_id) if state[field] else "",
+                    "to": str(self.jira_sprint_id) if value else "",
+                }
+            state[field] = value
+            histories.append(
+                {
+                    "created": changed_at.strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+                    "items": [item],
+                }
+            )
+        return {
+            "id": str(issue["id"]),
+            "key": f"FAKE-{issue['id']}",
+            "fields": {
+                "created": issue["created"].strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+                "status": {"name": current["status"]},
+                self.STORYPOINTS_FIELD: current["story_points"],
+            },
+            "versionedRepresentations": {
+                "status": {"1": {"name": current["status"]}},
+                self.STORYPOINTS_FIELD: {"1": current["story_points"]},
+            },
+            "changelog": {"histories": histories},
+        }
+
+    def search_issues(self, jql: str, **kwargs):
+        self.search_cnt += 1
+        ids_match = re.fullmatch(r"id in \(([\d, ]+)\)", jql.strip())
+        if ids_match:
+            ids = {int(issue_id) for issue_id in ids_match.group(1).split(",")}
+            issues = [issue for issue in self.issues if issue["id"] in ids]
+        else:
+            # sprint = X [AND status WAS "Y" ON "Z"] matches the present sprint
+            issues = [
+                issue
+                for issue in self.issues
+                if self._state(issue, datetime.max)["in_sprint"]
+            ]
+            was_match = re.search(r'status WAS "(.+)" ON "(.+)"', jql)
+            if was_match:
+                status = was_match.group(1)
+                at = datetime.strptime(was_match.group(2), "%Y-%m-%d %H:%M")
+                issues = [
+                    issue
+                    for issue in issues
+                    if issue["created"] <= at
+                    and self._state(issue, at)["status"] == status
+                ]
+        return [SimpleNamespace(raw=self._raw(issue)) for issue in issues]
+
+    def _get_json(self, path: str, params: dict = None, base: str = None):
+        if path.startswith("project/"):
+            return [
+                {
+                    "name": "Story",
+                    "statuses": [{"name": name} for name in self.STATUSES],
+                }
+            ]
+        if path == "board":
+            return {"values": [], "isLast": True}
+        if path == f"sprint/{self.jira_sprint_id}":
+            return {"id": self.jira_sprint_id, "originBoardId": self.board_id}
+        if path == "rapid/charts/sprintreport":
+            assert params["rapidViewId"] == self.board_id
+            contents = {
+                "completedIssues": [],
+                "issuesNotCompletedInCurrentSprint": [],
+                "puntedIssues": [],
+            }
+            for issue in self.issues:
+                current = self._state(issue, datetime.max)
+                if not current["in_sprint"]:
+                    if not issue["in_sprint"] and not any(
+                        field == "in_sprint" for _, field, _ in issue["changes"]
+                    ):
+                        continue
+                    issue_list = "puntedIssues"
+                elif current["status"] == "Done":
+                    issue_list = "completedIssues"
+                else:
+                    issue_list = "issuesNotCompletedInCurrentSprint"
+                contents[issue_list].append(
+                    {"id": issue["id"], "key": f"FAKE-{issue['id']}"}
+                )
+            return {"contents": contents}
+        raise NotImplementedError(path)
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+import pytest
+from dateutil.tz import tzutc
+from flask import session
+
+from database import db
+from structure.measurements import THCMeasurement, THCQuestion
+from views.admin import THCMeasurementModelView, _plan_rows
+
+MEASUREMENT_CNT = 25
+PAGE_SIZE = 10
+
+
+@pytest.fixture
+def measurements(team):
+    questions = [THCQuestion(deck="Test", topic=f"Topic {i}") for i in range(5)]
+    db.session.add_all(questions)
+    db.session.flush()
+    start = datetime(2020, 1, 1, tzinfo=tzutc())
+    for i in range(MEASUREMENT_CNT):
+        db.session.add(
+            THCMeasurement(
+                # every session has the same date, so pages split ties
+                measurement_date=start + timedelta(days=i // len(questions)),
+                session_name=f"Session {i // len(questions)}",
+                team_id=team.team_id,
+                question_id=questions[i % len(questions)].question_id,
+                result_red=1,
+                result_yellow=1,
+                result_green=1,
+            )
+        )
+    db.session.commit()
+
+
+def create_view(**kwargs):
+    view = THCMeasurementModelView(
+        THCMeasurement, db.session, endpoint="test_keyset_thc", **kwargs
+    )
+    view.page_size = PAGE_SIZE
+    return view
+
+
+@pytest.mark.usefixtures("app", "measurements")
+@pytest.mark.parametrize("sort_desc", [False, True])
+def test_keyset_pages_match_offset_pages(app, sort_desc):
+    view = create_view()
+    expected = (
+        THCMeasurement.query.order_by(
+            THCMeasurement.measurement_date.desc()
+            if sort_desc
+            else THCMeasurement.measurement_date,
+            THCMeasurement.pk.desc() if sort_desc else THCMeasurement.pk,
+        )
+        .with_entities(THCMeasurement.pk)
+        .all()
+    )
+    expected = [pk for pk, in expected]
+
+    with app.test_request_context():
+        pages = []
+        for page in range(3):
+            _, data = view.get_list(page, "measurement_date", sort_desc, None, [])
+            pages.append([measurement.pk for measurement in data])
+        cursors = session[view._keyset_session_key()]
+        assert set(cursors["pages"]) == {"1", "2", "3"}
+
+        # going back uses the kept cursor of the previous page
+        _, data = view.get_list(1, "measurement_date", sort_desc, None, [])
+        assert [measurement.pk for measurement in data] == pages[1]
+
+    assert sum(pages, []) == expected
+    assert [len(page) for page in pages] == [10, 10, 5]
+
+
+@pytest.mark.usefixtures("app", "measurements")
+def test_jump_to_page_without_cursor(app):
+    view = create_view()
+    with app.test_request_context():
+        _, data = view.get_list(2, None, False, None, [])
+    assert [measurement.pk for measurement in data] == [
+        pk
+        for pk, in THCMeasurement.query.with_entities(THCMeasurement.pk)
+        .order_by(THCMeasurement.pk)
+        .offset(2 * PAGE_SIZE)
+    ]
+
+
+@pytest.mark.usefixtures("app", "measurements")
+def test_estimated_count_above_threshold(app):
+    db.session.execute("ANALYZE m_thc")
+    with app.test_request_context():
+        count, _ = create_view().get_list(0, None, False, None, [])
+        assert count == MEASUREMENT_CNT
+
+        view = create_view()
+        view.estimated_count_threshold = 0
+        estimate, _ = view.get_list(0, None, False, None, [])
+        # reltuples after the ANALYZE
+        assert estimate == MEASUREMENT_CNT
+
+
+@pytest.mark.usefixtures("app", "measurements")
+def test_plan_rows_of_filtered_count():
+    count_query = (
+        create_view()
+        .get_count_query()
+        .filter(THCMeasurement.session_name == "Session 1")
+    )
+    assert _plan_rows(count_query) >= 1
+    assert count_query.scalar() == 5
@@ -0,0 +1,71 @@
+import pytest
+from test.mock_objects import UserMock
+from database import db
+
+from structure.events import IssueSnapshot
+from structure.measurements import BurndownMeasurement
+from structure.project import StatusCategory
+from visuals import BurndownGraphController
+from datetime import datetime, timedelta
+
+
+@pytest.mark.usefixtures("app")
+class TestBurndownVisual:
+    def test_burndown_update(self, make_sprint, mocker):
+        base_date = datetime(2020, 3, 2, 5)
+        sprint = make_sprint(
+            base_date,
+            days=2,
+            last_updated=datetime(2020, 4, 5, 6),
+            status_mappings={
+                "To Do": StatusCategory.to_do,
+                "Done": StatusCategory.done,
+            },
+        )
+
+        # issue 1 is done on day 2, issue 2 is added on day 1
+        # and issue 3 is removed on day 2
+        issues_by_day = [
+            [(1, 3, "To Do"), (3, 5, "To Do")],
+            [(1, 3, "To Do"), (2, 2, "To Do"), (3, 5, "To Do")],
+            [(1, 3, "Done"), (2, 2, "To Do")],
+        ]
+        # one sync per day, the measurements are updated on every write
+        for days, issues in enumerate(issues_by_day):
+            for issue_id, story_points, status in issues:
+                db.session.add(
+                    IssueSnapshot(
+                        issue_id=issue_id,
+                        story_points=story_points,
+                        status=status,
+                        sprint_id=sprint.sprint_id,
+                        snapshot_date=base_date + timedelta(days=days),
+                    )
+                )
+            db.session.commit()
+
+        measurements = (
+            BurndownMeasurement.query.filter_by(sprint_id=sprint.sprint_id)
+            .order_by(BurndownMeasurement.measurement_date)
+            .all()
+        )
+        assert [m.measurement_date.date() for m in measurements] == [
+            (base_date + timedelta(days=days)).date() for days in range(3)
+        ]
+        assert [m.sp_not_done for m in measurements] == [8, 10, 2]
+        assert [m.sp_added for m in measurements] == [0, 2, 0]
+        assert [m.sp_swapped for m in measurements] == [0, 0, 5]
+        assert all(m.activity_id == sprint.activity_id for m in measurements)
+
+        mocker.patch("visuals.base.current_user", UserMock())
+        mocker.patch("visuals.BurndownGraphController.check_for_data")
+
+        bgc = BurndownGraphController()
+        data, _ = bgc.update(sprint.sprint_id)
+        remaining, ideal, added, removed = data  # type: ignore
+
+        assert list(remaining.y) == [8, 10, 2]
+        assert ideal.y[0] == 8
+        assert ideal.y[-1] == 0
+        assert list(added.y) == [0, 2, 0]
+        assert list(removed.y) == [0, 0, -5]
@@ -4,6 +4,14 @@ from tools.db_tool import action_delete_all_for_model
 from database import db
 
 from structure.organization import Team
+from structure.events import (
+    DailyIssueSnapshot,
+    IssueSnapshot,
+    Sprint,
+    delete_activity_sprints,
+)
+from structure.project import Activity
+from datetime import datetime, timedelta
 
 
 @pytest.mark.usefixtures("app")
@@ -22,6 +30,87 @@ class TestDbDeleteRecords:
         # Assert function returned True
         assert success
 
+    def test_delete_records_in_batches(self, db_session):
+        for i in range(5):
+            db.session.add(Team(code=str(i), name=f"Team {i}", parent_team=None))
+        db.session.commit()
+        messages = []
+
+        success = action_delete_all_for_model(
+            model_name="Team", batch_size=2, output=messages.append
+        )
+
+        assert success
+        assert db.session.query(Team).count() == 0
+        assert messages[1:] == [
+            "2 records deleted...",
+            "4 records deleted...",
+            "5 records deleted...",
+            "5 records deleted.",
+        ]
+
+    def test_delete_sub_teams_first(self, db_session):
+        parent = None
+        for i in range(4):
+            parent = Team(code=str(i), name=f"Team {i}", parent_team=parent)
+            db.session.add(parent)
+        db.session.commit()
+
+        success = action_delete_all_for_model(
+            model_name="Team", batch_size=1, output=lambda message: None
+        )
+
+        assert success
+        assert db.session.query(Team).count() == 0
+
+    def test_delete_activity_sprints(self, db_session):
+        team = Team(code="ABC", name="Team ABC", parent_team=None)
+        db.session.add(team)
+        db.session.commit()
+        activities = [
+            Activity(team_id=team.team_id, activity_name=name)
+            for name in ("ABC", "DEF")
+        ]
+        db.session.add_all(activities)
+        db.session.commit()
+        for activity in activities:
+            for nr in range(2):
+                sprint = Sprint(
+                    activity_id=activity.activity_id,
+                    name=f"{activity.activity_name} {nr}",
+                    state=Sprint.State.CLOSED.value,
+                )
+                db.session.add(sprint)
+                db.session.commit()
+                for days in range(3):
+                    db.session.add(
+                        IssueSnapshot(
+                            issue_id=1,
+                            story_points=1,
+                            status="To Do",
+                            sprint_id=sprint.sprint_id,
+                            snapshot_date=datetime(2020, 3, 2, 5)
+                            + timedelta(days=days),
+                        )
+                    )
+                db.session.commit()
+        progress = []
+
+        deleted = delete_activity_sprints(
+            activities[0].activity_id,
+            batch_size=4,
+            progress=lambda table_name, cnt: progress.append((table_name, cnt)),
+        )
+
+        assert deleted["sprints"] == 2
+        assert deleted["issue_snapshots"] == 6
+        assert deleted["daily_issue_snapshots"] == 6
+        assert ("issue_snapshots", 4) in progress
+        assert progress[-1] == ("sprints", 2)
+        assert Sprint.query.count() == 2
+        assert IssueSnapshot.query.count() == 6
+        assert DailyIssueSnapshot.query.count() == 6
+
     def test_delete_records_fail_on_unsupported_model(self):
         # Try to delete records for unsupported model
         success = action_delete_all_for_model(model_name="I_do_not_exist", output=print)
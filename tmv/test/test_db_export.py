@@ -0,0 +1,98 @@
+import csv
+import io
+import pytest
+from tools.db_tool import action_export_table
+
+from database import db
+
+from structure.organization import Team
+from structure.events import Sprint, IssueSnapshot
+from structure.project import Activity
+from datetime import date, datetime, timedelta
+
+
+@pytest.mark.usefixtures("app")
+class TestDbExport:
+    def setup_snapshots(self):
+        teams = [Team(code=code, name=f"Team {code}") for code in ("ABC", "DEF")]
+        db.session.add_all(teams)
+        db.session.commit()
+        activities = [
+            Activity(team_id=team.team_id, activity_name=team.code) for team in teams
+        ]
+        db.session.add_all(activities)
+        db.session.commit()
+
+        sprints = []
+        for activity in activities:
+            sprint = Sprint(
+                activity_id=activity.activity_id,
+                name=f"{activity.activity_name} 1",
+                state=Sprint.State.CLOSED.value,
+                start_date=datetime(2020, 3, 2),
+                end_date=datetime(2020, 3, 6),
+            )
+            db.session.add(sprint)
+            db.session.commit()
+            for days in range(5):
+                db.session.add(
+                    IssueSnapshot(
+                        issue_id=1,
+                        story_points=1.5,
+                        status="To Do",
+                        sprint_id=sprint.sprint_id,
+                        snapshot_date=datetime(2020, 3, 2, 5) + timedelta(days=days),
+                    )
+                )
+            sprints.append(sprint)
+        db.session.commit()
+        return teams, activities, sprints
+
+    def test_export_csv_with_filters(self):
+        teams, _, sprints = self.setup_snapshots()
+        to_file = io.BytesIO()
+
+        assert action_export_table(
+            "issue_snapshots",
+            to_file,
+            team_id=teams[0].team_id,
+            from_date=date(2020, 3, 3),
+            to_date=date(2020, 3, 5),
+            output=print,
+        )
+
+        rows = list(csv.DictReader(io.StringIO(to_file.getvalue().decode())))
+        assert len(rows) == 3
+        assert {row["sprint_id"] for row in rows} == {str(sprints[0].sprint_id)}
+        assert sorted(row["snapshot_date"][:10] for row in rows) == [
+            "2020-03-03",
+            "2020-03-04",
+            "2020-03-05",
+        ]
+
+    def test_export_parquet(self):
+        pq = pytest.importorskip("pyarrow.parquet")
+        _, activities, _ = self.setup_snapshots()
+        to_file = io.BytesIO()
+
+        assert action_export_table(
+            "issue_snapshots",
+            to_file,
+            file_format="parquet",
+            activity_id=activities[1].activity_id,
+            batch_size=2,
+            output=print,
+        )
+
+        archive = pq.ParquetFile(io.BytesIO(to_file.getvalue()))
+        assert archive.metadata.num_rows == 5
+        assert archive.metadata.num_row_groups == 3
+        assert [
+            float(sp) for sp in archive.read().column("story_points").to_pylist()
+        ] == [1.5] * 5
+
+    def test_export_fails_on_unsupported_filter(self):
+        assert not action_export_table(
+            "m_overtime", io.BytesIO(), activity_id=1, output=print
+        )
+        assert not action_export_table("I_do_not_exist", io.BytesIO(), output=print)
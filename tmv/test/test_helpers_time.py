@@ -1,7 +1,7 @@
 import pytest  # pylint: disable=unused-import
-from datetime import datetime, time, timedelta
+from datetime import date, datetime, time, timedelta
 
-from helpers.time import to_timedelta
+from helpers.time import to_timedelta, workdays
 
 
 class TestTimeHelpers:
@@ -50,3 +50,14 @@ class TestTimeHelpers:
 
     def test_GivenTime_ShouldReturnTimeDelta(self):
         assert to_timedelta(time(15, 10)) == timedelta(hours=15, minutes=10)
+
+    def test_GivenDateRange_ShouldReturnWorkdays(self):
+        # Thursday to Tuesday
+        assert workdays(date(2020, 4, 9), date(2020, 4, 14)) == [
+            date(2020, 4, 9),
+            date(2020, 4, 10),
+            date(2020, 4, 13),
+            date(2020, 4, 14),
+        ]
+        assert workdays(date(2020, 4, 11), date(2020, 4, 12)) == []
+        assert workdays(date(2020, 4, 14), date(2020, 4, 13)) == []
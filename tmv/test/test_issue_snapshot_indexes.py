@@ -0,0 +1,152 @@
+import json
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+import sqlalchemy as sa
+
+from database import db
+from structure.events import (
+    IssueSnapshot,
+    Sprint,
+    compact_snapshot_day,
+    find_snapshot_gaps,
+    rebuild_sprint_rollups,
+)
+from structure.project import StatusCategory
+from visuals import BurnupGraphController, CumulativeFlowGraphController
+
+
+@contextmanager
+def captured_statements():
+    """ Captures the SQL statements executed with their parameters """
+    statements = []
+
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):  # pylint: disable=too-many-arguments
+        statements.append((statement, parameters))
+
+    sa.event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        sa.event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def seq_scanned_relations(plan: dict) -> set:
+    """ Returns the tables a query plan scans sequentially """
+    relations = set()
+    if plan["Node Type"] == "Seq Scan":
+        relations.add(plan["Relation Name"])
+    for sub_plan in plan.get("Plans", []):
+        relations |= seq_scanned_relations(sub_plan)
+    return relations
+
+
+def assert_no_seq_scans(statements: list, table_names: tuple):
+    """
+    Asserts that the plans of the statements don't scan the tables or their
+    partitions (e.g. `issue_snapshots_p2020_01`) sequentially.
+    """
+    # the seeded tables are small, so make sequential scans the last resort
+    db.session.execute("SET LOCAL enable_seqscan = off")
+    cursor = db.session.connection().connection.cursor()
+    for statement, parameters in statements:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        for relation in seq_scanned_relations(plan[0]["Plan"]):
+            assert not relation.startswith(table_names), statement
+
+
+@pytest.mark.usefixtures("app")
+class TestIssueSnapshotIndexes:
+    def setup_required_objects(self, make_sprint) -> Sprint:
+        status_mappings = {
+            "To Do": StatusCategory.to_do,
+            "In Progress": StatusCategory.in_progress,
+            "Done": StatusCategory.done,
+        }
+
+        # 5 sprints x 14 days x 40 issues x 2 snapshots per day
+        base_date = datetime(2020, 1, 6, 8)
+        statuses = ["To Do", "In Progress", "Done"]
+        for sprint_idx in range(5):
+            start_date = base_date + timedelta(days=14 * sprint_idx)
+            sprint = make_sprint(
+                start_date,
+                last_updated=start_date + timedelta(days=20),
+                status_mappings=status_mappings,
+            )
+            db.session.bulk_insert_mappings(
+                IssueSnapshot,
+                [
+                    dict(
+                        sprint_id=sprint.sprint_id,
+                        issue_id=issue_id,
+                        status=statuses[(day + issue_id) // 6 % 3],
+                        story_points=issue_id % 5,
+                        snapshot_date=start_date + timedelta(days=day, hours=hours),
+                    )
+                    for day in range(14)
+                    for issue_id in range(40)
+                    for hours in (0, 8)
+                ],
+            )
+        db.session.commit()
+        # bulk inserts bypass the rollup maintenance of the session
+        rebuild_sprint_rollups()
+        db.session.execute("ANALYZE issue_snapshots")
+        db.session.execute("ANALYZE sprint_daily_rollups")
+        return sprint
+
+    @pytest.mark.parametrize(
+        "visual_class", [BurnupGraphController, CumulativeFlowGraphController]
+    )
+    def test_visual_queries_use_indexes(self, make_sprint, visual_class):
+        sprint = self.setup_required_objects(make_sprint)
+
+        with captured_statements() as statements:
+            visual_class().figure(sprint)
+        statements = [
+            (statement, parameters)
+            for statement, parameters in statements
+            if statement.lstrip().upper().startswith("SELECT")
+            and ("issue_snapshots" in statement or "sprint_daily_rollups" in statement)
+        ]
+        assert statements
+
+        assert_no_seq_scans(statements, ("issue_snapshots", "sprint_daily_rollups"))
+
+    def test_snapshot_queries_use_indexes(self, make_sprint):
+        sprint = self.setup_required_objects(make_sprint)
+
+        # the queries which still read the issue snapshots themselves
+        with captured_statements() as statements:
+            # upsert_daily_issue_snapshots
+            db.session.add(
+                IssueSnapshot(
+                    sprint_id=sprint.sprint_id,
+                    issue_id=1,
+                    status="Done",
+                    story_points=1,
+                    snapshot_date=sprint.start_date + timedelta(hours=9),
+                )
+            )
+            db.session.commit()
+            # refresh_daily_issue_snapshots
+            rebuild_sprint_rollups([sprint.sprint_id])
+            find_snapshot_gaps(sprint.activity_id)
+            compact_snapshot_day(sprint.start_date.date())
+        statements = [
+            (statement, parameters)
+            for statement, parameters in statements
+            if re.search(r"\bissue_snapshots\b", statement)
+            and not statement.lstrip().upper().startswith("INSERT INTO ISSUE_SNAPSHOTS")
+        ]
+        assert len(statements) >= 5
+
+        assert_no_seq_scans(statements, ("issue_snapshots",))
@@ -0,0 +1,148 @@
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from database import db
+from structure.events import IssueSnapshot, Sprint
+from structure.organization import Team
+from structure.project import Activity, JiraProject, JiraSyncStrategy
+from connectors.jira.jira_sync import JiraSync
+from test.mock_objects import FakeJira
+
+SPRINT_ID = 7
+BOARD_ID = 3
+CREATED = datetime(2020, 4, 1, 10)
+
+
+@pytest.mark.usefixtures("app")
+class TestJiraSprintReport:
+    def setup_required_objects(self) -> Sprint:
+        team = Team(parent_team=None, code="ABC", name="Team ABC")
+        db.session.add(team)
+
+        project = JiraProject(project_key="FAKE", project_name="Fake Project")
+        db.session.add(project)
+        db.session.commit()
+
+        activity = Activity(
+            team_id=team.team_id,
+            activity_name="ABC Activity",
+            jira_project_id=project.id,
+        )
+        db.session.add(activity)
+        db.session.commit()
+
+        # closed sprint from Mon 2020-04-06 to Fri 2020-04-17
+        sprint = Sprint(
+            activity_id=activity.activity_id,
+            jira_sprint_id=SPRINT_ID,
+            name="Fake Sprint",
+            state=Sprint.State.CLOSED.value,
+            start_date=datetime(2020, 4, 6, 9),
+            end_date=datetime(2020, 4, 17, 17),
+            complete_date=datetime(2020, 4, 17, 17),
+        )
+        db.session.add(sprint)
+        db.session.commit()
+        return sprint
+
+    def sync(self, fake_jira: FakeJira, sprint: Sprint, strategy: JiraSyncStrategy):
+        """
+        Syncs the sprint with the given strategy and returns its snapshots
+        as set of (date, issue_id, status, story_points).
+        """
+        sprint.activity.jira_sync_strategy = strategy
+        db.session.commit()
+        with patch("connectors.jira.jira_sync.jira_core") as mock_jira_core:
+            mock_jira_core.connect.return_value = fake_jira
+            JiraSync().sync_sprint_issues(sprint, probe=False)
+
+        snapshots = {
+            (s.snapshot_date, s.issue_id, s.status, float(s.story_points))
+            for s in IssueSnapshot.query.filter_by(sprint_id=sprint.sprint_id)
+        }
+        IssueSnapshot.query.delete()
+        db.session.commit()
+        return snapshots
+
+    def test_strategies_consistent(self):
+        sprint = self.setup_required_objects()
+        issue = dict(created=CREATED, status="To Do", story_points=3, in_sprint=True)
+        fake_jira = FakeJira(
+            SPRINT_ID,
+            BOARD_ID,
+            [
+                dict(
+                    issue,
+                    id=1,
+                    changes=[
+                        (datetime(2020, 4, 8, 10), "status", "In Progress"),
+                        (datetime(2020, 4, 10, 10), "status", "Done"),
+                    ],
+                ),
+                dict(
+                    issue,
+                    id=2,
+                    story_points=5,
+                    changes=[(datetime(2020, 4, 14, 10), "status", "In Progress")],
+                ),
+                dict(
+                    issue,
+                    id=3,
+                    created=datetime(2020, 4, 9, 10),
+                    changes=[(datetime(2020, 4, 16, 10), "status", "Done")],
+                ),
+            ],
+        )
+
+        search_snapshots = self.sync(fake_jira, sprint, JiraSyncStrategy.search)
+        search_cnt = fake_jira.search_cnt
+
+        fake_jira.search_cnt = 0
+        report_snapshots = self.sync(fake_jira, sprint, JiraSyncStrategy.sprint_report)
+
+        assert len(search_snapshots) > 0
+        assert report_snapshots == search_snapshots
+        # 10 workdays x 3 statuses vs. a single search for the changelogs
+        assert search_cnt == 30
+        assert fake_jira.search_cnt == 1
+
+    def test_sprint_report_scope_changes(self):
+        sprint = self.setup_required_objects()
+        issue = dict(created=CREATED, status="To Do", story_points=2, in_sprint=True)
+        fake_jira = FakeJira(
+            SPRINT_ID,
+            BOARD_ID,
+            [
+                # added to the sprint on Mon 2020-04-13
+                dict(
+                    issue,
+                    id=4,
+                    in_sprint=False,
+                    changes=[(datetime(2020, 4, 13, 10), "in_sprint", True)],
+                ),
+                # re-estimated on Thu 2020-04-09
+                dict(
+                    issue,
+                    id=5,
+                    changes=[(datetime(2020, 4, 9, 10), "story_points", 5)],
+                ),
+                # removed from the sprint on Wed 2020-04-08
+                dict(
+                    issue,
+                    id=6,
+                    changes=[(datetime(2020, 4, 8, 10), "in_sprint", False)],
+                ),
+            ],
+        )
+
+        snapshots = self.sync(fake_jira, sprint, JiraSyncStrategy.sprint_report)
+        days_by_issue = {
+            issue_id: sorted(dt.day for dt, i, _, _ in snapshots if i == issue_id)
+            for issue_id in (4, 5, 6)
+        }
+        assert days_by_issue[4] == [13, 14, 15, 16, 17]
+        assert days_by_issue[6] == [6, 7]
+        points_by_day = {dt.day: sp for dt, i, _, sp in snapshots if i == 5}
+        assert points_by_day[8] == 2
+        assert points_by_day[9] == 5
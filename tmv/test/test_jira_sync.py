@@ -2,7 +2,7 @@
 
 import pytest
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime
 from dateutil.parser import isoparse
 from dateutil.tz import tzutc
 from unittest.mock import Mock, patch
@@ -30,6 +30,37 @@ class Issue:
     raw: dict
 
 
+class JiraRestMock:
+    """
+    Answers the JIRA REST calls made via `JIRA._get_json`.
+    Agile REST API listings are paged like the real API.
+    """
+
+    def __init__(self, boards=None, sprints=None, search_total=0):
+        self.boards = boards or []
+        self.sprints = sprints or []
+        self.search_total = search_total
+
+    def __call__(self, path, params=None, base=None):
+        params = params or {}
+        if path.startswith("project/"):
+            return JIRA_PROJECT_STATUSES
+        if path == "search":
+            return {"total": self.search_total, "issues": []}
+        if path == "board":
+            values = self.boards
+        elif path.startswith("board/"):
+            values = self.sprints
+        else:
+            raise NotImplementedError(path)
+        start_at = params.get("startAt", 0)
+        max_results = params.get("maxResults", 50)
+        return {
+            "values": values[start_at : start_at + max_results],
+            "isLast": start_at + max_results >= len(values),
+        }
+
+
 JIRA_FIELDS = [
     {
         "id": "customfield_10020",
@@ -68,8 +99,17 @@ JIRA_STATUSES = [
     Status("To Do", StatusCategory("To Do")),
     Status("Done", StatusCategory("Done")),
 ]
+JIRA_PROJECT_STATUSES = [
+    {
+        "name": "Story",
+        "statuses": [{"name": "To Do"}, {"name": "In Progress"}, {"name": "Done"}],
+    },
+    {"name": "Bug", "statuses": [{"name": "To Do"}, {"name": "Done"}]},
+]
 SPRINT_START_DATE = "2020-04-09T08:02:27.921Z"
 SPRINT_END_DATE = "2020-04-23T08:22:27.921Z"
+# Thu 2020-04-09 to Thu 2020-04-23 without the two weekends in between
+SPRINT_WORKDAYS_CNT = 11
 
 
 def search_issues(*args, **kwargs):
@@ -182,6 +222,15 @@ def search_issues_inc_sprint_dict(*args, **kwargs):
     return issues_list
 
 
+def search_issues_of_projects(*args, **kwargs):
+    """ Issues 0-9 belong to project TP-1, issues 10-14 to project TP-2 """
+    issues_list = search_issues(*args, **kwargs)
+    for issue in issues_list:
+        project_key = "TP-1" if int(issue.raw["id"]) < 10 else "TP-2"
+        issue.raw["key"] = f"{project_key}-{issue.raw['id']}"
+    return issues_list
+
+
 @pytest.mark.usefixtures("app")
 class TestJiraSync:
     def setup_required_objects(self):
@@ -275,6 +324,51 @@ class TestJiraSync:
 
         assert len(issues) == 0
 
+    @patch("connectors.jira.jira_sync.jira_core")
+    @patch("connectors.jira.jira_sync.datetime")
+    def test_snapshot_projects(self, mock_datetime, mock_jira_core):
+        self.setup_required_objects()
+
+        project = JiraProject(project_key="TP-2", project_name="Test Project 2")
+        db.session.add(project)
+        db.session.commit()
+        activity = Activity(
+            team_id=Team.query.first().team_id,
+            activity_name="ABC Activity 2",
+            jira_project_id=project.id,
+        )
+        db.session.add(activity)
+        db.session.commit()
+
+        # mock datetime within sprint duration
+        mock_datetime.now.return_value = datetime(2020, 4, 15, 23, 59, tzinfo=tzutc())
+        mock_datetime.side_effect = lambda *args, **kw: datetime(*args, **kw)
+
+        # mock jira calls
+        mock_jira = Mock()
+        mock_jira.fields.return_value = JIRA_FIELDS
+        mock_jira.statuses.return_value = JIRA_STATUSES
+        mock_jira.search_issues.side_effect = search_issues_of_projects
+        mock_jira_core.connect.return_value = mock_jira
+
+        j = JiraSync()
+        issues_by_project = j._get_issues_by_projects(["TP-1", "tp-2"])
+        assert len(issues_by_project["TP-1"]) == 10
+        assert len(issues_by_project["tp-2"]) == 5
+
+        mock_jira.search_issues.reset_mock()
+        projects = JiraProject.query.order_by(JiraProject.project_key).all()
+        j.snapshot_projects(projects, batch_size=50)
+
+        # one search for both projects
+        assert mock_jira.search_issues.call_count == 1
+        assert mock_jira.search_issues.call_args[0][0] == 'project in ("TP-1", "TP-2")'
+        assert IssueSnapshot.query.count() == 15
+
+        mock_jira.search_issues.reset_mock()
+        j.snapshot_projects(projects, batch_size=1)
+        assert mock_jira.search_issues.call_count == 2
+
     @patch("connectors.jira.jira_sync.jira_core")
     def test_sync_sprints(self, mock_jira_core):
         self.setup_required_objects()
@@ -283,6 +377,7 @@ class TestJiraSync:
         mock_jira = Mock()
         mock_jira.fields.return_value = JIRA_FIELDS
         mock_jira.statuses.return_value = JIRA_STATUSES
+        mock_jira._get_json.side_effect = JiraRestMock()
         mock_jira.search_issues.side_effect = search_issues
         mock_jira_core.connect.return_value = mock_jira
 
@@ -295,6 +390,54 @@ class TestJiraSync:
 
         assert len(sprints) == 1
 
+    @patch("connectors.jira.jira_sync.jira_core")
+    def test_sync_sprints_from_boards(self, mock_jira_core):
+        self.setup_required_objects()
+
+        sprint_dicts = [
+            {
+                "id": i,
+                "name": f"Sample Sprint {i}",
+                "state": "closed" if i < 7 else "active",
+                "startDate": SPRINT_START_DATE,
+                "endDate": SPRINT_END_DATE,
+                "originBoardId": 1,
+            }
+            for i in range(1, 8)
+        ]
+
+        # mock jira calls
+        mock_jira = Mock()
+        mock_jira.fields.return_value = JIRA_FIELDS
+        mock_jira.statuses.return_value = JIRA_STATUSES
+        mock_jira._get_json.side_effect = JiraRestMock(
+            boards=[{"id": 1, "type": "scrum"}], sprints=sprint_dicts
+        )
+        mock_jira_core.connect.return_value = mock_jira
+
+        with patch("connectors.jira.jira_sync.AGILE_PAGE_SIZE", 3):
+            j = JiraSync()
+            j.sync_all_sprints(JiraProject.query.first())
+
+        # issues aren't scanned, only scrum boards are listed
+        assert mock_jira.search_issues.call_count == 0
+        paths = [c[0][0] for c in mock_jira._get_json.call_args_list]
+        assert paths == ["board"] + ["board/1/sprint"] * 3
+        board_params = mock_jira._get_json.call_args_list[0][1]["params"]
+        assert board_params["projectKeyOrId"] == "TP-1"
+        assert board_params["type"] == "scrum"
+        assert Sprint.query.count() == 7
+        sprint = Sprint.query.filter_by(jira_sprint_id=7).one()
+        assert sprint.state == Sprint.State.ACTIVE.value
+        assert sprint.last_updated is None
+
+        # sprints get updated on the next sync
+        sprint.name = "Renamed"
+        db.session.commit()
+        j.sync_all_sprints(JiraProject.query.first())
+        assert Sprint.query.count() == 7
+        assert Sprint.query.filter_by(jira_sprint_id=7).one().name == "Sample Sprint 7"
+
     @patch("connectors.jira.jira_sync.jira_core")
     def test_sync_sprint_issues(self, mock_jira_core):
         self.setup_required_objects()
@@ -303,6 +446,7 @@ class TestJiraSync:
         mock_jira = Mock()
         mock_jira.fields.return_value = JIRA_FIELDS
         mock_jira.statuses.return_value = JIRA_STATUSES
+        mock_jira._get_json.side_effect = JiraRestMock()
         mock_jira.search_issues.side_effect = search_issues
         mock_jira_core.connect.return_value = mock_jira
 
@@ -312,9 +456,136 @@ class TestJiraSync:
         sprint = Sprint.query.first()
         issue_snapshots = sprint.issue_snapshots
 
+        # weekends are skipped
+        assert len(issue_snapshots) == SPRINT_WORKDAYS_CNT * 15
+
+    @patch("connectors.jira.jira_sync.jira_core")
+    def test_sync_sprint_issues_unchanged(self, mock_jira_core):
+        self.setup_required_objects()
+
+        # mock jira calls
+        mock_jira = Mock()
+        mock_jira.fields.return_value = JIRA_FIELDS
+        mock_jira.statuses.return_value = JIRA_STATUSES
+        mock_jira._get_json.side_effect = JiraRestMock()
+        mock_jira.search_issues.side_effect = search_issues
+        mock_jira_core.connect.return_value = mock_jira
+
+        j = JiraSync()
+        j.sync_all_sprints(JiraProject.query.first())
+        sprint = Sprint.query.first()
+
+        # synced until Tue 2020-04-14
+        sprint.last_updated = datetime(2020, 4, 14, 23, 59, 59)
+        for i in range(3):
+            db.session.add(
+                IssueSnapshot(
+                    sprint_id=sprint.sprint_id,
+                    issue_id=i,
+                    status="Done",
+                    story_points=1,
+                    snapshot_date=datetime(2020, 4, 14, 23, 59, 59),
+                )
+            )
+        db.session.commit()
+
+        mock_jira.search_issues.reset_mock()
+        mock_jira._get_json.side_effect = JiraRestMock(search_total=0)
+        j.sync_sprint_issues(sprint)
+
+        # only the count-only search was made
+        assert mock_jira.search_issues.call_count == 0
+        jql = mock_jira._get_json.call_args[1]["params"]["jql"]
+        assert jql.startswith("(sprint = 7 OR issue in (0, 1, 2)) AND updated >= ")
+        # carried forward to Wed 2020-04-15 until Thu 2020-04-23 without weekend
+        assert len(sprint.issue_snapshots) == 3 + 7 * 3
+        assert sprint.last_updated > datetime(2020, 4, 15)
+
+        # issues changed, so they get fetched
+        sprint.last_updated = datetime(2020, 4, 14, 23, 59, 59)
+        db.session.commit()
+        mock_jira._get_json.side_effect = JiraRestMock(search_total=2)
+        j.sync_sprint_issues(sprint)
+        assert mock_jira.search_issues.call_count > 0
+
+    @patch("connectors.jira.jira_sync.PROBE_ISSUE_BATCH_SIZE", 2)
+    @patch("connectors.jira.jira_sync.jira_core")
+    def test_has_sprint_changed_batches_issues(self, mock_jira_core):
+        mock_jira = Mock()
+        mock_jira.fields.return_value = JIRA_FIELDS
+        mock_jira.statuses.return_value = JIRA_STATUSES
+        mock_jira_core.connect.return_value = mock_jira
+        sprint = Sprint(jira_sprint_id=7, last_updated=datetime(2020, 4, 14))
+        snapshots = [IssueSnapshot(issue_id=i) for i in range(5)]
+
+        mock_jira._get_json.side_effect = JiraRestMock(search_total=0)
+        j = JiraSync()
+        assert not j.has_sprint_changed(sprint, snapshots)
+
+        jqls = [c[1]["params"]["jql"] for c in mock_jira._get_json.call_args_list]
+        assert [jql.split(" AND ")[0] for jql in jqls] == [
+            "(sprint = 7 OR issue in (0, 1))",
+            "issue in (2, 3)",
+            "issue in (4)",
+        ]
+
+        # stops at the first search finding changes
+        mock_jira._get_json.reset_mock()
+        mock_jira._get_json.side_effect = JiraRestMock(search_total=1)
+        assert j.has_sprint_changed(sprint, snapshots)
+        assert mock_jira._get_json.call_count == 1
+
+    @patch("connectors.jira.jira_sync.jira_core")
+    def test_plan_sprint_backfill(self, mock_jira_core):
+        self.setup_required_objects()
+
+        # mock jira calls
+        mock_jira = Mock()
+        mock_jira.fields.return_value = JIRA_FIELDS
+        mock_jira.statuses.return_value = JIRA_STATUSES + [
+            Status("Rejected", StatusCategory("Done"))
+        ]
+        mock_jira._get_json.side_effect = JiraRestMock()
+        mock_jira.search_issues.side_effect = search_issues
+        mock_jira_core.connect.return_value = mock_jira
+
+        j = JiraSync()
+        j.sync_all_sprints(JiraProject.query.first())
+        sprint = Sprint.query.first()
+
+        plan = j.plan_sprint_backfill(sprint)
+        # only statuses of the project's workflows are searched
+        assert plan.statuses == ["In Progress", "To Do", "Done"]
+        assert len(plan.dates) == SPRINT_WORKDAYS_CNT
+        assert all(dt.weekday() < 5 for dt in plan.dates)
+        assert plan.estimated_calls == SPRINT_WORKDAYS_CNT * 3
+
         start_date = isoparse(SPRINT_START_DATE)
         end_date = isoparse(SPRINT_END_DATE)
         timedelta_days = (end_date - start_date).days
 
         # add 1 to timedelta because query is inclusive
-        assert len(issue_snapshots) == (timedelta_days + 1) * 15
+        plan = j.plan_sprint_backfill(sprint, skip_weekends=False)
+        assert len(plan.dates) == timedelta_days + 1
+
+    @patch("connectors.jira.jira_sync.jira_core")
+    def test_sync_sprint_days(self, mock_jira_core):
+        self.setup_required_objects()
+
+        # mock jira calls
+        mock_jira = Mock()
+        mock_jira.fields.return_value = JIRA_FIELDS
+        mock_jira.statuses.return_value = JIRA_STATUSES
+        mock_jira._get_json.side_effect = JiraRestMock()
+        mock_jira.search_issues.side_effect = search_issues
+        mock_jira_core.connect.return_value = mock_jira
+
+        j = JiraSync()
+        j.sync_all_sprints(JiraProject.query.first())
+        j.sync_sprint_days(Sprint.query.first(), [date(2020, 4, 14), date(2020, 4, 15)])
+        sprint = Sprint.query.first()
+
+        # one search per day and status
+        assert mock_jira.search_issues.call_count == 1 + 2 * 3
+        assert len(sprint.issue_snapshots) == 2 * 15
+        assert sprint.last_updated is None
@@ -4,7 +4,7 @@ from test import TEST_RESOURCES_DIRECTORY
 from datetime import date, timedelta
 from database import db
 from structure.organization import Team
-from structure.measurements import OTMeasurement
+from structure.measurements import OTMeasurement, OTMonthlyStatistics
 from tools.db_tool import action_process_overtime_data, action_commit_overtime_data
 
 
@@ -99,6 +99,21 @@ class TestOTImporter:
             == 24
         )
 
+        # The monthly statistics were computed on commit; the department
+        # rolls up all its teams
+        august_stats = {
+            stats.team.code: stats
+            for stats in OTMonthlyStatistics.query.filter(
+                OTMonthlyStatistics.month == date(2019, 8, 1)
+            )
+        }
+        assert august_stats["CodeA"].member_count == 3
+        assert august_stats["Dptmnt"].member_count == 3
+        assert (
+            august_stats["Dptmnt"].ot_per_day_median
+            == august_stats["CodeA"].ot_per_day_median
+        )
+
     def test_strange_sheet_name(self):
         # Tries to import a file with wrongly formatted sheet names.
         # This should not import any data to the database.
@@ -1,8 +1,13 @@
+import pandas as pd
 import pytest
 from database import db
 from test.mock_objects import UserMock
 
-from structure.measurements import OTMeasurement
+from structure.measurements import (
+    OTMeasurement,
+    OTMonthlyStatistics,
+    refresh_overtime_statistics,
+)
 from structure.organization import Team
 
 from visuals import OvertimeChartController
@@ -47,3 +52,60 @@ class TestOvertimeVisual:
         # Check if dates in overtime chart match
         assert ot_visual.get_earliest_date() == min(dates)
         assert ot_visual.get_latest_date() == max(dates)
+
+    def test_monthly_statistics(self, ot_visual, mocker):
+        department = Team(parent_team=None, code="DEP", name="Department")
+        teams = [
+            Team(parent_team=department, code=code, name=f"Team {code}")
+            for code in ("ABC", "DEF")
+        ]
+        db.session.add_all([department] + teams)
+        for team, hours in ((teams[0], [10, 20, 30]), (teams[1], [40, -10])):
+            for overtime in hours:
+                db.session.add(
+                    OTMeasurement(
+                        measurement_date=date(2019, 8, 1),
+                        team=team,
+                        workdays_fix=10,
+                        workdays_actual=10,
+                        overtime=timedelta(hours=overtime),
+                    )
+                )
+        # without workdays, left out of the statistics
+        db.session.add(
+            OTMeasurement(
+                measurement_date=date(2019, 8, 1),
+                team=teams[0],
+                workdays_fix=10,
+                workdays_actual=0,
+                overtime=timedelta(hours=5),
+            )
+        )
+        db.session.commit()
+        refresh_overtime_statistics()
+        db.session.commit()
+
+        stats = {
+            row.team_id: row
+            for row in OTMonthlyStatistics.query.filter(
+                OTMonthlyStatistics.month == date(2019, 8, 1)
+            )
+        }
+        assert stats[teams[0].team_id].member_count == 3
+        assert stats[teams[0].team_id].ot_per_day_min == timedelta(hours=1)
+        assert stats[teams[0].team_id].ot_per_day_median == timedelta(hours=2)
+        assert stats[teams[0].team_id].ot_per_day_max == timedelta(hours=3)
+        assert stats[department.team_id].member_count == 5
+        assert stats[department.team_id].ot_per_day_q1 == timedelta(hours=1)
+        assert stats[department.team_id].ot_per_day_median == timedelta(hours=2)
+        assert stats[department.team_id].ot_per_day_q3 == timedelta(hours=3)
+        assert stats[department.team_id].ot_per_day_mean == timedelta(hours=1.8)
+
+        mocker.patch("visuals.work_time.current_user", UserMock())
+        traces, _ = ot_visual.update(
+            date(2019, 8, 1), date(2019, 8, 1), selected_teams=[teams[1].team_id]
+        )
+        assert len(traces) == 1
+        # negative overtime is shown as 0
+        assert pd.Timestamp(traces[0].lowerfence[0]) == pd.Timestamp("1970-01-01")
+        assert pd.Timestamp(traces[0].upperfence[0]) == pd.Timestamp("1970-01-01 04:00")
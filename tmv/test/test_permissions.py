@@ -1,10 +1,16 @@
+import time
+from collections import defaultdict
+
 import pytest
+from sqlalchemy import text
+
 from database import db
-from structure.organization import Team
+from structure.organization import Team, TeamClosure, refresh_team_closure
 from structure.auth import (
     User,
     UserTeam,
     find_role_from_parents,
+    load_department_team_ids,
     load_team_tree_permissions,
     TeamRoleEnum,
     get_department_ids_from_team_tree,
@@ -209,3 +215,194 @@ class TestPermissions:
             [t["dep2"], t["dep2_team1"], t["dep2_team2"]]
         )
         assert set(u.writable_team_ids) == set([t["dep2"], t["dep2_team1"]])
+
+    def test_department_team_ids(self):
+        # fmt: off
+        u, t = create_setup([
+            ('dep1', None, [
+                ('dep2', TeamRoleEnum.member.value, [
+                    ('dep2_team1', None, []),
+                    ('dep2_team2', None, []),
+                ]),
+                ('dep1_team1', None, []),
+            ]),
+        ])
+        # fmt: on
+        result = load_team_tree_permissions(u)
+        for department in ("dep1", "dep2"):
+            assert set(load_department_team_ids(u, t[department])) == set(
+                get_department_team_ids_from_team_tree(result, u, t[department])
+            )
+        assert set(u.get_listable_department_team_ids(t["dep1"])) == set(
+            [t["dep2_team1"], t["dep2_team2"]]
+        )
+
+
+def closure_rows():
+    return {
+        (row.ancestor_id, row.descendant_id, row.depth)
+        for row in TeamClosure.query.all()
+    }
+
+
+@pytest.mark.usefixtures("app")
+class TestTeamClosure:
+    def test_insert(self):
+        # fmt: off
+        _, t = create_setup([
+            ('dep1', None, [
+                ('dep2', None, [
+                    ('dep2_team1', None, []),
+                ])
+            ]),
+        ])
+        # fmt: on
+        assert closure_rows() == {
+            (t["dep1"], t["dep1"], 0),
+            (t["dep2"], t["dep2"], 0),
+            (t["dep2_team1"], t["dep2_team1"], 0),
+            (t["dep1"], t["dep2"], 1),
+            (t["dep2"], t["dep2_team1"], 1),
+            (t["dep1"], t["dep2_team1"], 2),
+        }
+
+    def test_move_and_delete(self):
+        # fmt: off
+        _, t = create_setup([
+            ('dep1', None, [
+                ('dep2', None, [
+                    ('dep2_team1', None, []),
+                ])
+            ]),
+            ('dep3', None, []),
+        ])
+        # fmt: on
+        dep2 = Team.query.get(t["dep2"])
+        dep2.parent_team = Team.query.get(t["dep3"])
+        db.session.commit()
+        assert closure_rows() == {
+            (t["dep1"], t["dep1"], 0),
+            (t["dep2"], t["dep2"], 0),
+            (t["dep3"], t["dep3"], 0),
+            (t["dep2_team1"], t["dep2_team1"], 0),
+            (t["dep3"], t["dep2"], 1),
+            (t["dep2"], t["dep2_team1"], 1),
+            (t["dep3"], t["dep2_team1"], 2),
+        }
+
+        db.session.delete(Team.query.get(t["dep1"]))
+        db.session.commit()
+        assert (t["dep1"], t["dep1"], 0) not in closure_rows()
+
+        rows = closure_rows()
+        refresh_team_closure()
+        assert closure_rows() == rows
+
+    def test_cycle(self):
+        # fmt: off
+        _, t = create_setup([
+            ('dep1', None, [
+                ('dep2', None, []),
+            ]),
+        ])
+        # fmt: on
+        Team.query.get(t["dep1"]).parent_id = t["dep2"]
+        db.session.commit()
+        assert closure_rows() == {
+            (t["dep1"], t["dep1"], 0),
+            (t["dep2"], t["dep2"], 0),
+            (t["dep1"], t["dep2"], 1),
+            (t["dep2"], t["dep1"], 1),
+        }
+
+    @pytest.mark.benchmark
+    def test_team_tree_benchmark(self):
+        """ Benchmark: recursive CTE and parent walks vs. team closure """
+        level_sizes = [5, 15, 40, 100, 250, 600, 1390, 2600]  # 5k teams
+        levels = []
+        for level, size in enumerate(level_sizes):
+            teams = [
+                Team(
+                    code=f"L{level}T{i}",
+                    name=f"L{level}T{i}",
+                    parent_team=levels[-1][i % len(levels[-1])] if levels else None,
+                )
+                for i in range(size)
+            ]
+            db.session.add_all(teams)
+            db.session.flush()
+            levels.append(teams)
+        u = User(email="test@localhost")
+        db.session.add(u)
+        db.session.add(
+            UserTeam(user=u, team=levels[2][0], role=TeamRoleEnum.member.value)
+        )
+        db.session.add(
+            UserTeam(user=u, team=levels[5][3], role=TeamRoleEnum.team_admin.value)
+        )
+        db.session.commit()
+
+        def recursive_cte():
+            result = db.session.execute(
+                text(
+                    """
+                    WITH RECURSIVE team_tree AS (
+                        SELECT t.team_id, t.parent_id, ut.role
+                            FROM user_team AS ut, teams AS t
+                            WHERE t.team_id = ut.team_id AND ut.user_id = :user_id
+                        UNION
+                            SELECT x.team_id, x.parent_id, b.role
+                            FROM team_tree tt, teams x
+                            LEFT JOIN user_team AS b ON (
+                                b.team_id = x.team_id
+                                AND b.user_id = :user_id
+                            )
+                            WHERE x.team_id = tt.parent_id OR tt.team_id = x.parent_id
+                    ) SELECT * FROM team_tree;"""
+                ),
+                {"user_id": u.id},
+            )
+            team_roles = {}
+            team_parents = {}
+            team_children = defaultdict(set)
+            for team_id, parent_id, role in result:
+                team_roles[team_id] = role
+                if parent_id:
+                    team_parents[team_id] = parent_id
+                    team_children[parent_id].add(team_id)
+            for team_id, role in team_roles.items():
+                if role is None:
+                    team_roles[team_id] = find_role_from_parents(
+                        team_roles, team_parents, team_id
+                    )
+            return team_roles
+
+        def closure():
+            return load_team_tree_permissions(u).team_roles
+
+        calls = 20
+        timings = dict()
+        results = dict()
+        for name, run in (("recursive", recursive_cte), ("closure", closure)):
+            start = time.perf_counter()
+            for _ in range(calls):
+                results[name] = run()
+            timings[name] = (time.perf_counter() - start) / calls
+        assert results["closure"] == results["recursive"]
+
+        department_id = levels[1][0].team_id
+        start = time.perf_counter()
+        tree_team_ids = get_department_team_ids_from_team_tree(
+            load_team_tree_permissions(u), u, department_id
+        )
+        timings["department tree"] = time.perf_counter() - start
+        start = time.perf_counter()
+        closure_team_ids = load_department_team_ids(u, department_id)
+        timings["department closure"] = time.perf_counter() - start
+        assert set(closure_team_ids) == set(tree_team_ids)
+
+        print(
+            ", ".join(
+                f"{name} {timing * 1000:.3f}ms" for name, timing in timings.items()
+            )
+        )
@@ -0,0 +1,117 @@
+import time
+import pandas as pd
+import pytest
+from database import db, read_frame
+
+from structure.measurements import OTMeasurement
+from structure.organization import Team
+from datetime import date, timedelta
+
+
+@pytest.mark.usefixtures("app")
+class TestReadFrame:
+    def setup_measurements(self, count: int):
+        teams = [Team(code=f"T{i}", name=f"Team {i}") for i in range(10)]
+        db.session.add_all(teams)
+        db.session.commit()
+        db.session.bulk_insert_mappings(
+            OTMeasurement,
+            [
+                dict(
+                    measurement_date=date(2019, 1, 1) + timedelta(days=i // 10),
+                    team_id=teams[i % 10].team_id,
+                    workdays_fix=20,
+                    workdays_actual=20 - i % 3,
+                    overtime=timedelta(hours=i % 40, minutes=15),
+                )
+                for i in range(count)
+            ],
+        )
+        db.session.commit()
+
+    def query(self):
+        return (
+            db.session.query(
+                OTMeasurement.measurement_date,
+                OTMeasurement.workdays_actual,
+                Team.name.label("team_name"),
+            )
+            .join(Team)
+            .filter(Team.name.like("Team %"), Team.code.in_(["T1", "T2", "T3"]))
+            .order_by(OTMeasurement.pk)
+        )
+
+    def test_matches_read_sql(self):
+        self.setup_measurements(100)
+        statement = self.query().statement
+
+        expected = pd.read_sql(
+            statement, db.session.connection(), parse_dates=["measurement_date"]
+        )
+        result = read_frame(
+            statement, dtype={"team_name": str}, parse_dates=["measurement_date"]
+        )
+
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_keeps_na_like_strings(self):
+        names = ["", "NA", "N/A", "NULL", "null", "nan"]
+        db.session.add_all(
+            [Team(code=f"N{i}", name=name) for i, name in enumerate(names)]
+        )
+        db.session.commit()
+
+        result = read_frame(
+            db.session.query(Team.name, Team.parent_id)
+            .filter(Team.code.like("N%"))
+            .order_by(Team.code)
+            .statement,
+            dtype={"name": str},
+        )
+
+        assert result["name"].tolist() == names
+        assert result["parent_id"].isna().all()
+
+    @pytest.mark.benchmark
+    def test_benchmark_read_sql(self):
+        """ Benchmark: prints the load times of both for 300k of 1M rows """
+        self.setup_measurements(1000000)
+        statement = self.query().statement
+
+        start = time.perf_counter()
+        expected = pd.read_sql(
+            statement, db.session.connection(), parse_dates=["measurement_date"]
+        )
+        read_sql_time = time.perf_counter() - start
+        start = time.perf_counter()
+        result = read_frame(
+            statement, dtype={"team_name": str}, parse_dates=["measurement_date"]
+        )
+        read_frame_time = time.perf_counter() - start
+        print(
+            f"{len(result)} rows: read_sql {read_sql_time:.3f}s, "
+            f"read_frame {read_frame_time:.3f}s"
+        )
+
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_intervals_and_empty_results(self):
+        self.setup_measurements(3)
+        result = read_frame(
+            db.session.query(
+                db.func.extract("epoch", OTMeasurement.overtime).label("overtime")
+            )
+            .order_by(OTMeasurement.pk)
+            .statement
+        )
+        assert pd.to_timedelta(result["overtime"], unit="s").tolist() == [
+            timedelta(hours=hours, minutes=15) for hours in range(3)
+        ]
+
+        empty = read_frame(self.query().filter(OTMeasurement.pk < 0).statement)
+        assert empty.empty
+        assert list(empty.columns) == [
+            "measurement_date",
+            "workdays_actual",
+            "team_name",
+        ]
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+from database import REPLICA_BIND, RoutingSession, db
+from structure.organization import Team
+
+
+@pytest.fixture
+def routing_session(app):
+    """
+    A real routing session with a `replica` bind. Set
+    TESTING_SQLALCHEMY_REPLICA_DATABASE_URI to run against a second
+    PostgreSQL instance, otherwise the test database doubles as replica.
+    """
+    replica_uri = os.getenv(
+        "TESTING_SQLALCHEMY_REPLICA_DATABASE_URI", app.config["SQLALCHEMY_DATABASE_URI"]
+    )
+    binds = app.config.get("SQLALCHEMY_BINDS")
+    app.config["SQLALCHEMY_BINDS"] = {REPLICA_BIND: replica_uri}
+    session = db.create_scoped_session()
+    yield session
+    session.rollback()
+    session.remove()
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+
+def test_routing(app, routing_session):
+    primary = db.get_engine(app)
+    replica = db.get_engine(app, bind=REPLICA_BIND)
+    assert isinstance(routing_session(), RoutingSession)
+
+    # reads go to the primary unless asked otherwise
+    assert routing_session.get_bind(Team.__mapper__) is primary
+
+    routing_session.info["use_replica"] = True
+    assert routing_session.get_bind(Team.__mapper__) is replica
+    assert routing_session.get_bind(clause=text("SELECT 1").columns()) is replica
+
+    # raw SQL could write, e.g. with `WITH ... INSERT`, unless declared as select
+    assert routing_session.get_bind(clause=text("SELECT 1")) is primary
+    routing_session.info.pop("has_written")
+    assert routing_session.get_bind(clause=Team.__table__.insert()) is primary
+
+    # after a write, the session sticks to the primary to see its own writes
+    routing_session.info.pop("has_written")
+    routing_session.add(Team(parent_team=None, code="ABC", name="Team ABC"))
+    routing_session.flush()
+    assert routing_session.get_bind(Team.__mapper__) is primary
+    assert routing_session.query(Team).filter_by(code="ABC").count() == 1
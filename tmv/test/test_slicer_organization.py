@@ -4,7 +4,13 @@ from database import db
 import tmv_dash_components as tdc
 from test.mock_objects import UserMock
 from structure.organization import Team
-from slicers.organization import team_picker, department_picker, ALL_ITEMS_OPTION_ID
+from slicers.organization import (
+    team_picker,
+    department_picker,
+    ALL_ITEMS_OPTION_ID,
+    _teams_query,
+)
+import time
 
 
 @pytest.fixture
@@ -106,3 +112,43 @@ class TestOrganizationSlicers:
         assert picker is not None
         assert len(picker.options) == 2 + 1
         assert picker.value == department2.team_id
+
+    def test_baked_team_query(self, teams):
+        team_ids = [team.team_id for team in teams[2:]]
+        result = _teams_query(db.session()).params(team_ids=team_ids).all()
+        assert [tuple(team) for team in result] == [
+            (team.team_id, team.name) for team in teams[2:]
+        ]
+
+    @pytest.mark.benchmark
+    def test_benchmark_baked_team_query(self, teams):
+        """ Benchmark: building and compiling per call vs. baked """
+        team_ids = [team.team_id for team in teams[2:]]
+        calls = 200
+
+        def build_query():
+            return (
+                Team.query.with_entities(
+                    Team.team_id.label("value"), Team.name.label("label")
+                )
+                .filter(Team.team_id.in_(team_ids))
+                .order_by(Team.name)
+                .all()
+            )
+
+        def baked_query():
+            return _teams_query(db.session()).params(team_ids=team_ids).all()
+
+        timings = dict()
+        for name, run in (("built", build_query), ("baked", baked_query)):
+            start = time.perf_counter()
+            for _ in range(calls):
+                result = run()
+            timings[name] = (time.perf_counter() - start) / calls
+            assert [tuple(team) for team in result] == [
+                (team.team_id, team.name) for team in teams[2:]
+            ]
+        print(
+            f"per call: built {timings['built'] * 1000:.3f}ms, "
+            f"baked {timings['baked'] * 1000:.3f}ms"
+        )
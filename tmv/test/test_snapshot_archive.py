@@ -0,0 +1,105 @@
+import pytest
+from test.mock_objects import UserMock
+from test.test_snapshot_cube import setup_sprint
+from database import db
+
+from structure.events import DailyIssueSnapshot, IssueSnapshot, Sprint
+from visuals import BurnupGraphController, CumulativeFlowGraphController
+from structure.snapshot_archive import (
+    archive_activity_sprints,
+    archive_old_sprints,
+    archive_path,
+)
+from visuals.snapshot_archive import load_archived_rollups
+from visuals.snapshot_cube import query_sprint_rollups
+from datetime import datetime, timedelta
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture(scope="function")
+def archive_folder(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "SNAPSHOT_ARCHIVE_FOLDER", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.usefixtures("app")
+class TestSnapshotArchive:
+    @pytest.fixture(scope="function")
+    def sprint(self, make_sprint) -> Sprint:
+        base_date = datetime(2020, 3, 2, 5)
+        sprint = setup_sprint(make_sprint, base_date)
+        sprint.frozen_at = base_date + timedelta(days=5)
+        db.session.commit()
+        return sprint
+
+    def test_archive_matches_database(self, sprint, archive_folder):
+        from_db = query_sprint_rollups(sprint)
+
+        assert archive_old_sprints(datetime(2020, 3, 1)) == 0
+        assert archive_old_sprints(datetime(2020, 4, 1)) == 1
+        assert sprint.is_archived
+        assert archive_path(sprint.activity_id).startswith(str(archive_folder))
+        assert (
+            DailyIssueSnapshot.query.filter_by(sprint_id=sprint.sprint_id).count() == 0
+        )
+        assert IssueSnapshot.query.filter_by(sprint_id=sprint.sprint_id).count() == 0
+        assert query_sprint_rollups(sprint).empty
+
+        from_archive = load_archived_rollups(sprint)
+        key = ["day", "status"]
+        assert from_archive.sort_values(key).to_dict("records") == from_db.sort_values(
+            key
+        ).to_dict("records")
+
+    def test_rearchiving_keeps_other_sprints(self, sprint, make_sprint, archive_folder):
+        archive_old_sprints(datetime(2020, 4, 1))
+        from_archive = load_archived_rollups(sprint)
+
+        other_sprint = make_sprint(
+            datetime(2020, 3, 9), days=4, last_updated=datetime(2020, 3, 14)
+        )
+        other_sprint.frozen_at = datetime(2020, 3, 14)
+        db.session.commit()
+        db.session.add(
+            IssueSnapshot(
+                issue_id=7,
+                story_points=2,
+                status="Done",
+                sprint_id=other_sprint.sprint_id,
+                snapshot_date=datetime(2020, 3, 9, 5),
+            )
+        )
+        db.session.commit()
+        archive_activity_sprints(sprint.activity_id, [other_sprint])
+
+        assert load_archived_rollups(sprint).equals(from_archive)
+        assert load_archived_rollups(other_sprint)["issue_count"].tolist() == [1]
+
+    def test_skips_archived_sprints(self, sprint, archive_folder):
+        assert archive_activity_sprints(sprint.activity_id, [sprint]) > 0
+        from_archive = load_archived_rollups(sprint)
+
+        # e.g. a concurrent run which waited for the lock of the activity
+        assert archive_activity_sprints(sprint.activity_id, [sprint]) == 0
+        assert load_archived_rollups(sprint).equals(from_archive)
+
+    def test_visuals_read_archive(self, sprint, archive_folder, mocker):
+        mocker.patch("visuals.base.current_user", UserMock())
+        mocker.patch("visuals.base.SprintVisualController.check_for_data")
+        visual_classes = (BurnupGraphController, CumulativeFlowGraphController)
+
+        from_db = [
+            visual_class().update(sprint.sprint_id)[0]
+            for visual_class in visual_classes
+        ]
+        archive_old_sprints(datetime(2020, 4, 1))
+        from_archive = [
+            visual_class().update(sprint.sprint_id)[0]
+            for visual_class in visual_classes
+        ]
+
+        for db_traces, archive_traces in zip(from_db, from_archive):
+            assert [(trace.name, list(trace.y)) for trace in archive_traces] == [
+                (trace.name, list(trace.y)) for trace in db_traces
+            ]
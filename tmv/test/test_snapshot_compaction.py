@@ -0,0 +1,78 @@
+import pytest
+from database import db
+
+from structure.events import (
+    DailyIssueSnapshot,
+    IssueSnapshot,
+    Sprint,
+    compact_snapshot_day,
+    compact_sprint_snapshots,
+)
+from datetime import datetime, timedelta
+
+
+@pytest.mark.usefixtures("app")
+class TestSnapshotCompaction:
+    def setup_required_objects(self, make_sprint, base_date: datetime) -> Sprint:
+        sprint = make_sprint(base_date, state=Sprint.State.ACTIVE)
+
+        # 3 issues x 2 days x 4 hourly snapshots
+        for days in range(2):
+            for hours in range(4):
+                for issue_id in range(3):
+                    db.session.add(
+                        IssueSnapshot(
+                            issue_id=issue_id,
+                            story_points=hours,
+                            status="To Do",
+                            sprint_id=sprint.sprint_id,
+                            snapshot_date=base_date + timedelta(days=days, hours=hours),
+                        )
+                    )
+        db.session.commit()
+        return sprint
+
+    def test_compact_snapshot_day(self, make_sprint):
+        base_date = datetime(2020, 3, 2, 8)
+        sprint = self.setup_required_objects(make_sprint, base_date)
+
+        assert compact_snapshot_day(base_date.date(), batch_size=2) == 3 * 3
+        assert compact_snapshot_day(base_date.date(), batch_size=2) == 0
+
+        snapshots = IssueSnapshot.query.filter_by(sprint_id=sprint.sprint_id).all()
+        # the last snapshot per issue is kept, the next day is untouched
+        assert sorted(
+            (s.snapshot_date, s.issue_id)
+            for s in snapshots
+            if s.snapshot_date.date() == base_date.date()
+        ) == [(base_date + timedelta(hours=3), issue_id) for issue_id in range(3)]
+        assert len(snapshots) == 3 + 3 * 4
+
+    @pytest.mark.parametrize("sprint_wide", [False, True])
+    def test_same_snapshot_date_keeps_highest_id(self, make_sprint, sprint_wide):
+        base_date = datetime(2020, 3, 2, 8)
+        sprint = self.setup_required_objects(make_sprint, base_date)
+        last_date = base_date + timedelta(hours=3)
+        db.session.add(
+            IssueSnapshot(
+                issue_id=0,
+                story_points=3,
+                status="Done",
+                sprint_id=sprint.sprint_id,
+                snapshot_date=last_date,
+            )
+        )
+        db.session.commit()
+
+        if sprint_wide:
+            compact_sprint_snapshots(sprint.sprint_id)
+        else:
+            compact_snapshot_day(base_date.date())
+
+        kept = IssueSnapshot.query.filter_by(
+            sprint_id=sprint.sprint_id, issue_id=0, snapshot_date=last_date
+        ).one()
+        daily = DailyIssueSnapshot.query.filter_by(
+            sprint_id=sprint.sprint_id, day=base_date.date(), issue_id=0
+        ).one()
+        assert kept.status == daily.status == "Done"
@@ -0,0 +1,105 @@
+import pytest
+from test.mock_objects import UserMock
+from database import db
+
+from structure.events import Sprint, IssueSnapshot
+from structure.project import StatusCategory
+from visuals import BurnupGraphController, CumulativeFlowGraphController
+from visuals.snapshot_cube import (
+    cube_path,
+    load_sprint_rollups,
+    query_sprint_rollups,
+    write_snapshot_cube,
+)
+from datetime import datetime, timedelta
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture(scope="function")
+def cube_folder(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "SNAPSHOT_CUBE_FOLDER", str(tmp_path))
+    return tmp_path
+
+
+def setup_sprint(make_sprint, base_date: datetime) -> Sprint:
+    """ Creates a closed sprint of 5 days, one issue gets done per day """
+    sprint = make_sprint(
+        base_date,
+        days=4,
+        last_updated=base_date + timedelta(days=5),
+        status_mappings={"To Do": StatusCategory.to_do, "Done": StatusCategory.done},
+    )
+
+    for days in range(5):
+        for issue_id, status in enumerate(
+            ["Done" if issue_id < days else "To Do" for issue_id in range(3)]
+            + ["Blocked"]
+        ):
+            db.session.add(
+                IssueSnapshot(
+                    issue_id=issue_id,
+                    story_points=issue_id + 1,
+                    status=status,
+                    sprint_id=sprint.sprint_id,
+                    snapshot_date=base_date + timedelta(days=days),
+                )
+            )
+    db.session.commit()
+    return sprint
+
+
+@pytest.mark.usefixtures("app")
+class TestSnapshotCube:
+    @pytest.fixture(scope="function")
+    def sprint(self, make_sprint) -> Sprint:
+        return setup_sprint(make_sprint, datetime(2020, 3, 2, 5))
+
+    def test_cube_matches_database(self, sprint, cube_folder):
+        assert load_sprint_rollups(sprint) is None
+
+        path = write_snapshot_cube(sprint.activity_id)
+        assert path == cube_path(sprint.activity_id)
+        assert path.startswith(str(cube_folder))
+
+        from_cube = load_sprint_rollups(sprint)
+        from_db = query_sprint_rollups(sprint)
+        assert from_cube is not None
+        key = ["day", "status"]
+        assert from_cube.sort_values(key).to_dict("records") == from_db.sort_values(
+            key
+        ).to_dict("records")
+        assert None in set(from_cube["status_category"])
+
+    def test_stale_cube_is_not_used(self, sprint, cube_folder):
+        write_snapshot_cube(sprint.activity_id)
+
+        sprint.last_updated = sprint.last_updated + timedelta(minutes=15)
+        db.session.commit()
+        assert load_sprint_rollups(sprint) is None
+
+        # the cube gets reloaded once it was written again
+        write_snapshot_cube(sprint.activity_id)
+        assert load_sprint_rollups(sprint) is not None
+
+    def test_visuals_read_cube(self, sprint, cube_folder, mocker):
+        mocker.patch("visuals.base.current_user", UserMock())
+        mocker.patch("visuals.base.SprintVisualController.check_for_data")
+        visual_classes = (BurnupGraphController, CumulativeFlowGraphController)
+
+        from_db = [
+            visual_class().update(sprint.sprint_id)[0]
+            for visual_class in visual_classes
+        ]
+        write_snapshot_cube(sprint.activity_id)
+        query = mocker.patch("visuals.snapshot_cube.query_sprint_rollups")
+        from_cube = [
+            visual_class().update(sprint.sprint_id)[0]
+            for visual_class in visual_classes
+        ]
+
+        query.assert_not_called()
+        for db_traces, cube_traces in zip(from_db, from_cube):
+            assert [(trace.name, list(trace.y)) for trace in cube_traces] == [
+                (trace.name, list(trace.y)) for trace in db_traces
+            ]
@@ -0,0 +1,60 @@
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from database import db
+from structure.events import IssueSnapshot, Sprint, find_snapshot_gaps
+from tools.db_tool import action_report_snapshot_coverage
+
+
+@pytest.mark.usefixtures("app")
+class TestSnapshotGaps:
+    @pytest.fixture(scope="function")
+    def sprint(self, make_sprint) -> Sprint:
+        # Monday 2020-03-02 to Friday 2020-03-13
+        base_date = datetime(2020, 3, 2, 9)
+        sprint = make_sprint(base_date, days=11, last_updated=datetime(2020, 3, 14, 6))
+        # never synced, so it has no gaps but no data at all
+        make_sprint(base_date + timedelta(days=14), days=11)
+
+        missing_days = {date(2020, 3, 5), date(2020, 3, 10), date(2020, 3, 11)}
+        for days in range(12):
+            snapshot_date = base_date + timedelta(days=days)
+            if snapshot_date.date() in missing_days or snapshot_date.weekday() >= 5:
+                continue
+            for issue_id in range(2):
+                db.session.add(
+                    IssueSnapshot(
+                        issue_id=issue_id,
+                        story_points=1,
+                        status="Done",
+                        sprint_id=sprint.sprint_id,
+                        snapshot_date=snapshot_date,
+                    )
+                )
+        db.session.commit()
+        return sprint
+
+    def test_find_snapshot_gaps(self, sprint):
+        gaps = find_snapshot_gaps()
+        assert gaps == {
+            sprint.sprint_id: [date(2020, 3, 5), date(2020, 3, 10), date(2020, 3, 11)]
+        }
+        assert find_snapshot_gaps(sprint.activity_id) == gaps
+        assert find_snapshot_gaps(sprint.activity_id + 1) == {}
+
+    def test_find_snapshot_gaps_after_retention(self, sprint):
+        # the whole sprint is older than the retained partitions
+        assert find_snapshot_gaps(retention_months=1) == {}
+
+        # days before the first retained month are not gaps
+        with patch(
+            "structure.events.snapshot_retention_start", return_value=date(2020, 3, 9)
+        ):
+            assert find_snapshot_gaps(retention_months=1) == {
+                sprint.sprint_id: [date(2020, 3, 10), date(2020, 3, 11)]
+            }
+
+    def test_report_snapshot_coverage(self, sprint):
+        coverage = action_report_snapshot_coverage(output=print)
+        assert coverage == {sprint.sprint_id: pytest.approx(0.7)}
@@ -0,0 +1,102 @@
+import pytest
+from database import db
+
+from structure.events import (
+    IssueSnapshot,
+    create_snapshot_partitions,
+    delete_expired_snapshots,
+    drop_expired_snapshot_partitions,
+    get_snapshot_partitions,
+)
+from datetime import date, datetime, timedelta
+
+from dateutil.tz import tzutc
+
+
+def partition_of(snapshot: IssueSnapshot) -> str:
+    return db.session.execute(
+        "SELECT tableoid::regclass::text FROM issue_snapshots WHERE id = :id",
+        {"id": snapshot.id},
+    ).scalar()
+
+
+def add_snapshot(snapshot_date: datetime) -> IssueSnapshot:
+    snapshot = IssueSnapshot(
+        issue_id=1, story_points=1, status="To Do", snapshot_date=snapshot_date
+    )
+    db.session.add(snapshot)
+    db.session.commit()
+    return snapshot
+
+
+@pytest.mark.usefixtures("app")
+class TestSnapshotPartitions:
+    def test_create_partitions(self):
+        this_month = datetime.now(tzutc()).date().replace(day=1)
+
+        # the migration already created the partitions ahead
+        assert create_snapshot_partitions(months_ahead=3) == []
+        assert this_month in get_snapshot_partitions()
+
+        snapshot = add_snapshot(datetime.combine(this_month, datetime.min.time()))
+        assert partition_of(snapshot) == f"issue_snapshots_p{this_month:%Y_%m}"
+
+        # snapshots outside of all partitions end up in the default one
+        snapshot = add_snapshot(datetime(2000, 1, 1))
+        assert partition_of(snapshot) == "issue_snapshots_default"
+
+        # until the partition of their month is created
+        assert create_snapshot_partitions(months_ahead=3) == [
+            "issue_snapshots_p2000_01"
+        ]
+        assert partition_of(snapshot) == "issue_snapshots_p2000_01"
+        assert IssueSnapshot.query.count() == 2
+
+    def test_create_partitions_since(self):
+        this_month = datetime.now(tzutc()).date().replace(day=1)
+        last_month = (this_month - timedelta(days=1)).replace(day=1)
+        month_before = (last_month - timedelta(days=1)).replace(day=1)
+
+        created = create_snapshot_partitions(since=month_before + timedelta(days=20))
+
+        assert created == [
+            f"issue_snapshots_p{month_before:%Y_%m}",
+            f"issue_snapshots_p{last_month:%Y_%m}",
+        ]
+        snapshot = add_snapshot(datetime.combine(last_month, datetime.min.time()))
+        assert partition_of(snapshot) == f"issue_snapshots_p{last_month:%Y_%m}"
+
+    def test_delete_expired_snapshots(self):
+        add_snapshot(datetime(2000, 1, 1))
+        kept = add_snapshot(datetime.now(tzutc()).replace(tzinfo=None))
+
+        assert delete_expired_snapshots(12, batch_size=1) == 1
+        assert [s.id for s in IssueSnapshot.query.all()] == [kept.id]
+
+    @pytest.mark.parametrize("archive", [True, False])
+    def test_drop_expired_partitions(self, archive):
+        db.session.execute(
+            "CREATE TABLE issue_snapshots_p2020_01 PARTITION OF issue_snapshots "
+            "FOR VALUES FROM ('2020-01-01') TO ('2020-02-01')"
+        )
+        add_snapshot(datetime(2020, 1, 15))
+        kept = add_snapshot(datetime.now(tzutc()).replace(tzinfo=None))
+        assert date(2020, 1, 1) in get_snapshot_partitions()
+
+        removed = drop_expired_snapshot_partitions(12, archive=archive)
+
+        assert removed == ["issue_snapshots_p2020_01"]
+        assert date(2020, 1, 1) not in get_snapshot_partitions()
+        assert [s.id for s in IssueSnapshot.query.all()] == [kept.id]
+        archived = db.session.execute(
+            "SELECT to_regclass('archived_issue_snapshots_p2020_01')"
+        ).scalar()
+        if archive:
+            assert (
+                db.session.execute(
+                    "SELECT count(*) FROM archived_issue_snapshots_p2020_01"
+                ).scalar()
+                == 1
+            )
+        else:
+            assert archived is None
@@ -0,0 +1,113 @@
+import pytest
+from database import db
+
+from structure.events import (
+    DailyIssueSnapshot,
+    IssueSnapshot,
+    Sprint,
+    SprintDailyRollup,
+    rebuild_sprint_rollups,
+    refresh_sprint_rollups,
+)
+from structure.project import StatusCategory
+from datetime import date, datetime, timedelta
+
+
+@pytest.mark.usefixtures("app")
+class TestSprintDailyRollups:
+    @pytest.fixture(scope="function")
+    def sprint(self, make_sprint) -> Sprint:
+        return make_sprint(
+            datetime(2020, 3, 2),
+            days=11,
+            state=Sprint.State.ACTIVE,
+            status_mappings={
+                "To Do": StatusCategory.to_do,
+                "Done": StatusCategory.done,
+            },
+        )
+
+    def add_snapshots(self, sprint: Sprint, snapshot_date: datetime, statuses: list):
+        for issue_id, status in enumerate(statuses):
+            db.session.add(
+                IssueSnapshot(
+                    issue_id=issue_id,
+                    story_points=issue_id + 1,
+                    status=status,
+                    sprint_id=sprint.sprint_id,
+                    snapshot_date=snapshot_date,
+                )
+            )
+        db.session.commit()
+
+    def get_rollups(self, sprint: Sprint) -> set:
+        return {
+            (r.day, r.status, r.status_category, float(r.story_points), r.issue_count,)
+            for r in SprintDailyRollup.query.filter_by(sprint_id=sprint.sprint_id)
+        }
+
+    def test_updated_on_write(self, sprint):
+        day = datetime(2020, 3, 2, 9)
+
+        self.add_snapshots(sprint, day, ["To Do", "To Do", "Blocked"])
+        assert self.get_rollups(sprint) == {
+            (date(2020, 3, 2), "To Do", StatusCategory.to_do, 3.0, 2),
+            (date(2020, 3, 2), "Blocked", None, 3.0, 1),
+        }
+
+        # only the last snapshot per issue and day counts
+        self.add_snapshots(sprint, day + timedelta(hours=5), ["Done", "To Do"])
+        self.add_snapshots(sprint, day + timedelta(days=1), ["Done"])
+        expected = {
+            (date(2020, 3, 2), "Done", StatusCategory.done, 1.0, 1),
+            (date(2020, 3, 2), "To Do", StatusCategory.to_do, 2.0, 1),
+            (date(2020, 3, 2), "Blocked", None, 3.0, 1),
+            (date(2020, 3, 3), "Done", StatusCategory.done, 1.0, 1),
+        }
+        assert self.get_rollups(sprint) == expected
+
+        SprintDailyRollup.query.delete()
+        assert rebuild_sprint_rollups([sprint.sprint_id]) == len(expected)
+        assert self.get_rollups(sprint) == expected
+
+    def test_daily_issue_snapshots(self, sprint):
+        day = datetime(2020, 3, 2, 9)
+
+        self.add_snapshots(sprint, day + timedelta(hours=5), ["Done", "Done"])
+        # an earlier snapshot written later, e.g. by a backfill, doesn't win
+        self.add_snapshots(sprint, day, ["To Do", "To Do", "To Do"])
+        assert {
+            (s.issue_id, s.status, s.snapshot_date)
+            for s in DailyIssueSnapshot.query.filter_by(sprint_id=sprint.sprint_id)
+        } == {
+            (0, "Done", day + timedelta(hours=5)),
+            (1, "Done", day + timedelta(hours=5)),
+            (2, "To Do", day),
+        }
+        expected = {
+            (date(2020, 3, 2), "Done", StatusCategory.done, 3.0, 2),
+            (date(2020, 3, 2), "To Do", StatusCategory.to_do, 3.0, 1),
+        }
+        assert self.get_rollups(sprint) == expected
+
+        # days without snapshots anymore, e.g. after the retention, are kept
+        IssueSnapshot.query.delete()
+        rebuild_sprint_rollups([sprint.sprint_id])
+        assert DailyIssueSnapshot.query.count() == 3
+        assert self.get_rollups(sprint) == expected
+
+    def test_refresh_upserts(self, sprint):
+        day = datetime(2020, 3, 2, 9)
+        self.add_snapshots(sprint, day, ["To Do", "Blocked"])
+
+        # refreshing the same day again doesn't duplicate rows
+        refresh_sprint_rollups(sprint.sprint_id, [day.date()])
+        refresh_sprint_rollups(sprint.sprint_id, [day.date()])
+        db.session.commit()
+        assert SprintDailyRollup.query.count() == 2
+
+        # statuses no issue has anymore are removed
+        self.add_snapshots(sprint, day + timedelta(hours=1), ["To Do", "To Do"])
+        assert self.get_rollups(sprint) == {
+            (date(2020, 3, 2), "To Do", StatusCategory.to_do, 3.0, 2),
+        }
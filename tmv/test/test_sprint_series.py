@@ -0,0 +1,75 @@
+import pytest
+from test.mock_objects import UserMock
+from database import db
+
+from structure.events import Sprint, IssueSnapshot, freeze_sprint
+from structure.project import StatusCategory
+from visuals import BurnupGraphController, CumulativeFlowGraphController
+from visuals.sprint_series import render_sprint_series
+from datetime import datetime, timedelta
+
+
+@pytest.mark.usefixtures("app")
+class TestSprintSeries:
+    def setup_required_objects(self, make_sprint, base_date: datetime) -> Sprint:
+        sprint = make_sprint(
+            base_date,
+            last_updated=base_date + timedelta(days=20),
+            status_mappings={
+                "To Do": StatusCategory.to_do,
+                "Done": StatusCategory.done,
+            },
+        )
+
+        for days in range(14):
+            for hours in range(3):
+                db.session.add(
+                    IssueSnapshot(
+                        issue_id=1,
+                        story_points=2,
+                        status="To Do" if days < 7 else "Done",
+                        sprint_id=sprint.sprint_id,
+                        snapshot_date=(base_date + timedelta(days=days))
+                        - timedelta(hours=hours),
+                    )
+                )
+        db.session.commit()
+        return sprint
+
+    def test_freeze_sprint(self, make_sprint, mocker):
+        base_date = datetime(2020, 3, 1, 5)
+        sprint = self.setup_required_objects(make_sprint, base_date)
+
+        mocker.patch("visuals.base.current_user", UserMock())
+        check_for_data = mocker.patch(
+            "visuals.base.SprintVisualController.check_for_data"
+        )
+
+        burnup_data, _ = BurnupGraphController().update(sprint.sprint_id)
+        cfd_data, _ = CumulativeFlowGraphController().update(sprint.sprint_id)
+
+        assert sprint.should_be_finalized
+        deleted_cnt = freeze_sprint(sprint, render_sprint_series(sprint))
+        check_for_data.reset_mock()
+
+        # one snapshot per issue and day is kept
+        assert deleted_cnt == 14 * 2
+        assert IssueSnapshot.query.filter_by(sprint_id=sprint.sprint_id).count() == 14
+
+        sprint = Sprint.query.get(sprint.sprint_id)
+        assert sprint.is_frozen
+        assert not sprint.should_be_updated
+        assert not sprint.should_be_finalized
+
+        # charts are loaded from the stored series
+        frozen_burnup_data, layout = BurnupGraphController().update(sprint.sprint_id)
+        frozen_cfd_data, _ = CumulativeFlowGraphController().update(sprint.sprint_id)
+        check_for_data.assert_not_called()
+
+        assert layout["title"]["text"] == "Burnup Chart"
+        assert [trace["name"] for trace in frozen_burnup_data] == [
+            trace.name for trace in burnup_data
+        ]
+        assert [trace["name"] for trace in frozen_cfd_data] == [
+            trace.name for trace in cfd_data
+        ]
@@ -0,0 +1,125 @@
+import pytest
+from sqlalchemy import event
+
+from database import db
+
+from structure.events import Sprint, IssueSnapshot, recompute_status_categories
+from structure.project import StatusCategory, StatusCategoryStatusMapping
+from datetime import datetime
+
+
+@pytest.mark.usefixtures("app")
+class TestStatusCategory:
+    @pytest.fixture(scope="function")
+    def sprints(self, make_sprint) -> list:
+        return [
+            make_sprint(
+                datetime(2020, 3, 2),
+                days=11,
+                state=Sprint.State.ACTIVE,
+                activity_name=activity_name,
+            )
+            for activity_name in ("A", "B")
+        ]
+
+    def add_snapshots(self, sprints, status):
+        snapshots = [
+            IssueSnapshot(
+                issue_id=1,
+                story_points=2,
+                status=status,
+                sprint_id=sprint.sprint_id,
+                snapshot_date=datetime(2020, 3, 2),
+            )
+            for sprint in sprints
+        ]
+        db.session.add_all(snapshots)
+        return snapshots
+
+    def test_set_on_write(self, sprints):
+        # mappings flushed together with the snapshots apply as well
+        db.session.add_all(
+            [
+                StatusCategoryStatusMapping(
+                    status="Review", status_category=StatusCategory.in_progress
+                ),
+                StatusCategoryStatusMapping(
+                    activity_id=sprints[1].activity_id,
+                    status="Review",
+                    status_category=StatusCategory.done,
+                ),
+            ]
+        )
+        snapshots = self.add_snapshots(sprints, "Review")
+        unmapped = self.add_snapshots(sprints[:1], "Blocked")
+        db.session.commit()
+
+        assert [s.status_category for s in snapshots] == [
+            StatusCategory.in_progress,
+            StatusCategory.done,
+        ]
+        assert unmapped[0].status_category is None
+        assert (
+            IssueSnapshot.query.filter(
+                IssueSnapshot.status_category == StatusCategory.done
+            ).count()
+            == 1
+        )
+
+    def test_set_before_insert(self, sprints):
+        db.session.add(
+            StatusCategoryStatusMapping(
+                status="Review", status_category=StatusCategory.in_progress
+            )
+        )
+        db.session.commit()
+
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db.session.get_bind()
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            snapshots = self.add_snapshots(sprints, "Review")
+            db.session.flush()
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+        assert [s.status_category for s in snapshots] == [
+            StatusCategory.in_progress
+        ] * 2
+        # the snapshots are written once, not inserted and updated
+        assert not [
+            statement
+            for statement in statements
+            if statement.lstrip().upper().startswith("UPDATE ISSUE_SNAPSHOTS")
+        ]
+
+    def test_recompute_after_mapping_change(self, sprints):
+        mapping = StatusCategoryStatusMapping(
+            status="Review", status_category=StatusCategory.in_progress
+        )
+        db.session.add(mapping)
+        self.add_snapshots(sprints, "Review")
+        self.add_snapshots(sprints, "Blocked")
+        db.session.commit()
+
+        mapping.status_category = StatusCategory.done
+        db.session.add(
+            StatusCategoryStatusMapping(
+                status="Blocked", status_category=StatusCategory.to_do
+            )
+        )
+        db.session.commit()
+
+        assert recompute_status_categories(["Review"], chunk_size=1) == 2
+        assert recompute_status_categories(chunk_size=1) == 2
+        assert recompute_status_categories() == 0
+
+        db.session.expire_all()
+        assert {(s.status, s.status_category) for s in IssueSnapshot.query.all()} == {
+            ("Review", StatusCategory.done),
+            ("Blocked", StatusCategory.to_do),
+        }
@@ -5,7 +5,12 @@ from datetime import datetime, timedelta
 from database import db
 
 from structure.organization import Team
-from structure.measurements import THCQuestion, THCMeasurement
+from structure.measurements import (
+    THCQuestion,
+    THCMeasurement,
+    THCSession,
+    refresh_thc_sessions,
+)
 from visuals import THCResultTableController
 from visuals import THCTrendGraphController
 from visuals.team_health_check import column_id
@@ -136,6 +141,8 @@ def thc_data(db_session) -> Tuple[List[Team], List[THCQuestion], List[THCMeasure
     db.session.add_all(teams)
     db.session.add_all(questions)
     db.session.add_all(measurements)
+    db.session.flush()
+    refresh_thc_sessions()
     db.session.commit()
 
     return teams, questions, measurements
@@ -157,6 +164,24 @@ def test_thc_default_selection(thc_data, thc_table):
     assert all_teams[0] == teams[0].team_id
 
 
+def test_thc_session_catalogue(thc_data):
+    teams, _, measurements = thc_data
+
+    sessions = {s.session_name: s for s in THCSession.query}
+    assert set(sessions) == {RECENT, PAST, LAST_YEAR}
+    assert sessions[RECENT].min_date == RECENT_DATE
+    assert sessions[RECENT].max_date == RECENT_DATE
+    assert sessions[PAST].team_ids == [teams[0].team_id]
+
+    # sessions without measurements are removed from the catalogue
+    for m in measurements:
+        if m.session_name == LAST_YEAR:
+            db.session.delete(m)
+    db.session.flush()
+    refresh_thc_sessions([LAST_YEAR])
+    assert {s.session_name for s in THCSession.query} == {RECENT, PAST}
+
+
 def test_thc_result_is_correct(thc_data, thc_table):
     """
         The following is the correct result, as created by thc_data:
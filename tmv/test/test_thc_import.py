@@ -4,7 +4,7 @@ from test import TEST_RESOURCES_DIRECTORY
 from database import db
 from tools.db_tool import action_import_thc_questions
 from connectors.TeamHealthCheck.thc_import import THCImporter
-from structure.measurements import THCQuestion, THCMeasurement
+from structure.measurements import THCQuestion, THCMeasurement, THCSession
 from structure.organization import Team
 
 
@@ -104,6 +104,15 @@ class TestTHCImport:
         assert result.result_yellow == 3
         assert result.result_green == 2
 
+        # The imported sessions are in the session catalogue
+        sessions = db.session.query(THCSession).all()
+        assert {s.session_name for s in sessions} == {
+            name for name, in db.session.query(THCMeasurement.session_name).distinct()
+        }
+        q3s = db.session.query(THCSession).get("2019 Q3S")
+        assert q3s.min_date <= measurement_date <= q3s.max_date
+        assert result.team_id in q3s.team_ids
+
     def test_import_thc_result_unknown_question(self):
         # Import a THC result with one question too much
         self.import_questions()
@@ -5,9 +5,10 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import click
+from sqlalchemy import text
 
 # Imports needed for the tool
-from database import db
+from database import db, delete_in_batches
 
 # Import all structure classes
 from structure.events import *  # pylint: disable=unused-wildcard-import
@@ -23,6 +24,20 @@ from connectors.TeamHealthCheck.thc_import import THCImporter
 # For overtime data
 from connectors.overtime.overtime_data_import import OTImporter
 
+# For snapshot coverage
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from dateutil.tz import tzutc
+from flask import current_app
+from helpers.time import workdays
+
+# For snapshot cubes
+from visuals.snapshot_cube import write_snapshot_cubes
+
+# For exports
+from datetime import date, timedelta
+from database import replica_reads
+
 
 """
     Actions for the command line tool.
@@ -67,11 +82,52 @@ def action_import_teams(from_file: str, output=click.echo):
     output("Done.")
 
 
-def action_delete_all_for_model(model_name: str, output=click.echo) -> bool:
+def _delete_teams_by_level(batch_size: int, pause: float, output) -> int:
+    """
+    Deletes all teams in batches, the deepest level of the hierarchy first.
+    teams.parent_id has no ON DELETE, so a committed batch must not contain
+    the parent of a team which is left. The level is the largest depth of a
+    team in the `team_closure`.
+    """
+    result = db.session.execute(
+        text(
+            "SELECT DISTINCT max(depth) FROM team_closure GROUP BY descendant_id"
+        ).columns()
+    )
+    # teams missing in the closure count as top level
+    levels = sorted({level for level, in result} | {0}, reverse=True)
+    deleted_cnt = 0
+    for level in levels:
+        deleted_cnt += delete_in_batches(
+            Team.__table__,
+            """
+            COALESCE((
+                SELECT max(depth) FROM team_closure
+                WHERE descendant_id = teams.team_id
+            ), 0) = :level""",
+            {"level": level},
+            batch_size=batch_size,
+            pause=pause,
+            progress=lambda cnt, offset=deleted_cnt: output(
+                f"{offset + cnt} records deleted..."
+            ),
+        )
+    return deleted_cnt
+
+
+def action_delete_all_for_model(
+    model_name: str, batch_size: int = 10000, pause: float = 0.0, output=click.echo
+) -> bool:
     """
-    Remove all items for a model from the database.
+    Remove all items for a model from the database. The items are deleted in
+    batches, see `database.delete_in_batches`. Teams are deleted level by
+    level from the deepest one, so no batch deletes the parent of a team
+    which is left.
+
+    :param batch_size: Maximum number of items deleted per transaction.
+    :param pause: Seconds to wait between two batches.
     """
-    output(f"Deleting all items for model {model_name} from database...")
+    output(f"Deleting all items for model {model_name} from database...")
     model_map = {
         "Team": Team,
         "OTMeasurement": OTMeasurement,
@@ -79,11 +135,24 @@ def action_delete_all_for_model(model_name: str, output=click.echo) -> bool:
         "BurndownMeasurement": BurndownMeasurement,
     }
     try:
-        nr_deleted = db.session.query(model_map[model_name]).delete()
+        model = model_map[model_name]
     except KeyError:
         output(f"Could not delete. Model {model_name} is not supported.")
         return False
     else:
+        if model_name == "Team":
+            nr_deleted = _delete_teams_by_level(batch_size, pause, output)
+        else:
+            nr_deleted = delete_in_batches(
+                model.__table__,
+                batch_size=batch_size,
+                pause=pause,
+                progress=lambda cnt: output(f"{cnt} records deleted..."),
+            )
+        if model_name == "THCMeasurement":
+            refresh_thc_sessions()
+        elif model_name == "OTMeasurement":
+            refresh_overtime_statistics()
         db.session.commit()
         output(f"{nr_deleted} records deleted.")
         return True
@@ -209,6 +278,310 @@ def action_commit_thc(importer: THCImporter, output=click.echo):
         )
 
 
+def action_report_snapshot_coverage(
+    activity_id: Optional[int] = None, output=click.echo
+) -> Dict[int, float]:
+    """
+    Reports for each synced, not frozen sprint how many of its workdays have issue
+    snapshots and which days are missing. Missing days can be fetched with
+    the celery task `tasks.jira.backfill_snapshot_gaps`.
+
+    :param activity_id: Only report sprints of this activity if given.
+    :return: Coverage (0 to 1) by sprint_id.
+    """
+    retention_months = current_app.config.get("SNAPSHOT_RETENTION_MONTHS")
+    gaps = find_snapshot_gaps(activity_id, retention_months)
+    time_now = datetime.now(tzutc()).replace(tzinfo=None)
+    # days before the retention have no snapshots on purpose
+    retained_from = (
+        snapshot_retention_start(retention_months)
+        if retention_months is not None
+        else None
+    )
+
+    sprints = Sprint.query.filter(
+        Sprint.state != Sprint.State.FUTURE.value,
+        Sprint.start_date != None,
+        Sprint.last_updated != None,
+        Sprint.frozen_at == None,
+    )
+    if activity_id is not None:
+        sprints = sprints.filter(Sprint.activity_id == activity_id)
+
+    coverage = dict()
+    for sprint in sprints.order_by(Sprint.activity_id, Sprint.start_date):
+        until_date = min(sprint.complete_date or sprint.end_date or time_now, time_now)
+        first_day = sprint.start_date.date()
+        if retained_from is not None:
+            first_day = max(first_day, retained_from)
+        expected_days = workdays(first_day, until_date.date())
+        missing_days = gaps.get(sprint.sprint_id, [])
+        coverage[sprint.sprint_id] = (
+            1 - len(missing_days) / len(expected_days) if expected_days else 1
+        )
+
+        output(
+            f"{sprint.name} (sprint_id={sprint.sprint_id}): "
+            f"{len(expected_days) - len(missing_days)}/{len(expected_days)} days "
+            f"({coverage[sprint.sprint_id]:.0%})"
+        )
+        if missing_days:
+            output(f"  missing: {', '.join(d.isoformat() for d in missing_days)}")
+
+    output(f"{len(gaps)} of {len(coverage)} sprint(s) have missing days.")
+    return coverage
+
+
+def action_rebuild_sprint_rollups(
+    sprint_ids: Optional[List[int]] = None, output=click.echo
+) -> int:
+    """
+    Recalculates the daily rollups read by the sprint visuals from the issue
+    snapshots, e.g. after snapshots were imported or fixed directly in the
+    database.
+
+    :param sprint_ids: Only rebuild these sprints if given.
+    :return: Number of written rollup rows.
+    """
+    row_cnt = rebuild_sprint_rollups(sprint_ids)
+    output(f"Wrote {row_cnt} rollup row(s).")
+    cube_cnt = write_snapshot_cubes()
+    if cube_cnt:
+        output(f"Wrote {cube_cnt} snapshot cube(s).")
+    return row_cnt
+
+
+#: Exportable tables: query, filter columns by filter and column types of
+#: the Parquet files. Intervals and UUIDs are exported as numbers and text.
+EXPORT_TABLES = {
+    "issue_snapshots": {
+        "query": """
+            SELECT s.id, s.sprint_id, s.issue_id, s.snapshot_date, s.status,
+                s.story_points, s.status_category::text AS status_category
+            FROM issue_snapshots AS s
+            LEFT JOIN sprints AS sp ON sp.sprint_id = s.sprint_id
+            LEFT JOIN activities AS a ON a.activity_id = sp.activity_id""",
+        "filters": {
+            "team_id": "a.team_id",
+            "activity_id": "sp.activity_id",
+            "date": "s.snapshot_date",
+        },
+        "types": {
+            "id": "int32",
+            "sprint_id": "int32",
+            "issue_id": "int32",
+            "snapshot_date": "timestamp",
+            "status": "string",
+            "story_points": "decimal",
+            "status_category": "string",
+        },
+    },
+    "m_overtime": {
+        "query": """
+            SELECT o.pk, o.measurement_id::text AS measurement_id,
+                o.measurement_date, o.team_id, o.workdays_fix, o.workdays_actual,
+                EXTRACT(EPOCH FROM o.overtime)::float8 AS overtime_seconds
+            FROM m_overtime AS o""",
+        "filters": {"team_id": "o.team_id", "date": "o.measurement_date"},
+        "types": {
+            "pk": "int32",
+            "measurement_id": "string",
+            "measurement_date": "date",
+            "team_id": "int32",
+            "workdays_fix": "int32",
+            "workdays_actual": "int32",
+            "overtime_seconds": "float64",
+        },
+    },
+    "m_thc": {
+        "query": """
+            SELECT t.pk, t.measurement_id::text AS measurement_id,
+                t.measurement_date, t.session_name, t.team_id, t.question_id,
+                t.result_red, t.result_yellow, t.result_green
+            FROM m_thc AS t""",
+        "filters": {"team_id": "t.team_id", "date": "t.measurement_date"},
+        "types": {
+            "pk": "int32",
+            "measurement_id": "string",
+            "measurement_date": "timestamp",
+            "session_name": "string",
+            "team_id": "int32",
+            "question_id": "int32",
+            "result_red": "int32",
+            "result_yellow": "int32",
+            "result_green": "int32",
+        },
+    },
+    "sprints": {
+        "query": """
+            SELECT sp.sprint_id, sp.activity_id, sp.jira_sprint_id, sp.name,
+                sp.state, sp.start_date, sp.end_date, sp.complete_date,
+                sp.last_updated, sp.sp_plan, sp.frozen_at, sp.archived_at
+            FROM sprints AS sp
+            LEFT JOIN activities AS a ON a.activity_id = sp.activity_id""",
+        "filters": {
+            "team_id": "a.team_id",
+            "activity_id": "sp.activity_id",
+            "date": "sp.start_date",
+        },
+        "types": {
+            "sprint_id": "int32",
+            "activity_id": "int32",
+            "jira_sprint_id": "int32",
+            "name": "string",
+            "state": "string",
+            "start_date": "timestamp",
+            "end_date": "timestamp",
+            "complete_date": "timestamp",
+            "last_updated": "timestamp",
+            "sp_plan": "int32",
+            "frozen_at": "timestamp",
+            "archived_at": "timestamp",
+        },
+    },
+}
+
+
+def _export_query(
+    table: str,
+    team_id: Optional[int] = None,
+    activity_id: Optional[int] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+) -> Tuple[str, dict]:
+    """
+    Returns the filtered query of an exportable table and its parameters in
+    the psycopg2 format. `to_date` is inclusive.
+    """
+    spec = EXPORT_TABLES[table]
+    conditions, params = [], dict()
+    for filter_name, name, value, condition in [
+        ("team_id", "team_id", team_id, "{} = %(team_id)s"),
+        ("activity_id", "activity_id", activity_id, "{} = %(activity_id)s"),
+        ("date", "from_date", from_date, "{} >= %(from_date)s"),
+        (
+            "date",
+            "to_date",
+            to_date and to_date + timedelta(days=1),
+            "{} < %(to_date)s",
+        ),
+    ]:
+        if value is None:
+            continue
+        column = spec["filters"].get(filter_name)
+        if column is None:
+            raise ValueError(f"Table {table} can't be filtered by {name}.")
+        conditions.append(condition.format(column))
+        params[name] = value
+
+    query = spec["query"]
+    if conditions:
+        query += "\n            WHERE " + " AND ".join(conditions)
+    return query, params
+
+
+def action_export_table(
+    table: str,
+    to_file,
+    file_format: str = "csv",
+    team_id: Optional[int] = None,
+    activity_id: Optional[int] = None,
+    from_date: Optional[date] = None,
+    to_date: Optional[date] = None,
+    batch_size: int = 50000,
+    output=click.echo,
+) -> bool:
+    """
+    Streams a table to a CSV or Parquet file with constant memory. CSV is
+    written by PostgreSQL with `COPY ... TO STDOUT`, Parquet is written in
+    row groups of `batch_size` rows fetched with a server-side cursor. Reads
+    from the read replica if one is configured.
+
+    :param table: One of `EXPORT_TABLES`.
+    :param to_file: Binary file object to write to.
+    :param file_format: "csv" or "parquet".
+    :param team_id: Only export rows of this team if given.
+    :param activity_id: Only export rows of this activity if given.
+    :param from_date: Only export rows from this date if given.
+    :param to_date: Only export rows until this date (inclusive) if given.
+    :param batch_size: Number of rows per fetch and Parquet row group.
+    :return: True if the table was exported.
+    """
+    if table not in EXPORT_TABLES:
+        output(f"Could not export. Table {table} is not supported.")
+        return False
+    try:
+        query, params = _export_query(table, team_id, activity_id, from_date, to_date)
+    except ValueError as e:
+        output(f"Could not export. {e}")
+        return False
+
+    output(f"Exporting {table} as {file_format}...")
+    with replica_reads():
+        # the connection of the session, so the export sees its transaction
+        connection = db.session.connection().connection
+        if file_format == "csv":
+            with connection.cursor() as cursor:
+                query = cursor.mogrify(query, params).decode()
+                cursor.copy_expert(
+                    f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", to_file
+                )
+                row_cnt = cursor.rowcount
+        else:
+            row_cnt = _export_parquet(
+                connection, table, query, params, to_file, batch_size
+            )
+
+    output(f"Exported {row_cnt} row(s).")
+    return True
+
+
+def _export_parquet(connection, table, query, params, to_file, batch_size) -> int:
+    """ Writes the rows of `query` to `to_file` in Parquet row groups """
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    arrow_types = {
+        "int32": pa.int32(),
+        "float64": pa.float64(),
+        "string": pa.string(),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("us"),
+        "decimal": pa.decimal128(5, 2),
+    }
+    schema = pa.schema(
+        [
+            (name, arrow_types[type_name])
+            for name, type_name in EXPORT_TABLES[table]["types"].items()
+        ]
+    )
+
+    row_cnt = 0
+    with connection.cursor(name=f"export_{table}") as cursor:
+        cursor.itersize = batch_size
+        cursor.execute(query, params)
+        writer = pq.ParquetWriter(to_file, schema, use_dictionary=True)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                columns = list(zip(*rows))
+                writer.write_table(
+                    pa.Table.from_arrays(
+                        [
+                            pa.array(column, field.type)
+                            for column, field in zip(columns, schema)
+                        ],
+                        schema=schema,
+                    )
+                )
+                row_cnt += len(rows)
+        finally:
+            writer.close()
+    return row_cnt
+
+
 """
     CLI interface
     The functions below define the CLI interface. The actions actually
@@ -255,11 +628,25 @@ def import_teams(file: click.Path):
         "Team, OTMeasurement, THCMeasurement, BurndownMeasurement."
     ),
 )
+@click.option(
+    "--batch-size",
+    type=int,
+    default=10000,
+    show_default=True,
+    help="Maximum number of items deleted per transaction.",
+)
+@click.option(
+    "--pause",
+    type=float,
+    default=0.1,
+    show_default=True,
+    help="Seconds to wait between two batches.",
+)
 @click.confirmation_option(
     prompt="This will remove ALL items from the given model. Are you sure?"
 )
-def delete_all(model):
-    action_delete_all_for_model(model)
+def delete_all(model, batch_size, pause):
+    action_delete_all_for_model(model, batch_size=batch_size, pause=pause)
 
 
 """ Command: Import THC questions from file to database """
@@ -325,6 +712,87 @@ def import_thc_data(file: click.Path):
         action_commit_overtime_data(importer)
 
 
+""" Command: Report coverage of issue snapshots """
+
+
+@database_tool.command()
+@click.option(
+    "--activity",
+    "-a",
+    type=int,
+    default=None,
+    help="Only report sprints of the activity with this ID.",
+)
+def snapshot_coverage(activity):
+    action_report_snapshot_coverage(activity_id=activity)
+
+
+""" Command: Rebuild the daily rollups of sprint snapshots """
+
+
+@database_tool.command()
+@click.option(
+    "--sprint",
+    "-s",
+    type=int,
+    multiple=True,
+    help="Only rebuild the sprint with this ID. Can be given multiple times.",
+)
+def rebuild_rollups(sprint):
+    action_rebuild_sprint_rollups(sprint_ids=list(sprint) or None)
+
+
+""" Command: Export a table to CSV or Parquet """
+
+
+@database_tool.command()
+@click.argument("table", type=click.Choice(sorted(EXPORT_TABLES)))
+@click.option(
+    "--output",
+    "-o",
+    "to_file",
+    type=click.File("wb"),
+    required=True,
+    help="File to write to, - for stdout.",
+)
+@click.option(
+    "--format",
+    "file_format",
+    type=click.Choice(["csv", "parquet"]),
+    default="csv",
+    help="Format of the file. Parquet requires pyarrow.",
+)
+@click.option("--team", "-t", type=int, default=None, help="Only export this team.")
+@click.option(
+    "--activity", "-a", type=int, default=None, help="Only export this activity."
+)
+@click.option(
+    "--from-date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Only export rows from this date.",
+)
+@click.option(
+    "--to-date",
+    type=click.DateTime(formats=["%Y-%m-%d"]),
+    default=None,
+    help="Only export rows until this date (inclusive).",
+)
+def export(table, to_file, file_format, team, activity, from_date, to_date):
+    success = action_export_table(
+        table,
+        to_file,
+        file_format=file_format,
+        team_id=team,
+        activity_id=activity,
+        from_date=from_date and from_date.date(),
+        to_date=to_date and to_date.date(),
+        output=lambda message: click.echo(message, err=True),
+    )
+    if not success:
+        sys.exit(1)
+
+
 """ Execute the tool """
 if __name__ == "__main__":
     from app import create_app
@@ -1,9 +1,12 @@
+import json
 import logging
 import traceback
+from datetime import date, datetime
 
 from flask import (
     current_app,
     flash,
+    g,
     jsonify,
     redirect,
     request,
@@ -20,7 +23,8 @@ from flask_admin.form.fields import Select2Field, DateTimeField
 from flask_admin.contrib.sqla import ModelView
 from flask_security import current_user, login_required
 from flask_security.utils import encrypt_password
-from sqlalchemy import func
+from flask_sqlalchemy import BaseQuery
+from sqlalchemy import func, inspect, text, tuple_
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from wtforms import form
 from wtforms.fields import PasswordField, HiddenField, StringField
@@ -30,9 +34,13 @@ from common.utils import create_default_status_mappings
 from connectors.jira import jira_core
 from database import db
 from structure.auth import User, UserTeam, TeamRoleEnum
-from structure.events import IssueSnapshot, Sprint
 from structure.organization import Team
-from structure.measurements import THCQuestion, THCMeasurement
+from structure.measurements import (
+    THCQuestion,
+    THCMeasurement,
+    refresh_overtime_statistics,
+    refresh_thc_sessions,
+)
 from structure.measurements import OTMeasurement  # pylint: disable=unused-import
 from structure.project import (
     Activity,
@@ -50,6 +58,199 @@ class CheckSuperuserRoleMixin:
         return redirect(url_for("security.login", next=request.url))
 
 
+# Large tables
+
+
+def _plan_rows(query) -> int:
+    """
+    Returns the number of rows the planner expects a count query to count.
+    """
+    connection = query.session.connection()
+    statement = query.statement.compile(dialect=connection.dialect)
+    plan = connection.execute(
+        f"EXPLAIN (FORMAT JSON) {statement}", statement.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    node = plan[0]["Plan"]
+    # the rows of count(*) are those of the node it aggregates
+    while node["Node Type"] == "Aggregate" and node.get("Plans"):
+        node = node["Plans"][0]
+    return int(node["Plan Rows"])
+
+
+class EstimatedCountQuery(BaseQuery):
+    """
+    Count query of a `KeysetModelView`. Returns the estimated number of rows
+    instead of counting them if the estimate is above `threshold`: the
+    `pg_class.reltuples` of the table if the list is neither filtered nor
+    searched, else the planner's estimate of the filtered rows.
+    """
+
+    threshold = None
+    table_name = None
+
+    def scalar(self):
+        estimate = None
+        if self.whereclause is None:
+            estimate = db.session.execute(
+                text(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = CAST(:table_name AS regclass)"
+                ),
+                {"table_name": self.table_name},
+            ).scalar()
+        # tables which were never analyzed have no reltuples
+        if not estimate or estimate < 0:
+            estimate = _plan_rows(self)
+        if self.threshold is not None and estimate > self.threshold:
+            return estimate
+        return super().scalar()
+
+
+class KeysetModelView(ModelView):
+    """
+    Model view for tables with millions of rows.
+
+    The list counts its rows only if there are at most
+    `estimated_count_threshold`; above, the number of pages is based on the
+    estimate of `EstimatedCountQuery`, so the last pages may be empty.
+
+    If the list is sorted by one of the `keyset_columns` (or not sorted at
+    all), the next page is read with a `WHERE (sort column, primary key) >
+    (last row)` condition instead of an OFFSET. The last row of every shown
+    page is kept in the session, so paging forwards and backwards is keyset
+    paginated; jumping to a page which wasn't shown with the same sort,
+    search and filters falls back to an OFFSET. The keyset columns must be
+    non-nullable and indexed together with the primary key.
+    """
+
+    #: Lists with more (estimated) rows than this aren't counted
+    estimated_count_threshold = 100000
+    #: Sortable, non-nullable columns with an index on (column, primary key)
+    keyset_columns = []
+    #: Pages before the current one whose cursors are kept in the session
+    keyset_pages_kept = 10
+
+    def _keyset_pk(self):
+        return self.model.__mapper__.primary_key[0]
+
+    def _keyset_column(self, sort_column, sort_desc):
+        """
+        Returns the column and direction to paginate by, or None if the list
+        is sorted by a column without keyset pagination.
+        """
+        if sort_column is None:
+            if self.column_default_sort is None:
+                return self._keyset_pk(), False
+            if isinstance(self.column_default_sort, str):
+                sort_column, sort_desc = self.column_default_sort, False
+            elif isinstance(self.column_default_sort, tuple):
+                sort_column, sort_desc = self.column_default_sort
+            else:
+                return None
+        if sort_column not in self.keyset_columns:
+            return None
+        return getattr(self.model, sort_column), bool(sort_desc)
+
+    def _keyset_session_key(self):
+        return f"keyset_{self.endpoint}"
+
+    @staticmethod
+    def _dump_key(value):
+        if isinstance(value, (date, datetime)):
+            return {
+                "isoformat": value.isoformat(),
+                "datetime": isinstance(value, datetime),
+            }
+        return value
+
+    @staticmethod
+    def _load_key(value):
+        if isinstance(value, dict):
+            if value["datetime"]:
+                return datetime.fromisoformat(value["isoformat"])
+            return date.fromisoformat(value["isoformat"])
+        return value
+
+    def get_count_query(self):
+        query = EstimatedCountQuery(
+            [func.count("*")], session=self.session()
+        ).select_from(self.model)
+        query.threshold = self.estimated_count_threshold
+        query.table_name = self.model.__table__.name
+        return query
+
+    def get_list(
+        self,
+        page,
+        sort_column,
+        sort_desc,
+        search,
+        filters,
+        execute=True,
+        page_size=None,
+    ):
+        keyset = self._keyset_column(sort_column, sort_desc)
+        state = repr((sort_column, sort_desc, search, filters))
+        cursors = session.get(self._keyset_session_key())
+        if not cursors or cursors["state"] != state:
+            cursors = {"state": state, "pages": {}}
+        cursor = cursors["pages"].get(str(page)) if keyset and page else None
+        # read by _apply_pagination, as the view is shared by all requests
+        g.keyset_pagination = (keyset, cursor)
+
+        count, data = super().get_list(
+            page,
+            sort_column,
+            sort_desc,
+            search,
+            filters,
+            execute=execute,
+            page_size=page_size,
+        )
+
+        if keyset and execute and data:
+            column, _ = keyset
+            pk_name = self._keyset_pk().key
+            last = data[-1]
+            page = page or 0
+            cursors["pages"][str(page + 1)] = [
+                self._dump_key(getattr(last, column.key)),
+                getattr(last, pk_name),
+            ]
+            # the session is a cookie, so only the cursors around the
+            # current page are kept
+            cursors["pages"] = {
+                key: value
+                for key, value in cursors["pages"].items()
+                if page - self.keyset_pages_kept <= int(key) <= page + 1
+            }
+            session[self._keyset_session_key()] = cursors
+        return count, data
+
+    def _apply_pagination(self, query, page, page_size):
+        keyset, cursor = g.pop("keyset_pagination", (None, None))
+        if keyset is None:
+            return super()._apply_pagination(query, page, page_size)
+
+        column, desc = keyset
+        pk = self._keyset_pk()
+        # ties of the sort column are ordered by the primary key
+        query = query.order_by(pk.desc() if desc else pk)
+        if cursor is None:
+            return super()._apply_pagination(query, page, page_size)
+
+        key = tuple_(column, pk)
+        last = tuple_(self._load_key(cursor[0]), cursor[1])
+        query = query.filter(key < last if desc else key > last)
+        if page_size is None:
+            page_size = self.page_size
+        if page_size:
+            query = query.limit(page_size)
+        return query
+
+
 # User
 
 
@@ -141,6 +342,12 @@ class TeamModelView(ModelView):
     def get_count_query(self):
         return self.get_query().with_entities(func.count(Team.team_id))
 
+    def on_model_change(self, form, model, is_created):
+        # departments roll up the overtime of their sub-teams
+        if not is_created and inspect(model).attrs.parent_team.history.has_changes():
+            db.session.flush()
+            refresh_overtime_statistics()
+
     def is_accessible(self):
         return current_user.is_superadmin or current_user.writable_teams.count()
 
@@ -161,7 +368,7 @@ class ActivityModelView(CheckSuperuserRoleMixin, ModelView):
 # Measurements
 
 
-class MeasurementModelView(ModelView):
+class MeasurementModelView(KeysetModelView):
     column_exclude_list = ["measurement_id"]
     form_excluded_columns = ["measurement_id"]
     column_filters = ["measurement_date", "team"]
@@ -178,6 +385,7 @@ class THCResultForm1(form.Form):
 
 class THCMeasurementModelView(CheckSuperuserRoleMixin, MeasurementModelView):
     column_filters = MeasurementModelView.column_filters + ["session_name"]
+    keyset_columns = ["measurement_date"]
     column_searchable_list = MeasurementModelView.column_searchable_list + [
         "question.topic"
     ]
@@ -235,6 +443,8 @@ class THCMeasurementModelView(CheckSuperuserRoleMixin, MeasurementModelView):
                         )
                         db.session.add(obj)
                     try:
+                        db.session.flush()
+                        refresh_thc_sessions([prev_form_data["session_name"]])
                         db.session.commit()
                         flash(
                             f"Successfully recorded {prev_form_data['session_name']}",
@@ -251,6 +461,18 @@ class THCMeasurementModelView(CheckSuperuserRoleMixin, MeasurementModelView):
         template = "cadmin/thc_result_create_1.html"
         return self.render(template, form=form, return_url=return_url)
 
+    def on_model_change(self, form, model, is_created):
+        # the previous session of the measurement needs to be refreshed as well
+        session_names = {model.session_name} | set(
+            inspect(model).attrs.session_name.history.deleted
+        )
+        db.session.flush()
+        refresh_thc_sessions(session_names)
+
+    def after_model_delete(self, model):
+        refresh_thc_sessions([model.session_name])
+        db.session.commit()
+
 
 # Configurations
 
@@ -260,6 +482,26 @@ class StatusCategoryStatusMappingModelView(CheckSuperuserRoleMixin, ModelView):
     column_editable_list = ["status", "status_category"]
     list_template = "admin/model/status_category_status_mapping_list.html"
 
+    @staticmethod
+    def _recompute_status_categories(statuses=None):
+        from tasks.sprints import (  # pylint: disable=import-outside-toplevel
+            recompute_status_categories,
+        )
+
+        recompute_status_categories.delay(statuses)
+
+    def on_model_change(self, form, model, is_created):
+        # snapshots with the previous status need to be recomputed as well
+        g.changed_statuses = {model.status} | set(
+            inspect(model).attrs.status.history.deleted
+        )
+
+    def after_model_change(self, form, model, is_created):
+        self._recompute_status_categories(sorted(g.pop("changed_statuses")))
+
+    def after_model_delete(self, model):
+        self._recompute_status_categories([model.status])
+
     @expose("/load_jira_mappings/")
     def load_jira_mappings(self):
         return_url = get_redirect_target() or self.get_url(".index_view")
@@ -276,6 +518,7 @@ class StatusCategoryStatusMappingModelView(CheckSuperuserRoleMixin, ModelView):
                 create_default_status_mappings(
                     {d.name: d.statusCategory.name for d in jira.statuses()}
                 )
+                self._recompute_status_categories()
             else:
                 flash("Jira failed to connect", "error")
             return redirect(return_url)
@@ -286,7 +529,7 @@ class ConfigureJiraConnectionView(CheckSuperuserRoleMixin, ModelView):
     can_delete = False
     can_edit = False
     column_default_sort = "team.name"
-    column_editable_list = ("jira_project",)
+    column_editable_list = ("jira_project", "jira_sync_strategy")
     column_searchable_list = (
         "team.name",
         "jira_project.project_key",
@@ -300,6 +543,8 @@ class ConfigureJiraConnectionView(CheckSuperuserRoleMixin, ModelView):
         activities = Activity.query.filter(Activity.jira_project != None).all()
         for activity in activities:
             self.task_status(activity.activity_id)
+        for activity in Activity.query.all():
+            self.delete_task_status(activity.activity_id)
 
         return super().index_view()
 
@@ -340,30 +585,50 @@ class ConfigureJiraConnectionView(CheckSuperuserRoleMixin, ModelView):
     def delete_sprints_and_issues(self):
         return_url = get_redirect_target() or self.get_url(".index_view")
         model_id = get_mdict_item_or_list(request.args, "id")
-        model = self.get_one(model_id)
         try:
-            sprints = (
-                Sprint.query.filter(Sprint.activity == model)
-                .with_entities(Sprint.sprint_id)
-                .all()
-            )
-            issue_count = IssueSnapshot.query.filter(
-                IssueSnapshot.sprint_id.in_(sprints)
-            ).delete(synchronize_session=False)
-            db.session.commit()
-            sprint_count = Sprint.query.filter(Sprint.activity == model).delete()
-            db.session.commit()
-            message = (
-                f"Deleted {sprint_count} sprints with {issue_count} issue snapshots."
+            from tasks.deletes import (  # pylint: disable=import-outside-toplevel
+                delete_activity_sprints,
             )
-            current_app.logger.info(message)
-            flash(message, "success")
+
+            task = self._get_delete_task_by_activity(model_id)
+
+            # check if a task is currently running
+            if not task or task.state == "PENDING":
+                result = delete_activity_sprints.apply_async(args=[model_id])
+                session[f"delete_sprints_task_{model_id}"] = result.task_id
+                flash("Started deleting sprints and issue snapshots.", "info")
+            else:
+                current_app.logger.info("Deleting in progress...")
         except Exception:
             current_app.logger.error(traceback.format_exc())
             current_app.logger.error("Failed to delete sprints and issue snapshots")
             flash("Deleting sprints and issue snapshots failed", "error")
         return redirect(return_url)
 
+    def _get_delete_task_by_activity(self, activity_id):
+        from tasks.deletes import (  # pylint: disable=import-outside-toplevel
+            delete_activity_sprints,
+        )
+
+        task_id = session.get(f"delete_sprints_task_{activity_id}")
+        if task_id:
+            return delete_activity_sprints.AsyncResult(task_id)
+        else:
+            return None
+
+    @expose("/delete_sprints_and_issues/status/")
+    def delete_task_status(self, activity_id=None):
+        if not activity_id:
+            activity_id = get_mdict_item_or_list(request.args, "activity_id")
+        return jsonify(
+            self._task_status_response(
+                self._get_delete_task_by_activity(activity_id),
+                f"delete_sprints_task_{activity_id}",
+                f"Sprints and issue snapshots deleted for Activity {activity_id}",
+                activity_id,
+            )
+        )
+
     @expose("/sync_project_sprints_without_issues/", methods=("GET",))
     def sync_project_sprints_without_issues(self):
         return_url = get_redirect_target() or self.get_url(".index_view")
@@ -449,7 +714,18 @@ class ConfigureJiraConnectionView(CheckSuperuserRoleMixin, ModelView):
     def task_status(self, activity_id=None):
         if not activity_id:
             activity_id = get_mdict_item_or_list(request.args, "activity_id")
-        task = self._get_task_by_activity(activity_id)
+        return jsonify(
+            self._task_status_response(
+                self._get_task_by_activity(activity_id),
+                f"sync_project_task_{activity_id}",
+                f"Sprint issues successfully synced for Activity {activity_id}",
+                activity_id,
+            )
+        )
+
+    def _task_status_response(
+        self, task, task_session_key, success_message, activity_id
+    ):
         if task:
             if task.state in ("PENDING", "SENT"):
                 # job did not start yet
@@ -478,11 +754,11 @@ class ConfigureJiraConnectionView(CheckSuperuserRoleMixin, ModelView):
             # clear results
             if task.state in ("FAILURE", "SUCCESS"):
                 task.forget()
-                session.pop(f"sync_project_task_{activity_id}", None)
-                flash(
-                    f"Sprint issues successfully synced for Activity {activity_id}",
-                    "success",
-                )
+                session.pop(task_session_key, None)
+                if task.state == "SUCCESS":
+                    flash(success_message, "success")
+                else:
+                    flash(response["status"], "error")
         else:
             response = {
                 "state": "ERROR",
@@ -490,7 +766,7 @@ class ConfigureJiraConnectionView(CheckSuperuserRoleMixin, ModelView):
                 "total": 1,
                 "status": f"No task found for Activity {activity_id}",
             }
-        return jsonify(response)
+        return response
 
 
 # Initialize flask admin
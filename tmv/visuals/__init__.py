@@ -1,3 +1,4 @@
+from visuals.burndown import BurndownGraphController
 from visuals.burnup import BurnupGraphController
 from visuals.cumulative_flow import CumulativeFlowGraphController
 from visuals.team_health_check import THCResultTableController, THCTrendGraphController
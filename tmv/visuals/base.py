@@ -7,11 +7,25 @@ import plotly.graph_objects as go
 from dateutil import rrule
 from dateutil.tz import tzutc
 from flask_security import current_user
+from sqlalchemy import bindparam
 
+from database import bakery, db, use_primary
 from structure.events import Sprint
 from structure.project import Activity
 
 
+# Sprint with the ID `sprint_id` if it belongs to one of the teams `team_ids`
+_readable_sprint_query = bakery(
+    lambda session: session.query(Sprint).join(
+        Activity, Activity.activity_id == Sprint.activity_id
+    )
+)
+_readable_sprint_query += lambda q: q.filter(
+    Sprint.sprint_id == bindparam("sprint_id"),
+    Activity.team_id.in_(bindparam("team_ids", expanding=True)),
+)
+
+
 class VisualController(ABC):
     """
     Base class for all visuals
@@ -58,8 +72,14 @@ class SprintVisualController(VisualController):
     as dates of the Sprint and y-axis as Story Points.
     The layout, selection and syncing of data are
     already implemented for convenience.
+
+    Charts of frozen sprints are stored under `series_key` in
+    `SprintSeries` and don't get computed again.
     """
 
+    #: Key of the visual's figure in `SprintSeries.series`
+    series_key: str = None
+
     @abstractmethod
     def _get_plots(self, *args, **kwargs):
         """
@@ -111,21 +131,35 @@ class SprintVisualController(VisualController):
 
             result = sync_sprint_issues.delay(sprint.sprint_id, latest_only)
             result.get()
+            # the replica may not have the synced snapshots yet
+            use_primary()
+            # last_updated was set by the worker, see visuals.snapshot_cube
+            db.session.refresh(sprint)
 
     def update(self, sprint_id) -> Tuple[List[go.Scatter], go.Layout]:
-        activities_subq = (
-            Activity.query.filter(Activity.team_id.in_(current_user.readable_team_ids))
-            .with_entities(Activity.activity_id)
-            .subquery()
+        sprint = (
+            _readable_sprint_query(db.session())
+            .params(sprint_id=sprint_id, team_ids=list(current_user.readable_team_ids))
+            .one_or_none()
         )
-        sprint = Sprint.query.filter(
-            (Sprint.sprint_id == sprint_id) & (Sprint.activity_id.in_(activities_subq))
-        ).one_or_none()
         if not sprint or sprint.is_future:
             return ([], {})
 
+        if sprint.is_frozen and sprint.series:
+            figure = sprint.series.series.get(self.series_key)
+            if figure:
+                return figure["data"], figure["layout"]
+
         self.check_for_data(sprint)
 
+        return self.figure(sprint)
+
+    def figure(self, sprint: Sprint) -> Tuple[List[go.Scatter], go.Layout]:
+        """
+        Computes the chart of a sprint from its `SprintDailyRollup` rows.
+
+        :param sprint: Sprint to draw the chart for.
+        """
         index = list(
             rrule.rrule(
                 rrule.DAILY,
@@ -0,0 +1,71 @@
+from typing import List
+
+import dash_core_components as dcc
+import plotly.graph_objects as go
+
+from database import db
+from structure.events import Sprint
+from structure.measurements import BurndownMeasurement
+from visuals.base import SprintVisualController
+
+
+class BurndownGraphController(SprintVisualController):
+    """
+    Visual for showing Burndown chart with the scope changes of each day.
+    Reads only the precomputed `BurndownMeasurement` of the sprint.
+    """
+
+    series_key = "burndown"
+
+    def __init__(self, chart_html_id: str = "burndown-chart"):
+        self.chart_html_id = chart_html_id
+
+    def draw(self) -> dcc.Graph:
+        data, layout = self.update(sprint_id=0)
+
+        return dcc.Graph(
+            id=self.chart_html_id, figure=go.Figure(data=data, layout=layout)
+        )
+
+    def _get_plots(self, sprint: Sprint, index: list) -> List[go.BaseTraceType]:
+        """
+        Get required plots for the chart.
+        :param sprint: Sprint to limit measurements to.
+        :param index: List of dates for use in the x axis
+        """
+        measurements = {
+            m.measurement_date.date(): m
+            for m in db.session.query(BurndownMeasurement)
+            .filter(BurndownMeasurement.sprint_id == sprint.sprint_id)
+            .order_by(BurndownMeasurement.measurement_date)
+        }
+        measurements_y = [measurements.get(dt) for dt in index]
+
+        # line: story points not done per day
+        not_done_y = [m.sp_not_done if m else None for m in measurements_y]
+
+        # line: ideal burndown (start_date, remaining) (end_date, 0)
+        ideal_y = [not_done_y[0] or 0] + [None] * (len(index) - 2) + [0]
+
+        # bars: scope added and removed per day
+        added_y = [m.sp_added if m else None for m in measurements_y]
+        removed_y = [-m.sp_swapped if m else None for m in measurements_y]
+
+        return [
+            go.Scatter(
+                name="Remaining",
+                x=index,
+                y=not_done_y,
+                line_shape="hv",
+                connectgaps=True,
+            ),
+            go.Scatter(name="Ideal Burndown", x=index, y=ideal_y, connectgaps=True),
+            go.Bar(name="Scope Added", x=index, y=added_y),
+            go.Bar(name="Scope Removed", x=index, y=removed_y),
+        ]
+
+    def _get_layout(self, index: list) -> go.Layout:
+        layout = super()._get_layout(index)
+        layout.title.text = "Burndown Chart"
+        layout.barmode = "relative"
+        return layout
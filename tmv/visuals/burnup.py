@@ -2,12 +2,11 @@ from typing import List
 
 import dash_core_components as dcc
 import plotly.graph_objects as go
-import sqlalchemy as sa
 
-from database import db
-from structure.events import Sprint, IssueSnapshot
+from structure.events import Sprint
 from structure.project import Activity, StatusCategory  # pylint: disable=unused-import
 from visuals.base import SprintVisualController
+from visuals.snapshot_cube import sprint_rollups
 
 
 class BurnupGraphController(SprintVisualController):
@@ -15,6 +14,8 @@ class BurnupGraphController(SprintVisualController):
     Visual for showing Burnup chart.
     """
 
+    series_key = "burnup"
+
     def __init__(self, chart_html_id: str = "burnup-chart"):
         self.chart_html_id = chart_html_id
 
@@ -31,55 +32,27 @@ class BurnupGraphController(SprintVisualController):
         :param sprint: Sprint to limit issues to.
         :param index: List of dates for use in the x axis
         """
-        subquery = (
-            IssueSnapshot.query.distinct(
-                sa.func.date(IssueSnapshot.snapshot_date), IssueSnapshot.issue_id
-            )
-            .filter(IssueSnapshot.sprint_id == sprint.sprint_id)
-            .order_by(
-                sa.func.date(IssueSnapshot.snapshot_date),
-                IssueSnapshot.issue_id,
-                IssueSnapshot.snapshot_date.desc(),
-            )
-            .subquery()
-        )
+        rollups = sprint_rollups(sprint)
 
         # line: sum(story points) per day
-        total = (
-            db.session.query(
-                sa.func.date(IssueSnapshot.snapshot_date),
-                sa.func.sum(IssueSnapshot.story_points).label("story_points"),
-            )
-            .filter(IssueSnapshot.id == subquery.c.id)
-            .group_by(sa.func.date(IssueSnapshot.snapshot_date))
-            .order_by(sa.func.date(IssueSnapshot.snapshot_date))
-            .all()
-        )
-        total_dict = {k: v for k, v in total}
+        total = rollups.groupby("day")["story_points"].sum()
+        total_dict = total.to_dict()
         total_y = [total_dict.get(dt) for dt in index]
         total_y[0] = total_y[0] or 0
-        total_y[-1] = total[-1].story_points
+        total_y[-1] = total.iloc[-1]
 
         # line: status done story points per day
-        done = (
-            db.session.query(
-                sa.func.date(IssueSnapshot.snapshot_date),
-                sa.func.sum(IssueSnapshot.story_points),
-            )
-            .filter(
-                (IssueSnapshot.id == subquery.c.id)
-                & (IssueSnapshot.status_category == StatusCategory.done)
-            )
-            .group_by(sa.func.date(IssueSnapshot.snapshot_date))
-            .order_by(sa.func.date(IssueSnapshot.snapshot_date))
-            .all()
+        done_dict = (
+            rollups[rollups["status_category"] == StatusCategory.done]
+            .groupby("day")["story_points"]
+            .sum()
+            .to_dict()
         )
-        done_dict = {k: v for k, v in done}
         done_y = [done_dict.get(dt) for dt in index]
         done_y[0] = done_y[0] or 0
 
         # line: ideal burnup (start_date, 0) (end_date, scope)
-        ideal_y = [0] + [None] * (len(index) - 2) + [total[-1].story_points]
+        ideal_y = [0] + [None] * (len(index) - 2) + [total.iloc[-1]]
 
         return [
             go.Scatter(
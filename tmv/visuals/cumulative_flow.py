@@ -3,15 +3,14 @@ from typing import List
 
 import dash_core_components as dcc
 import plotly.graph_objects as go
-import sqlalchemy as sa
 from dateutil.tz import tzutc
 from flask import current_app
 
-from database import db
-from structure.events import Sprint, IssueSnapshot
+from structure.events import Sprint
 from structure.project import StatusCategory
 from structure.project import Activity  # pylint: disable=unused-import
 from visuals.base import SprintVisualController
+from visuals.snapshot_cube import sprint_rollups
 
 
 class CumulativeFlowGraphController(SprintVisualController):
@@ -19,6 +18,8 @@ class CumulativeFlowGraphController(SprintVisualController):
     Visual for showing Cumulative Flow diagram.
     """
 
+    series_key = "cumulative_flow"
+
     def __init__(self, chart_html_id: str = "cumulative-flow-diagram"):
         self.chart_html_id = chart_html_id
         self.interpolated_dates = set()
@@ -43,39 +44,24 @@ class CumulativeFlowGraphController(SprintVisualController):
                 index = index[: i + 1]
                 break
 
-        self.interpolated_dates = set(index)
-
-        subquery = (
-            IssueSnapshot.query.distinct(
-                sa.func.date(IssueSnapshot.snapshot_date), IssueSnapshot.issue_id
-            )
-            .filter(IssueSnapshot.sprint_id == sprint.sprint_id)
-            .order_by(
-                sa.func.date(IssueSnapshot.snapshot_date),
-                IssueSnapshot.issue_id,
-                IssueSnapshot.snapshot_date.desc(),
-            )
-            .subquery()
-        )
+        # weekends are neither shown nor synced (see JiraSync.plan_sprint_backfill)
+        self.interpolated_dates = {
+            dt
+            for i, dt in enumerate(index)
+            if dt.weekday() < 5 or i in (0, len(index) - 1)
+        }
 
         plot_list = []
+        rollups = sprint_rollups(sprint)
 
         # line: status categories "To Do" and "Done"
         for status_category in [StatusCategory.done, StatusCategory.to_do]:
-            q_list = (
-                db.session.query(
-                    sa.func.date(IssueSnapshot.snapshot_date),
-                    sa.func.sum(IssueSnapshot.story_points),
-                )
-                .filter(
-                    (IssueSnapshot.id == subquery.c.id)
-                    & (IssueSnapshot.status_category == status_category)
-                )
-                .group_by(sa.func.date(IssueSnapshot.snapshot_date))
-                .order_by(sa.func.date(IssueSnapshot.snapshot_date))
-                .all()
+            q_dict = (
+                rollups[rollups["status_category"] == status_category]
+                .groupby("day")["story_points"]
+                .sum()
+                .to_dict()
             )
-            q_dict = {k: v for k, v in q_list}
             q_y = [q_dict.get(dt) for dt in index]
             q_y[0] = q_y[0] or 0
             for idx, val in enumerate(q_y):
@@ -98,32 +84,19 @@ class CumulativeFlowGraphController(SprintVisualController):
 
         # line: statuses with categories not in "To Do" or "Done"
         # unmapped statuses will fall under here
-        statuses_q = (
-            db.session.query(IssueSnapshot.status)
-            .filter(
-                ~IssueSnapshot.status_category.in_(
-                    [StatusCategory.to_do, StatusCategory.done]
-                )
-            )
-            .distinct()
-            .all()
-        )
-        for status_obj in statuses_q:
-            status = status_obj.status
-            q_list = (
-                db.session.query(
-                    sa.func.date(IssueSnapshot.snapshot_date),
-                    sa.func.sum(IssueSnapshot.story_points),
-                )
-                .filter(
-                    (IssueSnapshot.id == subquery.c.id)
-                    & (IssueSnapshot.status == status)
-                )
-                .group_by(sa.func.date(IssueSnapshot.snapshot_date))
-                .order_by(sa.func.date(IssueSnapshot.snapshot_date))
-                .all()
+        other_statuses = rollups.loc[
+            ~rollups["status_category"].isin(
+                [StatusCategory.to_do, StatusCategory.done]
+            ),
+            "status",
+        ].unique()
+        for status in other_statuses:
+            q_dict = (
+                rollups[rollups["status"] == status]
+                .groupby("day")["story_points"]
+                .sum()
+                .to_dict()
             )
-            q_dict = {k: v for k, v in q_list}
             q_y = [q_dict.get(dt) for dt in index]
             q_y[0] = q_y[0] or 0
             for idx, val in enumerate(q_y):
@@ -144,7 +117,8 @@ class CumulativeFlowGraphController(SprintVisualController):
 
         if len(self.interpolated_dates) > 0:
             current_app.logger.warning(
-                f"CFD: missing data for dates: {', '.join([d.strftime('%Y-%m-%d') for d in self.interpolated_dates])}"
+                f"CFD: missing data for dates: {', '.join([d.strftime('%Y-%m-%d') for d in self.interpolated_dates])}. "
+                "Run the task tasks.jira.backfill_snapshot_gaps to fetch them."
             )
 
         return plot_list
@@ -0,0 +1,55 @@
+"""
+Reads the Parquet archive of old sprints, see `structure.snapshot_archive`.
+The sprint visuals read archived sprints from it instead of the
+`SprintDailyRollup` rows, see `visuals.snapshot_cube.sprint_rollups`.
+"""
+import json
+import os
+
+import pandas as pd
+
+from structure.events import Sprint
+from structure.project import StatusCategory
+from structure.snapshot_archive import archive_path
+
+
+def load_archived_rollups(sprint: Sprint) -> pd.DataFrame:
+    """
+    Aggregates the archived daily snapshots of a sprint like the
+    SprintDailyRollups.
+
+    :param sprint: Archived sprint.
+    :return: DataFrame with the columns day, status, status_category,
+             story_points and issue_count.
+    """
+    import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+    columns = ["day", "status", "status_category", "story_points", "issue_count"]
+    path = archive_path(sprint.activity_id)
+    # sprints without any snapshots don't get an archive file or row group
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns)
+    index = json.loads(pq.read_schema(path).metadata[b"sprints"])
+    if str(sprint.sprint_id) not in index:
+        return pd.DataFrame(columns=columns)
+
+    snapshots = (
+        pq.ParquetFile(path)
+        .read_row_group(index[str(sprint.sprint_id)], use_pandas_metadata=False)
+        .to_pandas(date_as_object=True)
+    )
+    # groupby drops missing keys, so unmapped statuses are grouped by ""
+    snapshots["status"] = snapshots["status"].astype(str)
+    snapshots["status_category"] = (
+        snapshots["status_category"].astype(object).fillna("")
+    )
+    snapshots["story_points"] = snapshots["story_points"].astype(float)
+    rollups = (
+        snapshots.groupby(["day", "status", "status_category"])
+        .agg(story_points=("story_points", "sum"), issue_count=("issue_id", "count"),)
+        .reset_index()
+    )
+    rollups["status_category"] = rollups["status_category"].map(
+        lambda name: StatusCategory[name] if name else None
+    )
+    return rollups.loc[:, columns]
@@ -0,0 +1,254 @@
+"""
+Snapshot cubes: the `SprintDailyRollup` rows of all sprints of an activity
+(sprint × day × status → story points and issue count) in one Arrow IPC
+file per activity, written after each sync.
+
+The web workers memory-map these files, so all workers of a host share one
+page-cached copy instead of querying and rebuilding the same rollups for
+every chart. Cubes are only used if `SNAPSHOT_CUBE_FOLDER` is configured and
+only for sprints whose `Sprint.last_updated` matches the one stored in the
+cube; otherwise the rollups are read from the database.
+"""
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+from flask import current_app
+from sqlalchemy import bindparam
+
+from database import bakery, db
+from structure.events import Sprint, SprintDailyRollup
+from structure.project import StatusCategory
+from visuals.snapshot_archive import load_archived_rollups
+
+CUBE_FILE_NAME = "activity_{activity_id}.arrow"
+
+#: Columns of the DataFrames returned by `sprint_rollups`
+ROLLUP_COLUMNS = ["day", "status", "status_category", "story_points", "issue_count"]
+
+# Rollups of the sprint with the ID `sprint_id`
+_rollups_query = bakery(
+    lambda session: session.query(
+        SprintDailyRollup.day,
+        SprintDailyRollup.status,
+        SprintDailyRollup.status_category,
+        SprintDailyRollup.story_points,
+        SprintDailyRollup.issue_count,
+    )
+)
+_rollups_query += lambda q: q.filter(
+    SprintDailyRollup.sprint_id == bindparam("sprint_id")
+).order_by(SprintDailyRollup.day)
+
+# Memory-mapped cubes of this process by path: (file identity, table, index)
+_cubes: Dict[str, Tuple[Tuple[int, int], object, dict]] = {}
+_cubes_lock = threading.Lock()
+
+
+def cube_path(activity_id: int) -> Optional[str]:
+    """
+    Returns the path of the cube of an activity, or None if cubes are
+    disabled.
+    """
+    folder = current_app.config.get("SNAPSHOT_CUBE_FOLDER")
+    if not folder:
+        return None
+    return os.path.join(folder, CUBE_FILE_NAME.format(activity_id=activity_id))
+
+
+def write_snapshot_cube(activity_id: int) -> Optional[str]:
+    """
+    Writes the cube of an activity from its SprintDailyRollups. The rows are
+    sorted by sprint, and the schema metadata stores the offset, length and
+    `last_updated` of every sprint. The file is replaced atomically, so
+    workers which mapped the previous file keep a consistent copy.
+
+    :param activity_id: ID of the activity.
+    :return: Path of the written cube, None if cubes are disabled.
+    """
+    path = cube_path(activity_id)
+    if path is None:
+        return None
+    import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+    rows = (
+        db.session.query(
+            SprintDailyRollup.sprint_id,
+            SprintDailyRollup.day,
+            SprintDailyRollup.status,
+            SprintDailyRollup.status_category,
+            SprintDailyRollup.story_points,
+            SprintDailyRollup.issue_count,
+        )
+        .join(Sprint)
+        .filter(Sprint.activity_id == activity_id)
+        .order_by(SprintDailyRollup.sprint_id, SprintDailyRollup.day)
+        .all()
+    )
+
+    index = dict()
+    for offset, row in enumerate(rows):
+        entry = index.setdefault(str(row.sprint_id), {"offset": offset, "length": 0})
+        entry["length"] += 1
+    for sprint_id, last_updated in db.session.query(
+        Sprint.sprint_id, Sprint.last_updated
+    ).filter(Sprint.activity_id == activity_id):
+        entry = index.setdefault(str(sprint_id), {"offset": 0, "length": 0})
+        entry["last_updated"] = last_updated.isoformat() if last_updated else None
+
+    table = pa.table(
+        {
+            "sprint_id": pa.array([row.sprint_id for row in rows], pa.int32()),
+            "day": pa.array([row.day for row in rows], pa.date32()),
+            "status": pa.array(
+                [row.status for row in rows], pa.string()
+            ).dictionary_encode(),
+            "status_category": pa.array(
+                [
+                    row.status_category.name if row.status_category else None
+                    for row in rows
+                ],
+                pa.string(),
+            ).dictionary_encode(),
+            "story_points": pa.array(
+                [float(row.story_points) for row in rows], pa.float64()
+            ),
+            "issue_count": pa.array([row.issue_count for row in rows], pa.int32()),
+        }
+    ).replace_schema_metadata({"sprints": json.dumps(index)})
+
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    os.close(fd)
+    try:
+        sink = pa.OSFile(tmp_path, "wb")
+        try:
+            writer = pa.ipc.new_file(sink, table.schema)
+            writer.write_table(table)
+            writer.close()
+        finally:
+            sink.close()
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return path
+
+
+def write_snapshot_cubes(activity_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Writes the cubes of several activities, e.g. after a sync. Errors are
+    logged, as the visuals fall back to the database anyway.
+
+    :param activity_ids: IDs of the activities. All activities with sprints
+                         if None.
+    :return: Number of written cubes.
+    """
+    if not current_app.config.get("SNAPSHOT_CUBE_FOLDER"):
+        return 0
+    if activity_ids is None:
+        activity_ids = [
+            activity_id
+            for activity_id, in db.session.query(Sprint.activity_id).distinct()
+        ]
+    written_cnt = 0
+    for activity_id in set(activity_ids):
+        try:
+            write_snapshot_cube(activity_id)
+            written_cnt += 1
+        except Exception:
+            current_app.logger.exception(
+                f"Failed to write the snapshot cube of activity {activity_id}"
+            )
+    return written_cnt
+
+
+def _map_cube(path: str) -> Optional[Tuple[object, dict]]:
+    """
+    Returns the memory-mapped table and sprint index of a cube. The mapping
+    is reused by this process until the file gets replaced.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (stat.st_ino, stat.st_mtime_ns)
+    with _cubes_lock:
+        cached = _cubes.get(path)
+        if cached is None or cached[0] != key:
+            import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+            table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+            index = json.loads(table.schema.metadata[b"sprints"])
+            cached = _cubes[path] = (key, table, index)
+    return cached[1], cached[2]
+
+
+def load_sprint_rollups(sprint: Sprint) -> Optional[pd.DataFrame]:
+    """
+    Reads the rollups of a sprint from the cube of its activity.
+
+    :param sprint: Sprint to read the rollups of.
+    :return: DataFrame with the `ROLLUP_COLUMNS`, or None if there is no
+             cube or it was written before the last sync of the sprint.
+    """
+    path = cube_path(sprint.activity_id)
+    cube = _map_cube(path) if path else None
+    if cube is None:
+        return None
+    table, index = cube
+
+    entry = index.get(str(sprint.sprint_id))
+    last_updated = sprint.last_updated.isoformat() if sprint.last_updated else None
+    if entry is None or entry.get("last_updated") != last_updated:
+        return None
+
+    rollups = (
+        table.slice(entry["offset"], entry["length"])
+        .to_pandas(date_as_object=True)
+        .loc[:, ROLLUP_COLUMNS]
+    )
+    rollups["status"] = rollups["status"].astype(str)
+    rollups["status_category"] = (
+        rollups["status_category"]
+        .astype(object)
+        .map(lambda name: StatusCategory[name] if isinstance(name, str) else None)
+    )
+    return rollups
+
+
+def query_sprint_rollups(sprint: Sprint) -> pd.DataFrame:
+    """
+    Reads the rollups of a sprint from the database.
+
+    :param sprint: Sprint to read the rollups of.
+    :return: DataFrame with the `ROLLUP_COLUMNS`.
+    """
+    rows = _rollups_query(db.session()).params(sprint_id=sprint.sprint_id).all()
+    return pd.DataFrame(
+        [
+            (day, status, status_category, float(story_points), issue_count)
+            for day, status, status_category, story_points, issue_count in rows
+        ],
+        columns=ROLLUP_COLUMNS,
+    )
+
+
+def sprint_rollups(sprint: Sprint) -> pd.DataFrame:
+    """
+    Returns the rollups of a sprint from the Parquet archive if the sprint
+    is archived, from its cube if it is up to date, else from the database.
+
+    :param sprint: Sprint to read the rollups of.
+    :return: DataFrame with the `ROLLUP_COLUMNS`.
+    """
+    if sprint.is_archived:
+        return load_archived_rollups(sprint)
+    rollups = load_sprint_rollups(sprint)
+    if rollups is None:
+        rollups = query_sprint_rollups(sprint)
+    return rollups
@@ -0,0 +1,38 @@
+import json
+
+from plotly.utils import PlotlyJSONEncoder
+
+from structure.events import Sprint
+from visuals.burndown import BurndownGraphController
+from visuals.burnup import BurnupGraphController
+from visuals.cumulative_flow import CumulativeFlowGraphController
+
+#: Visuals whose charts are stored for frozen sprints
+SPRINT_VISUALS = (
+    BurnupGraphController,
+    BurndownGraphController,
+    CumulativeFlowGraphController,
+)
+
+
+def render_sprint_series(sprint: Sprint) -> dict:
+    """
+    Renders the charts of all `SPRINT_VISUALS` for a sprint, to be stored in
+    `SprintSeries` when the sprint is frozen (see
+    `structure.events.freeze_sprint`).
+
+    :param sprint: Sprint to render the charts of.
+    :return: Plotly figure (data & layout) by `series_key` of the visual.
+    """
+    series = dict()
+    for visual_class in SPRINT_VISUALS:
+        data, layout = visual_class().figure(sprint)
+        figure = {
+            "data": [trace.to_plotly_json() for trace in data],
+            "layout": layout.to_plotly_json(),
+        }
+        # serialize dates and decimals the way plotly does
+        series[visual_class.series_key] = json.loads(
+            json.dumps(figure, cls=PlotlyJSONEncoder)
+        )
+    return series
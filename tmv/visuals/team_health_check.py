@@ -2,10 +2,10 @@ import logging
 from collections import namedtuple
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
-from database import db
+from database import db, read_frame
 
 from flask_security import current_user
-from sqlalchemy import and_, desc, func
+from sqlalchemy import and_, desc
 import dash_core_components as dcc
 import plotly.graph_objects as go
 
@@ -14,6 +14,7 @@ from structure.measurements import (
     THCMeasurement,
     THCQuestion,
     THCResult,
+    THCSession,
     thc_final_result,
 )
 from structure.organization import Team
@@ -21,6 +22,18 @@ from helpers.color import hex_to_rgb
 from visuals.base import VisualController
 
 
+#: Types of the string columns of the loaded THC measurements
+THC_DTYPES = {
+    "measurement_id": str,
+    "session_name": str,
+    "session": str,
+    "team_name": str,
+    "topic": str,
+    "answer_green": str,
+    "answer_red": str,
+}
+
+
 def column_id(team_name: str, session: str) -> str:
     """
     Create a unique column ID based on team and session identifier.
@@ -91,7 +104,6 @@ class THCResultTableController(VisualController, _TeamHealthCheckVisualControlle
         sql_statement = (
             db.session.query(
                 THCMeasurement,
-                Team.team_id.label("team_id"),
                 Team.name.label("team_name"),
                 THCQuestion.topic.label("topic"),
                 THCQuestion.answer_green.label("answer_green"),
@@ -110,7 +122,9 @@ class THCResultTableController(VisualController, _TeamHealthCheckVisualControlle
             .statement
         )
 
-        thc_result = pd.read_sql_query(sql_statement, db.session.bind,)
+        thc_result = read_frame(
+            sql_statement, dtype=THC_DTYPES, parse_dates=["measurement_date"]
+        )
 
         # If there are no entries in the database, return an empty dataframe.
         if thc_result.empty:
@@ -290,40 +304,30 @@ class THCResultTableController(VisualController, _TeamHealthCheckVisualControlle
 
     def default_selection(self) -> Tuple[List[int], str, str]:
         """ Return default selection for teams and sessions """
-        # Retrieve most recent two sessions from database
+        # Retrieve the sessions of the readable teams, newest first
+        readable_team_ids = current_user.readable_team_ids
         sessions_result = (
-            db.session.query(
-                THCMeasurement.session_name.label("session"),
-                func.min(THCMeasurement.measurement_date).label("min_date"),
-            )
-            .filter(THCMeasurement.team_id.in_(current_user.readable_team_ids))
-            .group_by(THCMeasurement.session_name)
-            .order_by(desc("min_date"))  # Newest first, second-newest next
-            .limit(2)
+            db.session.query(THCSession.session_name, THCSession.team_ids)
+            .filter(THCSession.team_ids.overlap(readable_team_ids))
+            .order_by(desc(THCSession.min_date))
+            .all()
         )
 
         try:
-            session1 = sessions_result[0].session
-        except (IndexError, KeyError):
+            session1 = sessions_result[0].session_name
+        except IndexError:
             session1 = ""
             logging.info("Database contains no team health check sessions")
         try:
-            cmp_session = sessions_result[1].session
-        except (IndexError, KeyError):
+            cmp_session = sessions_result[1].session_name
+        except IndexError:
             cmp_session = ""
 
-        # Retrieve all teams which have a THC-result
-        all_teams_with_thc_result = (
-            db.session.query(Team.team_id)
-            .filter(Team.team_id.in_(current_user.readable_team_ids))
-            .distinct()
-            .join(THCMeasurement)
+        # All teams which have a THC-result
+        all_team_ids = sorted(
+            {team_id for row in sessions_result for team_id in row.team_ids}
+            & set(readable_team_ids)
         )
-        try:
-            all_team_ids = [row[0] for row in all_teams_with_thc_result]
-        except KeyError:
-            logging.info("No teams with THC-result found.")
-            all_team_ids = []
 
         return all_team_ids, session1, cmp_session
 
@@ -534,7 +538,9 @@ class THCTrendGraphController(VisualController, _TeamHealthCheckVisualController
             .order_by(THCMeasurement.measurement_date)
             .statement
         )
-        thc_result = pd.read_sql_query(sql_statement, db.session.bind,)
+        thc_result = read_frame(
+            sql_statement, dtype=THC_DTYPES, parse_dates=["measurement_date"]
+        )
 
         if thc_result.empty or thc_result is None:
             return pd.DataFrame()
@@ -7,16 +7,39 @@ import dash_core_components as dcc
 import pandas as pd
 import plotly.graph_objects as go
 from flask_security import current_user
-from sqlalchemy import and_, asc, desc
+from sqlalchemy import and_, asc, bindparam, desc
 
-from database import db
-from structure.measurements import OTMeasurement
+from database import bakery, db, read_frame
+from structure.measurements import OTMeasurement, OTMonthlyStatistics
 from structure.organization import Team
 from visuals.base import VisualController
 from visuals.shared import fix_timedelta_plot
 
 DateLike = Union[date, datetime, str]
 
+# Measurement dates of the teams with the IDs `team_ids`
+_measurement_dates_query = bakery(
+    lambda session: session.query(OTMeasurement.measurement_date)
+)
+_measurement_dates_query += lambda q: q.filter(
+    OTMeasurement.team_id.in_(bindparam("team_ids", expanding=True))
+)
+_latest_date_query = _measurement_dates_query + (
+    lambda q: q.order_by(desc(OTMeasurement.measurement_date))
+)
+_earliest_date_query = _measurement_dates_query + (
+    lambda q: q.order_by(asc(OTMeasurement.measurement_date))
+)
+
+#: Statistics of the overtime per day, in the order of the box plot's fields
+OT_PER_DAY_STATISTICS = {
+    "lowerfence": "ot_per_day_min",
+    "q1": "ot_per_day_q1",
+    "median": "ot_per_day_median",
+    "q3": "ot_per_day_q3",
+    "upperfence": "ot_per_day_max",
+}
+
 
 class OvertimeChartController(VisualController):
     """
@@ -33,10 +56,8 @@ class OvertimeChartController(VisualController):
     def get_latest_date(self) -> datetime:
         """ Return latest date for which data is available """
         result = (
-            db.session.query(OTMeasurement.measurement_date)
-            .filter(OTMeasurement.team_id.in_(current_user.readable_team_ids))
-            .order_by(desc(OTMeasurement.measurement_date))
-            .limit(1)
+            _latest_date_query(db.session())
+            .params(team_ids=list(current_user.readable_team_ids))
             .first()
         )
         if result is None:
@@ -47,10 +68,8 @@ class OvertimeChartController(VisualController):
     def get_earliest_date(self) -> datetime:
         """ Return earliest date for which data is available """
         result = (
-            db.session.query(OTMeasurement.measurement_date)
-            .filter(OTMeasurement.team_id.in_(current_user.readable_team_ids))
-            .order_by(asc(OTMeasurement.measurement_date))
-            .limit(1)
+            _earliest_date_query(db.session())
+            .params(team_ids=list(current_user.readable_team_ids))
             .first()
         )
         if result is None:
@@ -103,13 +122,16 @@ class OvertimeChartController(VisualController):
         else:
             filter_teams = Team.team_id.in_(selected_teams)
 
-        # Load overtime-data from database
+        # Load the monthly overtime statistics from database
         query = (
             db.session.query(
-                OTMeasurement.measurement_date,
-                OTMeasurement.overtime,
-                OTMeasurement.workdays_fix,
-                OTMeasurement.workdays_actual,
+                OTMonthlyStatistics.month.label("measurement_date"),
+                *[
+                    db.func.extract(
+                        "epoch", getattr(OTMonthlyStatistics, column)
+                    ).label(column)
+                    for column in OT_PER_DAY_STATISTICS.values()
+                ],
                 Team.team_id.label("team_id"),
                 Team.name.label("team_name"),
             )
@@ -117,7 +139,7 @@ class OvertimeChartController(VisualController):
             .filter(
                 and_(
                     filter_teams,
-                    OTMeasurement.measurement_date.between(
+                    OTMonthlyStatistics.month.between(
                         selected_start_date, selected_end_date
                     ),
                     Team.team_id.in_(current_user.readable_team_ids),
@@ -125,36 +147,23 @@ class OvertimeChartController(VisualController):
             )
         )
 
-        result = pd.read_sql(
-            query.statement, db.session.bind, parse_dates=["measurement_date"],
+        data = read_frame(
+            query.statement, dtype={"team_name": str}, parse_dates=["measurement_date"],
         )
 
         """
-        If data was successfully retrieved and is not empty, do the following:
-            1. For each row, calculate overtime per day
-            2. Group the entries, so that the data can be sliced by period and team
-                - Aggregate overtime per day by min, mean and max
-                - Calculate number of team members for the given period
-            3. Sort the data by teams and dates
+        If data was successfully retrieved and is not empty, sort it by teams
+        and dates and label each record. The statistics of the overtime per
+        day are computed per team and month by `refresh_overtime_statistics`.
         If there was no data, return an empty dataframe and return.
         """
-        if result.empty:
+        if data.empty:
             logging.info("No overtime data for the active filter.")
             return pd.DataFrame()
 
-        # 1. Calculate overtime per day.
-        # TODO: Make this safe for DivisionByZero-error.
-        result["ot_per_day"] = result["overtime"] / result["workdays_actual"]
-        # TODO: Need to fix
-        result["num_members"] = 1
+        for column in OT_PER_DAY_STATISTICS.values():
+            data[column] = pd.to_timedelta(data[column], unit="s")
 
-        # 2. Group & aggregate
-        data = result.groupby(["measurement_date", "team_name"]).agg(
-            {"ot_per_day": list}
-        )
-        data.reset_index(inplace=True)
-
-        # 3. Sort by teams and dates & label each record
         data.sort_values(by=["team_name", "measurement_date"], inplace=True)
         data["label"] = data.apply(
             lambda x: self._data_label(x["team_name"], x["measurement_date"]), axis=1,
@@ -196,16 +205,18 @@ class OvertimeChartController(VisualController):
             selected_teams=selected_teams,
         )
 
+        # negative overtime is shown as 0, which doesn't change the order of
+        # the values, so the statistics can be clipped as well
         traces = [
             go.Box(
-                x=[
-                    fix_timedelta_plot(
-                        ot_per_day if ot_per_day > timedelta(0) else timedelta(0)
-                    )
-                    for ot_per_day in row["ot_per_day"]
-                ],
+                y=[row["label"]],
                 name=row["label"],
+                orientation="h",
                 marker_color="#f56565",
+                **{
+                    field: [fix_timedelta_plot(max(row[column], timedelta(0)))]
+                    for field, column in OT_PER_DAY_STATISTICS.items()
+                },
             )
             for _, row in data.iterrows()
         ]